@@ -1,6 +1,7 @@
 """The BWT Perla integration."""
 
 import logging
+import time
 
 from custom_components.komodo import coordinator
 from komodo_api.lib import ApiKeyInitOptions
@@ -8,13 +9,31 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers import config_validation as cv, device_registry as dr, entity_registry as er
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, CONF_HOST, CONF_API_KEY, CONF_API_SECRET
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_API_KEY,
+    CONF_API_SECRET,
+    CONF_PUSH_UPDATES,
+    DEFAULT_INTERVALS,
+)
 from .base import KomodoBase
+from .cache import KomodoCache
+from .entities import async_track_devices
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.UPDATE, Platform.BUTTON, Platform.SWITCH]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Komodo services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -23,24 +42,61 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
     komodo = KomodoBase(
         hass,
+        entry.entry_id,
         entry.data[CONF_HOST],
         ApiKeyInitOptions(entry.data[CONF_API_KEY], entry.data[CONF_API_SECRET]),
+        {key: entry.options[key] for key in DEFAULT_INTERVALS if key in entry.options},
     )
-    try:
-        await komodo.test_connection()
-    except Exception as e:
-        _LOGGER.exception("Error setting up Komodo API: {e}")
-        await komodo.close()
-        raise ConfigEntryNotReady from e
-
+    started = time.monotonic()
     hass.data[DOMAIN][entry.entry_id] = komodo
-    await komodo.coordinator.async_config_entry_first_refresh()
+    restored = await komodo.async_restore()
+    if not restored:
+        try:
+            await komodo.test_connection()
+        except Exception as e:
+            _LOGGER.exception("Error setting up Komodo API: {e}")
+            hass.data[DOMAIN].pop(entry.entry_id)
+            await komodo.close()
+            raise ConfigEntryNotReady from e
+        try:
+            # Only lists the resources, the services are inspected below.
+            await komodo.coordinator.async_config_entry_first_refresh()
+        except Exception:
+            # Release the shared client, the retried setup acquires it again.
+            hass.data[DOMAIN].pop(entry.entry_id)
+            await komodo.close()
+            raise
+    entry.async_on_unload(komodo.coordinator.async_add_listener(komodo.save_cache))
+    async_track_devices(entry, komodo.coordinator)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Seconds from the start of the setup until the entities were added.
+    komodo.coordinator.stats.time_to_first_entity = time.monotonic() - started
+    _LOGGER.info(
+        "Komodo entities available after %.2fs (%s)",
+        komodo.coordinator.stats.time_to_first_entity,
+        "from cache" if restored else "from list calls",
+    )
+
+    # Entities are up, validate the cache or inspect the services in the background.
+    entry.async_create_background_task(
+        hass,
+        komodo.coordinator.async_refresh() if restored else komodo.coordinator.async_inspect_services(),
+        f"komodo first inspection {entry.entry_id}",
+    )
+
+    if entry.options.get(CONF_PUSH_UPDATES, False):
+        komodo.start_push(entry)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
@@ -49,6 +105,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the cache of a removed entry."""
+    await KomodoCache(hass, entry.entry_id).async_remove()
+
+
 async def async_remove_config_entry_device(
     hass: HomeAssistant, config_entry: ConfigEntry, device_entry: dr.DeviceEntry
 ) -> bool:
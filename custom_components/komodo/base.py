@@ -1,23 +1,88 @@
-from komodo_api.lib import KomodoClient, ApiKeyInitOptions
+from typing import Mapping
+
+from komodo_api.lib import ApiKeyInitOptions
 from komodo_api.types import GetVersion
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from komodo_api.types import UpdateListItem
+from homeassistant.core import HomeAssistant, callback
+from .bulk import KomodoBulkDeployer
+from .clients import SharedKomodoClient, async_get_clients
+from .cache import KomodoCache
+from .completion import CompletionTracker
 from .coordinator import KomodoCoordinator
+from .procedures import KomodoProcedureCoordinator
+from .push import KomodoUpdateStream
 
 
 class KomodoBase:
     """Base class for Komodo integration, holding shared API client and coordinator."""
-    api: KomodoClient
+    host: str
+    api: SharedKomodoClient
     coordinator: KomodoCoordinator
+    procedures: KomodoProcedureCoordinator
+    completion: CompletionTracker
+    deployer: KomodoBulkDeployer
+    cache: KomodoCache
+    stream: KomodoUpdateStream | None
 
     def __init__(
-        self, hass: HomeAssistant, host: str, init_options: ApiKeyInitOptions
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        host: str,
+        init_options: ApiKeyInitOptions,
+        intervals: Mapping[str, float] | None = None,
     ) -> None:
-        self.api = KomodoClient(host, init_options)
-        self.coordinator = KomodoCoordinator(hass, self.api)
+        self.hass = hass
+        self.host = host
+        self._clients = async_get_clients(hass)
+        self.api = self._clients.acquire(host, init_options)
+        self.coordinator = KomodoCoordinator(hass, self.api, intervals=intervals)
+        self.procedures = KomodoProcedureCoordinator(hass, self.api)
+        self.completion = CompletionTracker(self.api)
+        self.deployer = KomodoBulkDeployer(self.api, self.coordinator, self.completion)
+        self.cache = KomodoCache(hass, entry_id)
+        self.stream = None
+
+    async def async_restore(self) -> bool:
+        """Start the coordinator from the cached data, if there is any."""
+        data = await self.cache.async_load()
+        if data is None:
+            return False
+        self.coordinator.async_restore(data)
+        return True
+
+    @callback
+    def save_cache(self) -> None:
+        """Cache the coordinator data after a refresh that changed something."""
+        data = self.coordinator.data
+        if data is not None and data.diff and self.coordinator.last_update_success:
+            self.cache.async_schedule_save(data)
+
+    def start_push(self, entry: ConfigEntry) -> None:
+        """Listen to the update stream in the background."""
+        self.stream = KomodoUpdateStream(
+            self.api,
+            self._handle_update,
+            self.coordinator.async_set_push_connected,
+        )
+        entry.async_create_background_task(
+            self.hass, self.stream.run(), f"komodo update stream {entry.entry_id}"
+        )
+
+    @callback
+    def _handle_update(self, update: UpdateListItem) -> None:
+        self.completion.handle_update(update)
+        self.coordinator.async_handle_update(update)
 
     async def close(self) -> None:
         """Close the API connection."""
-        await self.api.close()
+        if self.stream:
+            self.stream.stop()
+        self.completion.close()
+        await self.coordinator.async_shutdown()
+        await self.procedures.async_shutdown()
+        await self._clients.release(self.api)
 
     async def test_connection(self) -> None:
         """Test the connection to the API."""
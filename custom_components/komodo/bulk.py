@@ -0,0 +1,119 @@
+"""Deploy many services at once, grouped into one DeployStack per stack."""
+
+import asyncio
+import logging
+from typing import Collection, Iterable
+
+from komodo_api.lib import KomodoClient
+from komodo_api.types import DeployStack, Update
+
+from .completion import CompletionTracker
+from .const import DEFAULT_DEPLOY_PER_SERVER, DEPLOY_BATCH_WINDOW
+from .coordinator import KomodoCoordinator
+from .utils import wait_for_completion
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KomodoBulkDeployer:
+    """Deploy services in parallel while limiting the deploys per server.
+
+    All services of a stack go into a single DeployStack. Stacks run in
+    parallel, at most per_server_limit at a time on the same server, and the
+    deployed stacks are refreshed together when everything finished. Installs
+    started within batch_window of each other (e.g. "update all" in the UI
+    calling every update entity at once) are merged into one bulk deploy.
+    """
+
+    def __init__(
+        self,
+        api: KomodoClient,
+        coordinator: KomodoCoordinator,
+        completion: CompletionTracker,
+        per_server_limit: int = DEFAULT_DEPLOY_PER_SERVER,
+        batch_window: float = DEPLOY_BATCH_WINDOW,
+    ) -> None:
+        self._api = api
+        self._coordinator = coordinator
+        self._completion = completion
+        self._per_server_limit = per_server_limit
+        self._batch_window = batch_window
+        self._queued: dict[str, set[str]] = {}
+        self._batch: asyncio.Task | None = None
+        self._server_limits: dict[str, asyncio.Semaphore] = {}
+
+    def pending_updates(self, stacks: Collection[str] | None = None) -> list[tuple[str, str]]:
+        """Services with an update available, optionally only in the given stacks (ids or names)."""
+        pending: list[tuple[str, str]] = []
+        for stack in self._coordinator.data.stacks.values():
+            if stacks is not None and stack.id not in stacks and stack.name not in stacks:
+                continue
+            pending.extend(
+                (stack.id, service.name)
+                for service in stack.services.values()
+                if service.update_available
+            )
+        return pending
+
+    async def install(self, stack_id: str, service_name: str) -> Update:
+        """Deploy one service, together with other installs started around the same time."""
+        if self._batch is None:
+            self._queued = {}
+            self._batch = asyncio.create_task(self._run_batch(self._queued))
+        self._queued.setdefault(stack_id, set()).add(service_name)
+        result = (await asyncio.shield(self._batch))[stack_id]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    async def deploy(
+        self, services: Iterable[tuple[str, str]]
+    ) -> dict[str, Update | BaseException]:
+        """Deploy the given (stack id, service name) pairs, returning the result per stack."""
+        by_stack: dict[str, set[str]] = {}
+        for stack_id, service_name in services:
+            by_stack.setdefault(stack_id, set()).add(service_name)
+        return await self._deploy(by_stack)
+
+    async def _run_batch(self, queued: dict[str, set[str]]) -> dict[str, Update | BaseException]:
+        await asyncio.sleep(self._batch_window)
+        # Installs from now on start the next batch.
+        self._batch = None
+        return await self._deploy(queued)
+
+    async def _deploy(
+        self, by_stack: dict[str, set[str]]
+    ) -> dict[str, Update | BaseException]:
+        if not by_stack:
+            return {}
+        stack_ids = list(by_stack)
+        _LOGGER.info(
+            "Deploying %d services in %d stacks",
+            sum(len(names) for names in by_stack.values()),
+            len(stack_ids),
+        )
+        results = await asyncio.gather(
+            *(
+                self._deploy_stack(stack_id, sorted(by_stack[stack_id]))
+                for stack_id in stack_ids
+            ),
+            return_exceptions=True,
+        )
+        await self._coordinator.async_request_stack_refresh(stack_ids)
+        return dict(zip(stack_ids, results))
+
+    async def _deploy_stack(self, stack_id: str, service_names: list[str]) -> Update:
+        stack = self._coordinator.data.get_stack(stack_id)
+        # Shared by all bulk deploys, so overlapping batches respect the cap too.
+        limit = self._server_limits.setdefault(
+            stack.server_id, asyncio.Semaphore(self._per_server_limit)
+        )
+        async with limit:
+            update = await self._api.execute.deployStack(
+                DeployStack(stack=stack_id, services=service_names)
+            )
+            return await wait_for_completion(
+                self._completion,
+                update,
+                f"Update of {stack.name}/{', '.join(service_names)}",
+            )
@@ -5,18 +5,22 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from komodo_api.types import (
-    ListProcedures,
-    ListProceduresResponse,
     ResourceListItem,
     ProcedureListItemInfo,
     RunProcedure,
     DeployStack,
 )
 from komodo_api.lib import KomodoClient
+from functools import partial
+from typing import Collection
 
 from custom_components.komodo.base import KomodoBase
+from custom_components.komodo.completion import CompletionTracker
 from custom_components.komodo.const import DOMAIN
 from custom_components.komodo.coordinator import KomodoCoordinator
+from custom_components.komodo.data.diff import stack_key
+from custom_components.komodo.entities import STACK, async_remove_entities, async_track_entities
+from custom_components.komodo.procedures import KomodoProcedureCoordinator
 from custom_components.komodo.utils import wait_for_completion, create_stack_device_info
 
 import logging
@@ -30,40 +34,88 @@ async def async_setup_entry(
 ):
     komodo: KomodoBase = hass.data[DOMAIN][entry.entry_id]
 
-    # Procedure buttons
-    try:
-        procedures: ListProceduresResponse = await komodo.api.read.listProcedures(
-            ListProcedures()
+    # Procedure buttons, added by the listener once the procedures could be
+    # listed, so the first listing doesn't hold up the platform setup.
+    _async_track_procedures(hass, entry, komodo, async_add_entities)
+    if komodo.procedures.data is None:
+        entry.async_create_background_task(
+            hass, komodo.procedures.async_refresh(), f"komodo procedures {entry.entry_id}"
         )
-        procedure_entities = [
-            KomodoProcedureButton(komodo.api, entry.entry_id, procedure)
-            for procedure in procedures
-        ]
-    except Exception:
-        procedure_entities = []
-    
+
     # Stack deploy buttons
-    deploy_entities = create_deploy_buttons_for_stacks(
-        komodo.coordinator, komodo.api, entry.entry_id
+    deploy_entities = async_track_entities(
+        entry,
+        komodo.coordinator,
+        async_add_entities,
+        STACK,
+        partial(
+            create_deploy_buttons_for_stacks,
+            komodo.coordinator, komodo.api, komodo.completion, entry.entry_id,
+        ),
     )
 
-    async_add_entities(procedure_entities + deploy_entities)
+    async_add_entities(deploy_entities)
+
+
+@callback
+def _async_track_procedures(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    komodo: KomodoBase,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add and remove procedure buttons whenever the listed procedures change."""
+    tracked: dict[str, KomodoProcedureButton] = {}
+
+    @callback
+    def _handle_update() -> None:
+        procedures = komodo.procedures.data or {}
+        removed = tracked.keys() - procedures.keys()
+        if removed:
+            async_remove_entities(hass, [tracked.pop(procedure_id) for procedure_id in removed])
+        added = [
+            KomodoProcedureButton(
+                komodo.procedures, komodo.api, komodo.completion, entry.entry_id, procedure
+            )
+            for procedure_id, procedure in procedures.items()
+            if procedure_id not in tracked
+        ]
+        if added:
+            tracked.update((button._procedure.id, button) for button in added)
+            async_add_entities(added)
+
+    entry.async_on_unload(komodo.procedures.async_add_listener(_handle_update))
+    _handle_update()
 
 
 
-class KomodoProcedureButton(ButtonEntity):
+class KomodoProcedureButton(CoordinatorEntity[KomodoProcedureCoordinator], ButtonEntity):
     def __init__(
         self,
+        coordinator: KomodoProcedureCoordinator,
         api: KomodoClient,
+        completion: CompletionTracker,
         id: str,
         procedure: ResourceListItem[ProcedureListItemInfo],
     ):
+        super().__init__(coordinator, procedure.id)
         self._api = api
+        self._completion = completion
         self._procedure = procedure
         entity_id = f"button_{procedure.id}"
         self.entity_id = f"button.{DOMAIN}_{entity_id}"
         self._attr_unique_id = f"{id}_{entity_id}"
         self._attr_name = f"Procedure {procedure.name}"
+        self._written_available = True
+
+    @property
+    def available(self) -> bool:
+        """Available while the procedure is listed, even if a later listing failed.
+
+        Running a procedure doesn't need a fresh listing, and a failed one
+        keeps the last procedures.
+        """
+        return self._procedure.id in (self.coordinator.data or {})
 
     async def async_press(self) -> None:
         _LOGGER.info("Starting procedure %s", self._procedure.name)
@@ -71,10 +123,23 @@ class KomodoProcedureButton(ButtonEntity):
             RunProcedure(procedure=self._procedure.id)
         )
         update = await wait_for_completion(
-            self._api, update, f"Procedure {self._procedure.name}"
+            self._completion, update, f"Procedure {self._procedure.name}"
         )
         _LOGGER.info("Completed procedure %s", self._procedure.name)
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Follow a renamed procedure, and write when it became available or unavailable."""
+        procedure = (self.coordinator.data or {}).get(self._procedure.id)
+        available = self.available
+        if procedure is not None and procedure.name != self._procedure.name:
+            self._procedure = procedure
+            self._attr_name = f"Procedure {procedure.name}"
+        elif available == self._written_available:
+            return
+        self._written_available = available
+        self.async_write_ha_state()
+
 
 class KomodoStackDeployButton(CoordinatorEntity[KomodoCoordinator], ButtonEntity):
     """Button entity to deploy a stack."""
@@ -83,14 +148,16 @@ class KomodoStackDeployButton(CoordinatorEntity[KomodoCoordinator], ButtonEntity
         self,
         coordinator: KomodoCoordinator,
         api: KomodoClient,
+        completion: CompletionTracker,
         item_id: str,
         stack_id: str,
         stack_name: str,
         device_info,
     ) -> None:
         """Initialize the button entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, stack_key(stack_id))
         self._api = api
+        self._completion = completion
         self._stack_id = stack_id
         self._stack_name = stack_name
 
@@ -107,12 +174,12 @@ class KomodoStackDeployButton(CoordinatorEntity[KomodoCoordinator], ButtonEntity
                 DeployStack(stack=self._stack_id)
             )
             update = await wait_for_completion(
-                self._api,
+                self._completion,
                 update,
                 f"Deploy stack {self._stack_name}",
             )
             _LOGGER.info("Completed deployment of stack %s", self._stack_name)
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_request_stack_refresh([self._stack_id])
         except Exception as e:
             _LOGGER.error("Failed to deploy stack %s: %s", self._stack_name, e)
             raise
@@ -121,12 +188,16 @@ class KomodoStackDeployButton(CoordinatorEntity[KomodoCoordinator], ButtonEntity
 def create_deploy_buttons_for_stacks(
     coordinator: KomodoCoordinator,
     api: KomodoClient,
+    completion: CompletionTracker,
     entry_id: str,
+    stack_ids: Collection[str] | None = None,
 ) -> list[KomodoStackDeployButton]:
-    """Create deploy button for each stack."""
+    """Create deploy button for each stack, or only the given ones."""
     entities: list[KomodoStackDeployButton] = []
 
     for stack in coordinator.data.stacks.values():
+        if stack_ids is not None and stack.id not in stack_ids:
+            continue
         device_info = create_stack_device_info(
             stack.id, stack.name, stack.server_id
         )
@@ -134,6 +205,7 @@ def create_deploy_buttons_for_stacks(
         entity = KomodoStackDeployButton(
             coordinator=coordinator,
             api=api,
+            completion=completion,
             item_id=f"{entry_id}_{stack.id}",
             stack_id=stack.id,
             stack_name=stack.name,
@@ -0,0 +1,40 @@
+"""On-disk cache of the last data, so entities come up right after a restart."""
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CACHE_SAVE_DELAY, CACHE_VERSION, DOMAIN
+from .data.komodo_data import KomodoData
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KomodoCache:
+    """Last KomodoData of a config entry, including update info and container ids.
+
+    The snapshot is saved a while after refreshes with changes, and once more
+    when Home Assistant stops. A cache written by another version is ignored.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict] = Store(hass, CACHE_VERSION, f"{DOMAIN}.{entry_id}")
+
+    async def async_load(self) -> KomodoData | None:
+        """Load the cached data, or None if there is no usable cache."""
+        try:
+            stored = await self._store.async_load()
+            return KomodoData.from_dict(stored) if stored else None
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.warning("Ignoring unusable Komodo cache: %s", e)
+            return None
+
+    @callback
+    def async_schedule_save(self, data: KomodoData) -> None:
+        """Save the data soon, replacing a save still pending."""
+        self._store.async_delay_save(data.as_dict, CACHE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the cache."""
+        await self._store.async_remove()
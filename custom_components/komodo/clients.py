@@ -0,0 +1,142 @@
+"""Komodo clients and connection pools shared by the config entries of a host."""
+
+import asyncio
+import logging
+from typing import TypeVar
+
+import aiohttp
+from komodo_api.lib import ApiKeyInitOptions, KomodoClient
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CLIENT_CONNECTIONS_PER_HOST,
+    CLIENT_KEEPALIVE,
+    DATA_CLIENTS,
+    READ_RETRIES,
+    REQUEST_TIMEOUT,
+)
+from .resilience import call_with_retry, raise_for_gateway_error
+from .stats import ApiStats
+
+_LOGGER = logging.getLogger(__name__)
+
+Res = TypeVar("Res")
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # Every caller of a merged read may be cancelled, so nobody else might.
+    if not future.cancelled():
+        future.exception()
+
+
+class SharedKomodoClient(KomodoClient):
+    """Client on a connection pool shared per host.
+
+    Every call has a deadline, and reads are retried after connection errors
+    and error pages of an unavailable core or proxy.
+    Identical reads that are in flight at the same time are sent once and
+    every caller gets the same response, which must not be modified. The
+    latency of every request sent is recorded per endpoint in `stats`.
+    """
+
+    def __init__(
+        self, url: str, options: ApiKeyInitOptions, connector: aiohttp.TCPConnector
+    ) -> None:
+        super().__init__(url, options)
+        # Keep the authentication headers, but run on the shared pool. The
+        # session KomodoClient created never opened a connection.
+        own_session = self._session
+        self._session = aiohttp.ClientSession(
+            headers=own_session.headers,
+            connector=connector,
+            connector_owner=False,
+            raise_for_status=raise_for_gateway_error,
+        )
+        own_session.detach()
+        self._in_flight: dict[tuple[str, type, str], asyncio.Future] = {}
+        self.stats = ApiStats()
+
+    async def request(self, path: str, request, clz: type[Res]) -> Res:
+        if path != "read":
+            return await self._send(path, request, clz, retries=0)
+        # The same request parsed into another model is another read.
+        key = (path, clz, request.model_dump_json(exclude_none=True))
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = asyncio.ensure_future(self._send(path, request, clz, READ_RETRIES))
+        pending.add_done_callback(_retrieve_exception)
+        self._in_flight[key] = pending
+        try:
+            return await asyncio.shield(pending)
+        finally:
+            if self._in_flight.get(key) is pending:
+                del self._in_flight[key]
+
+    async def _send(self, path: str, request, clz: type[Res], retries: int) -> Res:
+        send = super().request
+        with self.stats.measure(type(request).__name__):
+            return await call_with_retry(
+                lambda: send(path, request, clz), REQUEST_TIMEOUT, retries
+            )
+
+
+class KomodoClientRegistry:
+    """Reference counted clients, one per host and credentials, and one pool per host.
+
+    Entries with the same credentials share a client, so their concurrent
+    identical reads are merged. Entries with other credentials on the same
+    host get their own client on the same keep-alive connection pool.
+    """
+
+    def __init__(self) -> None:
+        self._pools: dict[str, tuple[aiohttp.TCPConnector, int]] = {}
+        self._clients: dict[tuple[str, str, str], tuple[SharedKomodoClient, int]] = {}
+
+    def acquire(self, host: str, options: ApiKeyInitOptions) -> SharedKomodoClient:
+        """Get the client for a host and credentials, creating it on first use."""
+        key = (host, options.key, options.secret)
+        if key in self._clients:
+            client, count = self._clients[key]
+            self._clients[key] = (client, count + 1)
+            return client
+        if host in self._pools:
+            connector, count = self._pools[host]
+        else:
+            connector, count = (
+                aiohttp.TCPConnector(
+                    limit_per_host=CLIENT_CONNECTIONS_PER_HOST,
+                    keepalive_timeout=CLIENT_KEEPALIVE,
+                ),
+                0,
+            )
+            _LOGGER.debug("Created connection pool for %s", host)
+        self._pools[host] = (connector, count + 1)
+        client = SharedKomodoClient(host, options, connector)
+        self._clients[key] = (client, 1)
+        return client
+
+    async def release(self, client: SharedKomodoClient) -> None:
+        """Give a client back, closing it and its pool once nobody uses them."""
+        key = next(k for k, (c, _) in self._clients.items() if c is client)
+        _, count = self._clients[key]
+        if count > 1:
+            self._clients[key] = (client, count - 1)
+            return
+        del self._clients[key]
+        await client.close()
+        host = key[0]
+        connector, count = self._pools[host]
+        if count > 1:
+            self._pools[host] = (connector, count - 1)
+            return
+        del self._pools[host]
+        await connector.close()
+        _LOGGER.debug("Closed connection pool for %s", host)
+
+
+@callback
+def async_get_clients(hass: HomeAssistant) -> KomodoClientRegistry:
+    """The client registry of this Home Assistant instance."""
+    return hass.data.setdefault(DATA_CLIENTS, KomodoClientRegistry())
@@ -0,0 +1,149 @@
+"""Shared tracking of in-flight Komodo updates until they complete."""
+
+import asyncio
+import logging
+
+from komodo_api.lib import KomodoClient
+from komodo_api.types import (
+    GetUpdate,
+    ListUpdates,
+    Update,
+    UpdateListItem,
+    UpdateStatus,
+)
+
+from .const import (
+    COMPLETION_BACKOFF,
+    COMPLETION_MAX_INTERVAL,
+    COMPLETION_MIN_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Most update ids asked for in one ListUpdates call; it returns one page.
+_BATCH_SIZE = 100
+# Consecutive failed poll cycles after which the waiters get the error.
+_MAX_FAILURES = 5
+
+
+class CompletionTracker:
+    """Wait for Komodo updates to complete, sharing one poll loop between all waiters.
+
+    Every cycle asks for the status of all in-flight updates at once and
+    only fetches the full update (with logs) for the ones that finished. The
+    interval starts short after a new update is tracked and grows for long
+    running ones. Pushed updates from the update stream wake the loop early.
+    """
+
+    def __init__(
+        self,
+        api: KomodoClient,
+        min_interval: float = COMPLETION_MIN_INTERVAL,
+        max_interval: float = COMPLETION_MAX_INTERVAL,
+        backoff: float = COMPLETION_BACKOFF,
+    ) -> None:
+        self._api = api
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self._interval = min_interval
+        self._waiters: dict[str, list[asyncio.Future[Update]]] = {}
+        self._pushed: set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def in_flight(self) -> int:
+        """Number of updates currently waited for."""
+        return len(self._waiters)
+
+    async def wait(self, update: Update) -> Update:
+        """Wait until the update completes and return its final state."""
+        if update.status == UpdateStatus.COMPLETE:
+            return update
+        future: asyncio.Future[Update] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(update.id.oid, []).append(future)
+        self._interval = self._min_interval
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+        return await future
+
+    def handle_update(self, update: UpdateListItem) -> None:
+        """Take a pushed update into account without waiting for the next poll."""
+        if update.status == UpdateStatus.COMPLETE and update.id in self._waiters:
+            self._pushed.add(update.id)
+            self._wakeup.set()
+
+    def close(self) -> None:
+        """Stop polling and cancel everyone still waiting."""
+        if self._task is not None:
+            self._task.cancel()
+        for futures in self._waiters.values():
+            for future in futures:
+                future.cancel()
+        self._waiters.clear()
+
+    async def _poll(self) -> None:
+        failures = 0
+        while self._waiters:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                self._interval = min(self._interval * self._backoff, self._max_interval)
+            self._wakeup.clear()
+            try:
+                for update_id in await self._completed(list(self._waiters)):
+                    self._resolve(update_id, await self._get(update_id))
+                failures = 0
+            except Exception as e:  # pylint: disable=broad-except
+                failures += 1
+                _LOGGER.warning("Failed to poll %d Komodo updates: %s", len(self._waiters), e)
+                if failures >= _MAX_FAILURES:
+                    self._fail(e)
+
+    async def _completed(self, update_ids: list[str]) -> list[str]:
+        """Ids of the given updates that are complete."""
+        pushed = [update_id for update_id in update_ids if update_id in self._pushed]
+        if pushed:
+            self._pushed.difference_update(pushed)
+            return pushed
+        if len(update_ids) == 1:
+            # A single update is one request either way, and getUpdate already
+            # returns the final state.
+            update = await self._get(update_ids[0])
+            if update.status == UpdateStatus.COMPLETE:
+                self._resolve(update_ids[0], update)
+            return []
+
+        completed: list[str] = []
+        for start in range(0, len(update_ids), _BATCH_SIZE):
+            batch = update_ids[start:start + _BATCH_SIZE]
+            response = await self._api.read.listUpdates(
+                ListUpdates(query={"_id": {"$in": [{"$oid": update_id} for update_id in batch]}})
+            )
+            statuses = {item.id: item.status for item in response.updates}
+            for update_id in batch:
+                status = statuses.get(update_id)
+                if status == UpdateStatus.COMPLETE:
+                    completed.append(update_id)
+                elif status is None:
+                    # Not matched by the query, ask for it directly.
+                    update = await self._get(update_id)
+                    if update.status == UpdateStatus.COMPLETE:
+                        self._resolve(update_id, update)
+        return completed
+
+    async def _get(self, update_id: str) -> Update:
+        return await self._api.read.getUpdate(GetUpdate(id=update_id))
+
+    def _fail(self, error: Exception) -> None:
+        for futures in self._waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+        self._waiters.clear()
+
+    def _resolve(self, update_id: str, update: Update) -> None:
+        for future in self._waiters.pop(update_id, []):
+            if not future.done():
+                future.set_result(update)
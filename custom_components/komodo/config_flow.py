@@ -5,15 +5,24 @@ from typing import Any
 
 import voluptuous as vol
 
-from komodo_api.lib import KomodoClient, ApiKeyInitOptions
+from komodo_api.lib import ApiKeyInitOptions
 from komodo_api.types import GetVersion
 from komodo_api.exceptions import KomodoException
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from aiohttp import ClientConnectionError
 
-from .const import DOMAIN, CONF_HOST, CONF_API_KEY, CONF_API_SECRET
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_API_KEY,
+    CONF_API_SECRET,
+    CONF_PUSH_UPDATES,
+    DEFAULT_INTERVALS,
+    MIN_INTERVAL,
+)
+from .clients import async_get_clients
 from .utils import fix_host
 
 _LOGGER = logging.getLogger(__name__)
@@ -39,10 +48,14 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     Data has the keys from _komodo_schema with values provided by the user.
     """
     fixed_host = fix_host(data[CONF_HOST])
-    async with KomodoClient(
+    clients = async_get_clients(hass)
+    api = clients.acquire(
         fixed_host, ApiKeyInitOptions(data[CONF_API_KEY], data[CONF_API_SECRET])
-    ) as api:
+    )
+    try:
         await api.read.getVersion(GetVersion())
+    finally:
+        await clients.release(api)
 
     # Return info that you want to store in the config entry.
     return {"host": fixed_host, "title": "Komodo"}
@@ -53,6 +66,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Create the options flow."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -118,3 +139,36 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
         )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the Komodo options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        # Kept apart from config_entry, which only newer Home Assistant
+        # versions set on the flow.
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_PUSH_UPDATES,
+                    default=options.get(CONF_PUSH_UPDATES, False),
+                ): bool,
+                **{
+                    vol.Required(key, default=options.get(key, default)): vol.All(
+                        vol.Coerce(int), vol.Range(min=MIN_INTERVAL)
+                    )
+                    for key, default in DEFAULT_INTERVALS.items()
+                },
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
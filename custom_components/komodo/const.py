@@ -1,8 +1,92 @@
 """Constants for the Komodo integration."""
 
+from datetime import timedelta
+
 from homeassistant.const import CONF_HOST, CONF_API_KEY, CONF_CLIENT_SECRET
 
 DOMAIN = "komodo"
 CONF_HOST = CONF_HOST
 CONF_API_KEY = CONF_API_KEY
 CONF_API_SECRET = CONF_CLIENT_SECRET
+CONF_PUSH_UPDATES = "push_updates"
+CONF_SERVER_INTERVAL = "server_interval"
+CONF_STACK_INTERVAL = "stack_interval"
+CONF_ALERT_INTERVAL = "alert_interval"
+CONF_INSPECTION_INTERVAL = "inspection_interval"
+
+# hass.data key of the clients shared by all entries.
+DATA_CLIENTS = f"{DOMAIN}_clients"
+# Connections kept open per Komodo host, and seconds an idle one stays open.
+CLIENT_CONNECTIONS_PER_HOST = 16
+CLIENT_KEEPALIVE = 60
+# Seconds a single API call may take, and how often a read that failed with
+# a connection error or an unavailable core is retried.
+REQUEST_TIMEOUT = 10
+READ_RETRIES = 2
+# Consecutive failed inspections after which a server is skipped, and the
+# seconds (doubling up to the maximum) until it is tried again.
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60
+BREAKER_MAX_COOLDOWN = 900
+
+# Inspection results cached, at most, and the seconds a cached container
+# state and cached update info stay fresh.
+INSPECTION_CACHE_SIZE = 10000
+INSPECTION_STATE_TTL = 60
+INSPECTION_UPDATE_INFO_TTL = 7200
+
+# Limits for the container inspections done on every refresh. The per-server
+# limit stays well below the global one, so a few hung servers can't hold all
+# the slots until the deadline.
+DEFAULT_INSPECTION_CONCURRENCY = 8
+DEFAULT_INSPECTION_PER_SERVER = 2
+DEFAULT_INSPECTION_DEADLINE = 60
+
+# Alert pages requested in parallel, and the most pages fetched per refresh.
+DEFAULT_ALERT_PAGES_IN_FLIGHT = 4
+DEFAULT_ALERT_MAX_PAGES = 100
+
+# Interval to look for added, renamed or removed procedures.
+PROCEDURE_INTERVAL = timedelta(minutes=30)
+
+# Default seconds between refreshes of each part of the data. The list calls
+# are cheap and refresh often, the container inspections are expensive.
+DEFAULT_INTERVALS = {
+    CONF_SERVER_INTERVAL: 60,
+    CONF_STACK_INTERVAL: 60,
+    CONF_ALERT_INTERVAL: 30,
+    CONF_INSPECTION_INTERVAL: 300,
+}
+# Shortest interval accepted in the options.
+MIN_INTERVAL = 10
+# Per stack, the inspection interval drops to the minimum after a change or
+# an action and grows by the backoff factor with every quiet inspection, up
+# to the maximum. Stacks start at the inspection interval.
+ADAPTIVE_MIN_INTERVAL = 30
+ADAPTIVE_MAX_INTERVAL = 3600
+ADAPTIVE_BACKOFF = 2
+
+# Interval of the servers, stacks and inspections while the update stream
+# pushes their changes. Alerts keep their own interval.
+PUSH_RECONCILE_INTERVAL = timedelta(minutes=30)
+# Seconds to wait before reconnecting a dropped update stream.
+PUSH_RETRY_DELAY = 10
+
+# Version of the on-disk cache of the last data, and the seconds a save waits
+# for further refreshes.
+CACHE_VERSION = 2
+CACHE_SAVE_DELAY = 60
+
+# Seconds to collect stacks touched by actions before refreshing them at once.
+STACK_REFRESH_DELAY = 1
+
+# Seconds between polls for in-flight updates: the first poll comes quickly,
+# later ones back off for long running deploys.
+COMPLETION_MIN_INTERVAL = 0.5
+COMPLETION_MAX_INTERVAL = 10
+COMPLETION_BACKOFF = 1.5
+
+# Stacks deployed at the same time on one server by bulk updates, and the
+# seconds installs are collected into one bulk deploy.
+DEFAULT_DEPLOY_PER_SERVER = 2
+DEPLOY_BATCH_WINDOW = 0.5
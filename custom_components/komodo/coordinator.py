@@ -4,10 +4,15 @@ import asyncio
 import logging
 import time
 from datetime import timedelta
-from typing import List
+from functools import partial
+from typing import Collection, List, Mapping
 
 from komodo_api.exceptions import KomodoException
-from komodo_api.types import InspectStackContainer, InspectStackContainerResponse
+from komodo_api.types import (
+    InspectStackContainer,
+    InspectStackContainerResponse,
+    ReadRequestInspectStackContainer,
+)
 
 from komodo_api.lib import KomodoClient
 from komodo_api.types import (
@@ -18,19 +23,61 @@ from komodo_api.types import (
     ListStacks,
     ListAlerts,
     ListStackServices,
+    ResourceTargetServer,
+    ResourceTargetStack,
     ServerListItem,
     StackListItem,
+    StackQuery,
     StackService,
+    StackState,
+    UpdateListItem,
+    UpdateStatus,
 )
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .data.komodo_data import KomodoData
-from .data.stack import KomodoStack
-from .data.service import KomodoService, KomodoUpdateInfo
+from .const import (
+    ADAPTIVE_BACKOFF,
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_MIN_INTERVAL,
+    BREAKER_COOLDOWN,
+    BREAKER_MAX_COOLDOWN,
+    BREAKER_THRESHOLD,
+    CONF_ALERT_INTERVAL,
+    CONF_INSPECTION_INTERVAL,
+    CONF_SERVER_INTERVAL,
+    CONF_STACK_INTERVAL,
+    DEFAULT_ALERT_MAX_PAGES,
+    DEFAULT_ALERT_PAGES_IN_FLIGHT,
+    DEFAULT_INSPECTION_CONCURRENCY,
+    DEFAULT_INSPECTION_DEADLINE,
+    DEFAULT_INSPECTION_PER_SERVER,
+    DEFAULT_INTERVALS,
+    INSPECTION_CACHE_SIZE,
+    INSPECTION_STATE_TTL,
+    INSPECTION_UPDATE_INFO_TTL,
+    PUSH_RECONCILE_INTERVAL,
+    STACK_REFRESH_DELAY,
+)
+from .data.alerts import KomodoAlerts
+from .data.komodo_data import ALERTS, SERVERS, STACKS, KomodoData
+from .data.service import (
+    InspectedContainer,
+    InspectionRecord,
+    KomodoUpdateInfo,
+)
+from .inspection_cache import InspectionCache
+from .resilience import CircuitBreaker
+from .scheduler import AdaptiveSchedule, InspectionScheduler
+from .stats import RefreshStats
 
 _LOGGER = logging.getLogger(__name__)
+# Full docker inspect payloads are large, so they are only parsed and logged
+# when this logger is set to debug on its own, e.g.
+# custom_components.komodo.coordinator.payloads: debug in the logger config.
+_PAYLOAD_LOGGER = logging.getLogger(f"{__name__}.payloads")
+_PAYLOAD_LOGGER.setLevel(logging.INFO)
 
 # Substring of the error Komodo core returns when a stack has no container for
 # the service (see bin/core/src/api/read/stack.rs). The core sends it with the
@@ -38,21 +85,227 @@ _LOGGER = logging.getLogger(__name__)
 # genuine internal error.
 _NO_CONTAINER_ERROR = "No service found matching"
 
+# Stack states that are about to change, so the stack is inspected quickly.
+_BUSY_STATES = frozenset({StackState.DEPLOYING, StackState.RESTARTING})
+
+
+def _size(response) -> int:
+    """Number of items in a list response."""
+    return response.count if isinstance(response, KomodoAlerts) else len(response)
+
 
 class KomodoCoordinator(DataUpdateCoordinator[KomodoData]):
     """Komodo coordinator."""
 
-    def __init__(self, hass: HomeAssistant, my_api: KomodoClient) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        my_api: KomodoClient,
+        inspection_concurrency: int = DEFAULT_INSPECTION_CONCURRENCY,
+        inspection_per_server: int = DEFAULT_INSPECTION_PER_SERVER,
+        inspection_deadline: float = DEFAULT_INSPECTION_DEADLINE,
+        incremental: bool = True,
+        alert_pages_in_flight: int = DEFAULT_ALERT_PAGES_IN_FLIGHT,
+        alert_max_pages: int = DEFAULT_ALERT_MAX_PAGES,
+        stack_refresh_delay: float = STACK_REFRESH_DELAY,
+        fast_start: bool = True,
+        intervals: Mapping[str, float] | None = None,
+    ) -> None:
         """Initialize my coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             # Name of the data. For logging purposes.
             name="KomodoData",
-            update_interval=timedelta(minutes=5),
+            update_interval=None,
         )
         self.my_api = my_api
         self._service_timestamps: dict[tuple[str, str], float] = {}
+        self._scheduler = InspectionScheduler(
+            inspection_concurrency, inspection_per_server, inspection_deadline
+        )
+        self._incremental = incremental
+        self._alert_pages_in_flight = max(1, alert_pages_in_flight)
+        self._alert_max_pages = max(1, alert_max_pages)
+        self._notified: tuple[KomodoData | None, bool] = (None, True)
+        # Serializes full and partial refreshes, so neither builds on stale data.
+        self._refresh_lock = asyncio.Lock()
+        self._stack_refresh_delay = stack_refresh_delay
+        self._pending_stacks: set[str] = set()
+        self._stack_refresh: asyncio.Task | None = None
+        self._fast_start = fast_start
+        # Seconds between refreshes per part of the data (the CONF_*_INTERVAL
+        # keys), and when each part was last refreshed successfully.
+        self._intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self._last_refreshed: dict[str, float] = {}
+        self._push_connected = False
+        self._update_tick()
+        # When each stack is inspected next, adapting to how often it changes.
+        self._inspections = AdaptiveSchedule(
+            ADAPTIVE_MIN_INTERVAL, ADAPTIVE_MAX_INTERVAL, ADAPTIVE_BACKOFF
+        )
+        # Servers whose inspections keep failing are skipped for a while.
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN, BREAKER_MAX_COOLDOWN)
+        self._inspected_at: dict[str, float] = {}
+        self.inspection_cache = InspectionCache(
+            INSPECTION_CACHE_SIZE, INSPECTION_STATE_TTL, INSPECTION_UPDATE_INFO_TTL
+        )
+        self.stats = RefreshStats()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose key changed in the latest refresh.
+
+        Listeners without a key, and every listener when availability changed
+        or no diff is known, are always notified.
+        """
+        data = self.data
+        notified_data, notified_success = self._notified
+        self._notified = (data, self.last_update_success)
+        if (
+            data is None
+            or data is notified_data
+            or notified_success != self.last_update_success
+        ):
+            super().async_update_listeners()
+            return
+
+        diff = data.diff
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or diff.affects(context):
+                update_callback()
+
+    @callback
+    def async_restore(self, data: KomodoData) -> None:
+        """Start from cached data until the first refresh replaces it."""
+        self.data = data
+
+    @callback
+    def async_set_push_connected(self, connected: bool) -> None:
+        """Only reconcile slowly while the update stream delivers changes."""
+        self._push_connected = connected
+        self._update_tick()
+
+    def _interval(self, part: str) -> float:
+        """Seconds between refreshes of one part of the data."""
+        if self._push_connected and part != CONF_ALERT_INTERVAL:
+            return max(self._intervals[part], PUSH_RECONCILE_INTERVAL.total_seconds())
+        return self._intervals[part]
+
+    def _update_tick(self) -> None:
+        """Run the coordinator as often as the most frequent part needs."""
+        self.update_interval = timedelta(
+            seconds=min(self._interval(part) for part in self._intervals)
+        )
+
+    def _due(self, part: str, now: float) -> bool:
+        last = self._last_refreshed.get(part)
+        # Half a second of slack, so a part isn't pushed back a whole tick.
+        return last is None or now - last >= self._interval(part) - 0.5
+
+    @callback
+    def async_handle_update(self, update: UpdateListItem) -> None:
+        """Refresh the stacks touched by a finished Komodo update."""
+        if update.status != UpdateStatus.COMPLETE or self.data is None:
+            return
+        target = update.target
+        if isinstance(target, ResourceTargetStack):
+            stack_ids = {target.id}
+        elif isinstance(target, ResourceTargetServer):
+            # Container actions target the server, so refresh all its stacks.
+            # The update doesn't say which containers it started or stopped,
+            # so none of their cached states can be trusted.
+            stack_ids = {
+                stack.id for stack in self.data.stacks.values()
+                if stack.server_id == target.id
+            }
+        else:
+            return
+        if stack_ids:
+            self.hass.async_create_task(self.async_request_stack_refresh(stack_ids))
+
+    async def async_request_stack_refresh(
+        self, stack_ids: Collection[str], invalidate: bool = True
+    ) -> None:
+        """Refresh the given stacks soon, together with other requests in the meantime.
+
+        Requests within stack_refresh_delay of the first one are merged into one
+        async_refresh_stacks call, which all of them wait for. With invalidate,
+        e.g. after a deploy, start or stop, the cached container states of the
+        stacks are dropped so their services are inspected again.
+        """
+        self._pending_stacks.update(stack_ids)
+        for stack_id in stack_ids:
+            # Something happens on the stack, keep an eye on it for a while.
+            self._inspections.reset(stack_id)
+            if invalidate:
+                self._invalidate_inspections(self.data, stack_id)
+        if self._stack_refresh is None:
+            self._stack_refresh = asyncio.create_task(self._refresh_pending_stacks())
+        await asyncio.shield(self._stack_refresh)
+
+    async def _refresh_pending_stacks(self) -> None:
+        await asyncio.sleep(self._stack_refresh_delay)
+        stack_ids, self._pending_stacks = self._pending_stacks, set()
+        # Requests from now on start the next refresh.
+        self._stack_refresh = None
+        await self.async_refresh_stacks(stack_ids)
+
+    async def async_shutdown(self) -> None:
+        """Cancel a pending stack refresh."""
+        await super().async_shutdown()
+        if self._stack_refresh is not None:
+            self._stack_refresh.cancel()
+            self._stack_refresh = None
+
+    async def async_refresh_stacks(self, stack_ids: Collection[str]) -> None:
+        """Re-read and re-inspect only the given stacks, keeping everything else.
+
+        Stacks that aren't known yet need a full refresh instead. Stacks that
+        no longer match their name, e.g. after a rename, are carried over as
+        they were until the full refresh that follows finds them.
+        """
+        if self.data is None or any(stack_id not in self.data.stacks for stack_id in stack_ids):
+            await self.async_request_full_refresh()
+            return
+
+        async with self._refresh_lock, self.stats.track("stacks"):
+            previous = self.data
+            names = [previous.stacks[stack_id].name for stack_id in stack_ids]
+            try:
+                stacks = await self.my_api.read.listStacks(
+                    ListStacks(query=StackQuery(names=names))
+                )
+            except Exception as e:
+                _LOGGER.error("Error refreshing stacks %s: %s", ", ".join(names), e)
+                return
+
+            listed = {stack.id for stack in stacks}
+            missing = set(stack_ids) - listed
+            data = KomodoData(previous)
+            data.add_previous_servers()
+            # Missing stacks are carried over, so they aren't reported as removed.
+            data.add_previous_stacks(skip=listed)
+            data.add_stacks(stacks)
+            data.add_previous_alerts()
+            stack_ids = [stack_id for stack_id in stack_ids if stack_id in listed]
+            for stack_id in stack_ids:
+                if not data.stacks[stack_id].unchanged_since(previous.stacks[stack_id]):
+                    self._invalidate_inspections(data, stack_id)
+            await self._inspect_services(data, stack_ids, cached_states=True)
+            self._observe_inspections(data, previous, stack_ids, time.monotonic())
+            diff = data.finish_diff()
+            self.inspection_cache.forget(diff.removed_services)
+            _LOGGER.debug("Changes for stacks %s: %s", ", ".join(names), diff)
+            self.async_set_updated_data(data)
+
+        if missing:
+            await self.async_request_full_refresh()
+
+    async def async_request_full_refresh(self) -> None:
+        """Request a refresh of every part of the data, due or not."""
+        self._last_refreshed.clear()
+        await self.async_request_refresh()
 
     async def _async_update_data(self):
         """Fetch data from API endpoint.
@@ -60,98 +313,273 @@ class KomodoCoordinator(DataUpdateCoordinator[KomodoData]):
         This is the place to pre-process the data to lookup tables
         so entities can quickly look up their data.
         """
+        async with self._refresh_lock, self.stats.track("full"):
+            # With fast start, the first refresh only lists the resources and
+            # async_inspect_services fills in the services afterwards.
+            return await self._fetch_data(inspect=self.data is not None or not self._fast_start)
+
+    async def async_inspect_services(self) -> None:
+        """Inspect all services of the current data and publish the result."""
+        async with self._refresh_lock, self.stats.track("inspections"):
+            if self.data is None:
+                return
+            data = KomodoData(self.data)
+            data.add_previous_servers()
+            data.add_previous_stacks(skip=())
+            data.add_previous_alerts()
+            await self._inspect_services(data, cached_states=True)
+            self._observe_inspections(data, self.data, data.stacks.keys(), time.monotonic())
+            _LOGGER.debug("Changes from inspections: %s", data.finish_diff())
+            self.async_set_updated_data(data)
+
+    async def _fetch_data(self, inspect: bool = True) -> KomodoData:
+        """Fetch the servers, stacks and alerts that are due and inspect the services.
+
+        Parts that aren't due yet, or whose list call failed, are carried over
+        from the previous data. Stacks that changed are inspected right away,
+        the others when their adaptive inspection interval is up.
+        """
         # Note: asyncio.TimeoutError and aiohttp.ClientError are already
         # handled by the data update coordinator.
-        async with asyncio.timeout(10):
-            tasks = [
-                self.my_api.read.listServers(ListServers()),
-                self.my_api.read.listStacks(ListStacks()),
-                self.my_api.read.listAlerts(
-                    ListAlerts(
-                        query={"resolved": False},
-                    )
-                ),
-            ]
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
-            _LOGGER.debug("Server response: %s", responses[0])
-            _LOGGER.debug("Stack response: %s", responses[1])
-            _LOGGER.debug("Alert response: %s", responses[2])
-            data = KomodoData()
-
-            # Servers
-            if isinstance(responses[0], Exception):
-                _LOGGER.error("Error fetching servers", exc_info=responses[0])
-            else:
-                data.add_servers(responses[0])
+        previous = self.data if self._incremental else None
+        now = time.monotonic()
+        due = {
+            part for part in (CONF_SERVER_INTERVAL, CONF_STACK_INTERVAL, CONF_ALERT_INTERVAL)
+            if previous is None or self._due(part, now)
+        }
+        calls = {}
+        if CONF_SERVER_INTERVAL in due:
+            calls[CONF_SERVER_INTERVAL] = self.my_api.read.listServers(ListServers())
+        if CONF_STACK_INTERVAL in due:
+            calls[CONF_STACK_INTERVAL] = self.my_api.read.listStacks(ListStacks())
+        if CONF_ALERT_INTERVAL in due:
+            calls[CONF_ALERT_INTERVAL] = self._fetch_alerts()
+        # Every call has its own deadline in the client, so a hung call only
+        # fails its part, which is then carried over as stale.
+        responses = dict(zip(
+            calls, await asyncio.gather(*calls.values(), return_exceptions=True)
+        ))
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            # Only sizes, formatting the responses of a large fleet is expensive.
+            _LOGGER.debug("Refreshing %s: %s", ", ".join(sorted(due)), {
+                part: response if isinstance(response, Exception) else _size(response)
+                for part, response in responses.items()
+            })
 
-            # Stacks
-            if isinstance(responses[1], Exception):
-                _LOGGER.error("Error fetching stacks", exc_info=responses[1])
-            else:
-                data.add_stacks(responses[1])
-
-            # Alerts
-            if isinstance(responses[2], Exception):
-                _LOGGER.error("Error fetching alerts", exc_info=responses[2])
-            else:
-                # TODO we currently only fetch the first page of alerts
-                data.add_alerts(responses[2])
+        data = KomodoData(previous)
+        for part, section, add, add_previous in (
+            (CONF_SERVER_INTERVAL, SERVERS, data.add_servers, data.add_previous_servers),
+            (
+                CONF_STACK_INTERVAL, STACKS,
+                data.add_stacks, partial(data.add_previous_stacks, skip=()),
+            ),
+            (CONF_ALERT_INTERVAL, ALERTS, data.add_alerts, data.add_previous_alerts),
+        ):
+            response = responses.get(part)
+            if part in responses and not isinstance(response, Exception):
+                add(response)
+                data.mark_refreshed(section, time.time())
+                self._last_refreshed[part] = now
+                continue
+            if response is not None:
+                _LOGGER.error("Error fetching %s", section, exc_info=response)
+            # A failed list call keeps the previous resources, instead of
+            # dropping them and removing their entities.
+            if previous is not None:
+                add_previous()
+                if response is not None:
+                    data.mark_stale(section)
 
-        await self._compute_update_info(data)
-        await self._fetch_service_states(data)
+        if inspect:
+            stack_ids = {
+                stack_id for stack_id, stack in data.stacks.items()
+                if previous is None
+                or not stack.unchanged_since(previous.stacks.get(stack_id))
+                or self._inspections.due(stack_id, now)
+            }
+            if stack_ids:
+                await self._inspect_services(data, stack_ids)
+                self._observe_inspections(data, previous, stack_ids, now)
+        diff = data.finish_diff()
+        for stack_id in diff.removed_stacks:
+            self._inspections.forget(stack_id)
+        self.inspection_cache.forget(diff.removed_services)
+        _LOGGER.debug("Changes: %s", diff)
         return data
 
-    async def _compute_update_info(self, new_data: KomodoData):
-        """Compute update info for services."""
-        for stack_id, stack in new_data.stacks.items():
-            previous_stack = self.data.stacks[stack_id] if self.data else None
-            for service_id, service in stack.services.items():
-                previous_service = previous_stack.services.get(service_id) if previous_stack else None
-                await self._inspect_service_if_needed(stack, service, stack_id, previous_service)
+    def _observe_inspections(
+        self,
+        data: KomodoData,
+        previous: KomodoData | None,
+        stack_ids: Collection[str],
+        now: float,
+    ) -> None:
+        """Schedule the next inspection of each inspected stack.
 
-    async def _inspect_service_if_needed(
+        Stacks whose list item or any service changed since the previous
+        data, and stacks in a busy state, are inspected again soon. Quiet
+        stacks back off.
+        """
+        base = self._interval(CONF_INSPECTION_INTERVAL)
+        changed_services = {stack_id for stack_id, _ in data.diff.services}
+        for stack_id in stack_ids:
+            stack = data.stacks.get(stack_id)
+            if stack is None:
+                continue
+            changed = (
+                stack_id in changed_services
+                or (
+                    previous is not None
+                    and not stack.unchanged_since(previous.stacks.get(stack_id))
+                )
+                or stack.state in _BUSY_STATES
+            )
+            self._inspections.observe(stack_id, changed, now, base)
+
+    async def _fetch_alerts(self) -> KomodoAlerts:
+        """Fetch all pages of unresolved alerts.
+
+        The first page is fetched alone; if there are more, the following
+        pages are requested a window at a time and aggregated as they
+        arrive. Pages past the end come back empty and are ignored.
+        """
+        alerts = KomodoAlerts()
+        alerts.add_page(await self._list_alerts(0))
+        page = 1
+        while not alerts.complete:
+            if alerts.pages >= self._alert_max_pages:
+                _LOGGER.warning(
+                    "Stopped fetching alerts after %d pages, the alert count is incomplete",
+                    alerts.pages,
+                )
+                break
+            window = range(page, min(page + self._alert_pages_in_flight, self._alert_max_pages))
+            for response in await asyncio.gather(*(self._list_alerts(p) for p in window)):
+                alerts.add_page(response)
+                if alerts.complete:
+                    break
+            page = window.stop
+        _LOGGER.debug("Fetched %d alerts in %d pages", alerts.count, alerts.pages)
+        return alerts
+
+    async def _list_alerts(self, page: int) -> ListAlertsResponse:
+        return await self.my_api.read.listAlerts(
+            ListAlerts(query={"resolved": False}, page=page)
+        )
+
+    async def _inspect_services(
         self,
-        stack: KomodoStack,
-        service: KomodoService,
-        stack_id: str,
-        previous_service: KomodoService | None,
+        data: KomodoData,
+        stack_ids: Collection[str] | None = None,
+        cached_states: bool = False,
     ) -> None:
-        if not service.update_available:
-            return
+        """Inspect every planned service once and apply the result.
 
+        Services on a server whose breaker is open keep their last known
+        state and update info. With cached_states, services whose state is
+        fresh in the inspection cache take it from there instead.
+        """
+        plan = self._plan_inspections(data, stack_ids)
         now = time.time()
-        previous_update_info = previous_service.update_info if previous_service else None
-        if (
-            previous_update_info
-            and (now - previous_update_info.info.info_updated_at) < 7200
-        ):
-            service.update_info = previous_update_info
-        elif stack.has_inspectable_container:
-            await self._inspect_service(service, stack_id, now)
-        else:
-            # No container to inspect (stack DOWN/UNKNOWN). Carry any cached
-            # update info forward so a pending update isn't lost while the
-            # stack is down and reported as installed=0/latest=0.
-            service.update_info = previous_update_info
-
-    async def _fetch_service_states(self, data: KomodoData):
-        """Fetch service states for all services."""
-        tasks = []
+        monotonic = time.monotonic()
+        reused = 0
+        if cached_states:
+            for key in list(plan):
+                cached = self.inspection_cache.state(key, monotonic)
+                if cached is not None:
+                    del plan[key]
+                    reused += 1
+                    self._apply_inspection(data, key, cached, False, now, monotonic)
+        server_ids = set(plan.values())
+        skipped = {
+            server_id for server_id in server_ids
+            if not self.breaker.allow(server_id, monotonic)
+        }
+        if skipped:
+            _LOGGER.debug("Skipping inspections on unreachable servers %s", ", ".join(skipped))
+        self.stats.record_inspections(
+            sum(server_id not in skipped for server_id in plan.values()), reused
+        )
+        await self._scheduler.run(
+            (
+                server_id,
+                partial(self._inspect_service, data, key, now, server_id=server_id),
+            )
+            for key, server_id in plan.items()
+            if server_id not in skipped
+        )
+        for server_id in server_ids:
+            if self.breaker.is_open(server_id):
+                data.stale_servers[server_id] = self._inspected_at.get(server_id)
+            else:
+                data.stale_servers.pop(server_id, None)
+
+    def _invalidate_inspections(self, data: KomodoData | None, stack_id: str) -> None:
+        """Drop the cached container states of the services of a stack."""
+        stack = data.stacks.get(stack_id) if data is not None else None
+        if stack is not None:
+            self.inspection_cache.invalidate((stack_id, name) for name in stack.services)
+
+    def _plan_inspections(
+        self, data: KomodoData, stack_ids: Collection[str] | None = None
+    ) -> dict[tuple[str, str], str]:
+        """Work out which (stack, service) pairs to inspect in this refresh, with their server.
+
+        One inspection per pair feeds both the service state and its update
+        info. Cached update info is carried forward first, so it survives a
+        stack without an inspectable container or a failed inspection. The
+        last inspection record of inspectable stacks is carried forward too,
+        for services whose inspection fails or is skipped. With
+        stack_ids, only those stacks are planned.
+        """
+        plan: dict[tuple[str, str], str] = {}
         for stack_id, stack in data.stacks.items():
-            if not stack.has_inspectable_container:
+            if stack_ids is not None and stack_id not in stack_ids:
                 continue
-            for service in stack.services.values():
-                if service.state is None:
-                    tasks.append(self._inspect_service(service, stack_id, time.time()))
-        await asyncio.gather(*tasks)
+            previous_stack = self.data.stacks.get(stack_id) if self.data else None
+            for service_name, service in stack.services.items():
+                previous_service = previous_stack.services.get(service_name) if previous_stack else None
+                inspection, update_info = service.inspection, service.update_info
+                if service.update_available and previous_service:
+                    update_info = previous_service.update_info
+                if stack.has_inspectable_container:
+                    if previous_service is not None:
+                        inspection = previous_service.inspection
+                    plan[(stack_id, service_name)] = stack.server_id
+                # A no-op for stacks shared with the previous data.
+                data.set_inspection(stack_id, service_name, inspection, update_info)
+        return plan
 
-    async def _inspect_service(self, service: KomodoService, stack_id: str, updated_at: float):
-        """Inspect a service to get update info."""
+    def _record_inspection(self, server_id: str | None, succeeded: bool) -> None:
+        if server_id is None:
+            return
+        if succeeded:
+            self.breaker.record_success(server_id)
+            self._inspected_at[server_id] = time.time()
+        elif self.breaker.record_failure(server_id, time.monotonic()):
+            _LOGGER.warning("Inspections on server %s keep failing, pausing them", server_id)
+
+    async def _inspect_service(
+        self,
+        data: KomodoData,
+        key: tuple[str, str],
+        updated_at: float,
+        server_id: str | None = None,
+    ):
+        """Inspect a service to get its state and update info.
+
+        With server_id, the outcome is recorded in the breaker of that server.
+        """
+        stack_id, name = key
+        log_payload = _PAYLOAD_LOGGER.isEnabledFor(logging.DEBUG)
         try:
-            response = await self.my_api.read.inspectStackContainer(
-                InspectStackContainer(stack=stack_id, service=service.name)
+            response = await self.my_api.request(
+                "read",
+                ReadRequestInspectStackContainer(
+                    params=InspectStackContainer(stack=stack_id, service=name)
+                ),
+                InspectStackContainerResponse if log_payload else InspectedContainer,
             )
-            _LOGGER.debug("Inspecting service %s in stack %s: %s", service.name, stack_id, response)
         except KomodoException as e:
             if _NO_CONTAINER_ERROR in e.error:
                 # Expected when a stack in a state we didn't guard against
@@ -159,17 +587,56 @@ class KomodoCoordinator(DataUpdateCoordinator[KomodoData]):
                 # the compose file) has no container for this service.
                 _LOGGER.debug(
                     "No container to inspect for service %s in stack %s: %s",
-                    service.name, stack_id, e.error,
+                    name, stack_id, e.error,
                 )
+                self._record_inspection(server_id, True)
             else:
                 _LOGGER.error(
                     "Failed to inspect service %s in stack %s: %s",
-                    service.name, stack_id, e.error,
+                    name, stack_id, e.error,
                 )
+                self._record_inspection(server_id, False)
             return
         except Exception as e:
-            _LOGGER.error("Failed to inspect service %s in stack %s: %s", service.name, stack_id, e)
+            _LOGGER.error("Failed to inspect service %s in stack %s: %s", name, stack_id, e)
+            self._record_inspection(server_id, False)
             return
-        service.state = response.state
+        self._record_inspection(server_id, True)
+        if log_payload:
+            _PAYLOAD_LOGGER.debug(
+                "Inspected service %s in stack %s: %s", name, stack_id, response
+            )
+        # Only the record is kept, the parsed response is dropped right here.
+        record = InspectionRecord.from_container(response)
+        _LOGGER.debug("Inspected service %s in stack %s: %s", name, stack_id, record)
+        monotonic = time.monotonic()
+        self.inspection_cache.put_state(key, record, monotonic)
+        self._apply_inspection(data, key, record, True, updated_at, monotonic)
+
+    def _apply_inspection(
+        self,
+        data: KomodoData,
+        key: tuple[str, str],
+        record: InspectionRecord,
+        inspected: bool,
+        updated_at: float,
+        monotonic: float,
+    ) -> None:
+        """Apply an inspected or cached record, and the update info of its container.
+
+        Update info is taken from the cache while it is fresh, so the same
+        object is kept and the update entity isn't written again; otherwise
+        it is built from the record of a new inspection.
+        """
+        stack_id, name = key
+        service = data.stacks[stack_id].services[name]
+        update_info = service.update_info
         if service.update_available:
-            service.update_info = KomodoUpdateInfo(response, updated_at)
+            cached = self.inspection_cache.update_info(key, monotonic)
+            if cached is None and inspected:
+                cached = KomodoUpdateInfo(record, updated_at)
+                self.inspection_cache.put_update_info(key, cached, monotonic)
+            if cached is not None:
+                update_info = cached
+        if data.set_inspection(stack_id, name, record, update_info):
+            data.diff.services.add(key)
@@ -0,0 +1,116 @@
+import sys
+
+from komodo_api.types import (
+    ListAlertsResponse,
+    ResourceTargetServer,
+    ResourceTargetStack,
+)
+
+
+class KomodoAlerts:
+    """Alert counts and types aggregated page by page.
+
+    Only the alert type names are kept, so a page can be dropped as soon as
+    it has been added. The names are interned, so the thousands of copies the
+    pages hold reduce to one string per alert type.
+
+    `summary`, `server_summaries` and `stack_summaries` render the types for
+    the sensors once per fetch. They are interned too, so a summary that did
+    not change since the last fetch, or that several targets share, is the
+    same string object.
+    """
+
+    __slots__ = (
+        "count", "types", "server_types", "stack_types", "pages", "complete",
+        "_summaries",
+    )
+
+    count: int
+    types: list[str]
+    server_types: dict[str, list[str]]
+    stack_types: dict[str, list[str]]
+    pages: int
+    complete: bool
+
+    def __init__(self):
+        self.count = 0
+        self.types = []
+        self.server_types = {}
+        self.stack_types = {}
+        self.pages = 0
+        self.complete = False
+        self._summaries: tuple[str, dict[str, str], dict[str, str]] | None = None
+
+    def add_page(self, page: ListAlertsResponse) -> None:
+        """Aggregate one page of alerts."""
+        self.pages += 1
+        self.count += len(page.alerts)
+        self._summaries = None
+        for alert in page.alerts:
+            # Known types are parsed into AlertDataTypes members, str
+            # subclasses that sys.intern refuses, so keep their plain value.
+            alert_type = sys.intern(getattr(alert.data.type, "value", alert.data.type))
+            self.types.append(alert_type)
+            if isinstance(alert.target, ResourceTargetServer):
+                self.server_types.setdefault(alert.target.id, []).append(alert_type)
+            elif isinstance(alert.target, ResourceTargetStack):
+                self.stack_types.setdefault(alert.target.id, []).append(alert_type)
+        if page.next_page is None:
+            self.complete = True
+
+    @property
+    def summary(self) -> str:
+        """All alert types, comma separated."""
+        return self._render()[0]
+
+    @property
+    def server_summaries(self) -> dict[str, str]:
+        """Alert types per server id, comma separated."""
+        return self._render()[1]
+
+    @property
+    def stack_summaries(self) -> dict[str, str]:
+        """Alert types per stack id, comma separated."""
+        return self._render()[2]
+
+    def _render(self) -> tuple[str, dict[str, str], dict[str, str]]:
+        if self._summaries is None:
+            self._summaries = (
+                _render(self.types),
+                {server_id: _render(types) for server_id, types in self.server_types.items()},
+                {stack_id: _render(types) for stack_id, types in self.stack_types.items()},
+            )
+        return self._summaries
+
+    def as_dict(self) -> dict:
+        """JSON serializable form for the cache."""
+        return {
+            "count": self.count,
+            "types": self.types,
+            "server_types": self.server_types,
+            "stack_types": self.stack_types,
+            "pages": self.pages,
+            "complete": self.complete,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KomodoAlerts":
+        """Restore the aggregated alerts from the cache."""
+        self = cls()
+        self.count = data["count"]
+        self.types = [sys.intern(t) for t in data["types"]]
+        self.server_types = {
+            server_id: [sys.intern(t) for t in types]
+            for server_id, types in data["server_types"].items()
+        }
+        self.stack_types = {
+            stack_id: [sys.intern(t) for t in types]
+            for stack_id, types in data["stack_types"].items()
+        }
+        self.pages = data["pages"]
+        self.complete = data["complete"]
+        return self
+
+
+def _render(types: list[str]) -> str:
+    return sys.intern(", ".join(types))
@@ -0,0 +1,73 @@
+"""Changes between two refreshes and the keys entities subscribe with."""
+
+# Keys entities pass as coordinator context to be notified about one object.
+ALERTS_KEY = ("alerts",)
+
+
+def server_key(server_id: str) -> tuple:
+    """Key of a server."""
+    return ("server", server_id)
+
+
+def stack_key(stack_id: str) -> tuple:
+    """Key of a stack."""
+    return ("stack", stack_id)
+
+
+def service_key(stack_id: str, service_name: str) -> tuple:
+    """Key of a service in a stack."""
+    return ("service", stack_id, service_name)
+
+
+class KomodoDataDiff:
+    """Ids of everything that changed compared to the previous refresh."""
+
+    full: bool
+    alerts: bool
+    servers: set[str]
+    stacks: set[str]
+    services: set[tuple[str, str]]
+    added_servers: set[str]
+    added_stacks: set[str]
+    added_services: set[tuple[str, str]]
+    removed_servers: set[str]
+    removed_stacks: set[str]
+    removed_services: set[tuple[str, str]]
+
+    def __init__(self, full: bool = False):
+        self.full = full
+        self.alerts = False
+        self.servers = set()
+        self.stacks = set()
+        self.services = set()
+        self.added_servers = set()
+        self.added_stacks = set()
+        self.added_services = set()
+        self.removed_servers = set()
+        self.removed_stacks = set()
+        self.removed_services = set()
+
+    def __bool__(self) -> bool:
+        return self.full or self.alerts or bool(self.servers or self.stacks or self.services)
+
+    def affects(self, key: tuple) -> bool:
+        """Whether the object behind a subscription key changed."""
+        if self.full:
+            return True
+        kind = key[0]
+        if kind == "server":
+            return key[1] in self.servers or key[1] in self.removed_servers
+        if kind == "stack":
+            return key[1] in self.stacks or key[1] in self.removed_stacks
+        if kind == "service":
+            service = (key[1], key[2])
+            return service in self.services or service in self.removed_services
+        if kind == "alerts":
+            return self.alerts
+        return True
+
+    def __repr__(self) -> str:
+        return (
+            f"KomodoDataDiff(full={self.full}, alerts={self.alerts}, servers={len(self.servers)}, "
+            f"stacks={len(self.stacks)}, services={len(self.services)})"
+        )
@@ -0,0 +1,91 @@
+"""Values entities show, resolved once per refresh and looked up by subscription key."""
+
+from typing import Iterable, NamedTuple
+
+from .diff import server_key, service_key, stack_key
+from .server import KomodoServer
+from .service import KomodoService
+from .stack import KomodoStack
+
+
+class ServerValues(NamedTuple):
+    """Values of the sensors of a server."""
+
+    state: str | None
+    alerts: str
+    stack_count: int
+    service_count: int
+
+
+class StackValues(NamedTuple):
+    """Values of the sensors of a stack."""
+
+    state: str | None
+    alerts: str
+
+
+class ServiceValues(NamedTuple):
+    """Values of the switch and the update entity of a service."""
+
+    running: bool | None
+    container_id: str | None
+    installed_version: str | None
+    latest_version: str | None
+
+
+# What the entities of a resource missing from the data show.
+UNKNOWN_SERVER = ServerValues(None, "", 0, 0)
+UNKNOWN_STACK = StackValues(None, "")
+UNKNOWN_SERVICE = ServiceValues(None, None, None, None)
+
+
+def server_values(server: KomodoServer) -> ServerValues:
+    return ServerValues(
+        server.state.name if server.state is not None else None,
+        server.alerts,
+        server.stack_count,
+        server.service_count,
+    )
+
+
+def stack_values(stack: KomodoStack) -> StackValues:
+    return StackValues(
+        stack.state.name if stack.state is not None else None,
+        stack.alerts,
+    )
+
+
+def service_values(service: KomodoService) -> ServiceValues:
+    info = service.update_info
+    return ServiceValues(
+        service.running,
+        service.container_id,
+        info.current_version if info is not None else None,
+        info.new_version if info is not None else None,
+    )
+
+
+def _put(index: dict, key: tuple, values: tuple) -> None:
+    # Keep the previous tuple when nothing changed, so entities can tell by identity.
+    if index.get(key) != values:
+        index[key] = values
+
+
+def index_servers(index: dict, servers: dict[str, KomodoServer], ids: Iterable[str]) -> None:
+    """Resolve the given servers into the index."""
+    for server_id in ids:
+        _put(index, server_key(server_id), server_values(servers[server_id]))
+
+
+def index_stacks(index: dict, stacks: dict[str, KomodoStack], ids: Iterable[str]) -> None:
+    """Resolve the given stacks, but not their services, into the index."""
+    for stack_id in ids:
+        _put(index, stack_key(stack_id), stack_values(stacks[stack_id]))
+
+
+def index_services(
+    index: dict, stacks: dict[str, KomodoStack], ids: Iterable[tuple[str, str]]
+) -> None:
+    """Resolve the given (stack id, service name) pairs into the index."""
+    for stack_id, name in ids:
+        _put(index, service_key(stack_id, name), service_values(stacks[stack_id].services[name]))
@@ -1,70 +1,355 @@
 # Arrange servers into a mapping where the key is the name property
-from typing import List, Mapping, Optional
+from types import MappingProxyType
+from typing import Container, Mapping, Optional
 
 from komodo_api.types import (
-    ListAlertsResponse,
     ListServersResponse,
     ListStacksResponse,
-    ResourceTargetServer,
-    ResourceTargetStack,
 )
 
+from .alerts import KomodoAlerts
+from .diff import KomodoDataDiff, server_key, service_key, stack_key
+from .index import index_servers, index_services, index_stacks
 from .server import KomodoServer
-from .service import KomodoService
+from .service import InspectionRecord, KomodoService, KomodoUpdateInfo
 from .stack import KomodoStack
 
+# Sections of the data that are listed with their own call.
+SERVERS = "servers"
+STACKS = "stacks"
+ALERTS = "alerts"
+
 
 class KomodoData:
-    """Wrapper to represent all data fetched from the API."""
+    """Wrapper to represent all data fetched from the API.
+
+    Each refresh builds a new instance and only the add_* methods fill it, so
+    servers and stacks are read-only views and resources missing from the
+    latest responses drop out. When built with the previous data, servers
+    and stacks whose list item fingerprint did not change are shared with
+    it, and `diff` collects the ids that did change. A shared object is
+    never changed: it is copied the first time an inspection or a derived
+    value (alerts, counts) of this refresh differs, so the previous data
+    stays as it was and only what changed is allocated again.
+
+    A section whose list call failed keeps the resources of the previous
+    data. `refreshed_at` holds when each section was last listed
+    successfully, `stale` the sections carried over after a failure, and
+    `stale_servers` when the servers whose inspections keep failing were
+    last inspected. All three carry over to the next refresh.
+
+    `index` maps the key of every server, stack and service (see diff.py) to
+    the values its entities show. finish_diff builds it, resolving only the
+    objects that changed and taking everything else from the previous index.
+    """
+
+    __slots__ = (
+        "servers", "stacks", "alert_count", "alert_summary", "diff",
+        "refreshed_at", "stale", "stale_servers", "index",
+        "_servers", "_index", "_stacks", "_previous", "_alerts", "_counts",
+    )
 
-    servers: Mapping[str, KomodoServer] = {}
-    stacks: Mapping[str, KomodoStack] = {}
-    alert_count: Optional[int] = None
-    alert_list: Optional[List[str]] = None
+    servers: Mapping[str, KomodoServer]
+    stacks: Mapping[str, KomodoStack]
+    alert_count: Optional[int]
+    alert_summary: str
+    diff: KomodoDataDiff
+    refreshed_at: dict[str, float]
+    stale: set[str]
+    stale_servers: dict[str, float | None]
+    index: Mapping[tuple, tuple]
+
+    def __init__(self, previous: "KomodoData | None" = None):
+        self._servers: dict[str, KomodoServer] = {}
+        self._stacks: dict[str, KomodoStack] = {}
+        self.servers = MappingProxyType(self._servers)
+        self.stacks = MappingProxyType(self._stacks)
+        self.alert_count = None
+        self.alert_summary = ""
+        self.diff = KomodoDataDiff(full=previous is None)
+        self._previous = previous
+        self._alerts: KomodoAlerts | None = None
+        # Stacks and services per server, set on the servers by finish_diff.
+        self._counts: dict[str, list[int]] = {}
+        self.refreshed_at = dict(previous.refreshed_at) if previous else {}
+        self.stale = set(previous.stale) if previous else set()
+        self.stale_servers = dict(previous.stale_servers) if previous else {}
+        self._index: dict[tuple, tuple] = {}
+        self.index = MappingProxyType(self._index)
+
+    def mark_refreshed(self, section: str, now: float) -> None:
+        """Record that a section was listed successfully."""
+        self.refreshed_at[section] = now
+        self.stale.discard(section)
+
+    def mark_stale(self, section: str) -> None:
+        """Record that a section is carried over after a failed list call."""
+        self.stale.add(section)
+
+    def stale_since(self, section: str, server_id: str | None = None) -> dict[str, float | None]:
+        """When the stale parts behind a section (and server) were last good.
+
+        Empty while everything is fresh, so the values only change when a
+        section or server goes stale or recovers.
+        """
+        stale = {}
+        if section in self.stale:
+            stale[section] = self.refreshed_at.get(section)
+        if server_id is not None and server_id in self.stale_servers:
+            stale["inspections"] = self.stale_servers[server_id]
+        return stale
 
     def add_servers(self, servers: ListServersResponse):
         """Add servers from response."""
-        for server in servers:
-            self.servers[server.id] = KomodoServer(server)
+        previous = self._previous.servers if self._previous else {}
+        for _server in servers:
+            server = previous.get(_server.id)
+            if server is None or server.fingerprint != KomodoServer.fingerprint_of(_server):
+                server = KomodoServer(_server)
+            self._servers[_server.id] = server
 
     def get_server(self, server_id: str) -> KomodoServer:
-        """Get server by ID."""
+        """Get server by ID, or a placeholder if it is unknown."""
         server = self.servers.get(server_id)
+        if server is None:
+            return KomodoServer.unknown(server_id)
+        return server
+
+    def _add_unknown_server(self, server_id: str) -> KomodoServer:
+        """Get server by ID, adding a placeholder for a server missing from the list."""
+        server = self._servers.get(server_id)
         if server is None:
             server = KomodoServer.unknown(server_id)
-            self.servers[server_id] = server
+            self._servers[server_id] = server
         return server
 
     def add_stacks(self, stacks: ListStacksResponse):
         """Add stacks from response.
         services: Mapping of (stack_id, service_name) to service details.
         """
+        previous = self._previous.stacks if self._previous else {}
         for _stack in stacks:
-            stack = KomodoStack(_stack)
-            self.stacks[_stack.id] = stack
+            stack = previous.get(_stack.id)
+            if stack is None or stack.fingerprint != KomodoStack.fingerprint_of(_stack):
+                stack = KomodoStack(_stack)
+                for service in _stack.info.services:
+                    stack.add_service(KomodoService(service))
+            self._add_stack(stack, len(_stack.info.services))
+
+    def _add_stack(self, stack: KomodoStack, service_count: int) -> None:
+        self._stacks[stack.id] = stack
 
-            # Update server stack count
-            server = self.get_server(_stack.info.server_id)
-            server.add_stack()
-            server.add_services(len(_stack.info.services))
+        self._add_unknown_server(stack.server_id)
+        counts = self._counts.setdefault(stack.server_id, [0, 0])
+        counts[0] += 1
+        counts[1] += service_count
 
-            for service in _stack.info.services:
-                stack.add_service(KomodoService(service))
+    def add_previous_servers(self):
+        """Carry the servers of the previous data over as they are."""
+        for server_id, server in self._previous.servers.items():
+            if server.fingerprint is None:
+                continue
+            self._servers[server_id] = server
+
+    def add_previous_stacks(self, skip: Container[str]):
+        """Carry the stacks of the previous data over, except the skipped ones."""
+        for stack_id, stack in self._previous.stacks.items():
+            if stack_id in skip or stack.fingerprint is None:
+                continue
+            self._add_stack(stack, len(stack.services))
+
+    def add_previous_alerts(self):
+        """Carry the alerts of the previous data over."""
+        if self._previous._alerts is not None:
+            self.add_alerts(self._previous._alerts)
 
     def get_stack(self, stack_id: str) -> KomodoStack:
-        """Get stack by ID."""
+        """Get stack by ID, or a placeholder if it is unknown."""
         stack = self.stacks.get(stack_id)
+        if stack is None:
+            return KomodoStack.unknown(stack_id)
+        return stack
+
+    def _add_unknown_stack(self, stack_id: str) -> KomodoStack:
+        """Get stack by ID, adding a placeholder for a stack missing from the list."""
+        stack = self._stacks.get(stack_id)
         if stack is None:
             stack = KomodoStack.unknown(stack_id)
-            self.stacks[stack_id] = stack
+            self._stacks[stack_id] = stack
+        return stack
+
+    def add_alerts(self, alerts: KomodoAlerts):
+        """Add the alerts aggregated over all pages."""
+        self._alerts = alerts
+        self.alert_count = alerts.count
+        self.alert_summary = alerts.summary
+        # The summaries are set on the servers and stacks by finish_diff.
+        for server_id in alerts.server_summaries:
+            self._add_unknown_server(server_id)
+        for stack_id in alerts.stack_summaries:
+            self._add_unknown_stack(stack_id)
+
+    def set_inspection(
+        self,
+        stack_id: str,
+        name: str,
+        inspection: InspectionRecord | None,
+        update_info: KomodoUpdateInfo | None,
+    ) -> bool:
+        """Set the inspection and update info of a service, returning whether they changed.
+
+        A stack shared with the previous data is copied first.
+        """
+        service = self._stacks[stack_id].services[name]
+        if (service.inspection, service.update_info) == (inspection, update_info):
+            return False
+        service = self._own_stack(stack_id).services[name]
+        service.inspection = inspection
+        service.update_info = update_info
+        return True
+
+    def _own_server(self, server_id: str) -> KomodoServer:
+        """The server to change in this refresh, copied if it is shared with the previous data."""
+        server = self._servers[server_id]
+        if self._previous is not None and self._previous.servers.get(server_id) is server:
+            server = server.copy()
+            self._servers[server_id] = server
+        return server
+
+    def _own_stack(self, stack_id: str) -> KomodoStack:
+        """The stack to change in this refresh, copied if it is shared with the previous data."""
+        stack = self._stacks[stack_id]
+        if self._previous is not None and self._previous.stacks.get(stack_id) is stack:
+            stack = stack.copy()
+            self._stacks[stack_id] = stack
         return stack
 
-    def add_alerts(self, alerts: ListAlertsResponse):
-        """Add alerts from response."""
-        self.alert_count = len(alerts.alerts) + (0 if alerts.next_page is None else 99)
-        self.alert_list = [alert.data.type for alert in alerts.alerts]
-        for alert in alerts.alerts:
-            if isinstance(alert.target, ResourceTargetServer):
-                self.get_server(alert.target.id).add_alert(alert)
-            elif isinstance(alert.target, ResourceTargetStack):
-                self.get_stack(alert.target.id).add_alert(alert)
+    def _set_aggregates(self) -> None:
+        """Set the alerts and counts of the servers and stacks where they changed."""
+        alerts = self._alerts
+        server_summaries = alerts.server_summaries if alerts is not None else {}
+        stack_summaries = alerts.stack_summaries if alerts is not None else {}
+        for server_id, server in self._servers.items():
+            stack_count, service_count = self._counts.get(server_id, (0, 0))
+            summary = server_summaries.get(server_id, "")
+            if server.aggregates() != (stack_count, service_count, summary):
+                server = self._own_server(server_id)
+                server.set_counts(stack_count, service_count)
+                server.set_alerts(summary)
+        for stack_id, stack in self._stacks.items():
+            summary = stack_summaries.get(stack_id, "")
+            if stack.aggregates() != (summary,):
+                self._own_stack(stack_id).set_alerts(summary)
+
+    def as_dict(self) -> dict:
+        """JSON serializable form for the cache.
+
+        Placeholders and the values derived during a refresh are left out,
+        from_dict rebuilds them.
+        """
+        return {
+            "servers": [s.as_dict() for s in self.servers.values() if s.fingerprint is not None],
+            "stacks": [s.as_dict() for s in self.stacks.values() if s.fingerprint is not None],
+            "alerts": self._alerts.as_dict() if self._alerts is not None else None,
+            "refreshed_at": self.refreshed_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KomodoData":
+        """Restore data saved with as_dict."""
+        self = cls()
+        for server in data["servers"]:
+            self._servers[server["id"]] = KomodoServer.from_dict(server)
+        for stack in data["stacks"]:
+            stack = KomodoStack.from_dict(stack)
+            self._add_stack(stack, len(stack.services))
+        if data["alerts"] is not None:
+            self.add_alerts(KomodoAlerts.from_dict(data["alerts"]))
+        self.refreshed_at = dict(data.get("refreshed_at", {}))
+        self._set_aggregates()
+        self._index_all()
+        return self
+
+    def _index_all(self) -> None:
+        self._index.clear()
+        index_servers(self._index, self._servers, self._servers)
+        index_stacks(self._index, self._stacks, self._stacks)
+        index_services(self._index, self._stacks, (
+            (stack_id, name) for stack_id, stack in self._stacks.items() for name in stack.services
+        ))
+
+    def finish_diff(self) -> KomodoDataDiff:
+        """Compare with the previous data and update the index, then release the previous data."""
+        self._set_aggregates()
+        previous = self._previous
+        self._previous = None
+        if previous is None:
+            self._index_all()
+            return self.diff
+
+        diff = self.diff
+        # Summaries are interned, so an unchanged one is compared by identity.
+        diff.alerts = (self.alert_count, self.alert_summary) != (
+            previous.alert_count, previous.alert_summary
+        )
+        # Going stale or recovering changes the attributes of a whole section.
+        stale_changed = self.stale ^ previous.stale
+        if ALERTS in stale_changed:
+            diff.alerts = True
+        if SERVERS in stale_changed:
+            diff.servers.update(self.servers)
+        if STACKS in stale_changed:
+            diff.stacks.update(self.stacks)
+        diff.servers.update(
+            server_id
+            for server_id, _ in self.stale_servers.items() ^ previous.stale_servers.items()
+            if server_id in self.servers
+        )
+        for server_id, server in self.servers.items():
+            old = previous.servers.get(server_id)
+            if old is None:
+                diff.added_servers.add(server_id)
+                diff.servers.add(server_id)
+            elif old.fingerprint != server.fingerprint:
+                diff.servers.add(server_id)
+            elif old.aggregates() != server.aggregates():
+                # Shared, or both are placeholders for a server missing from the list.
+                diff.servers.add(server_id)
+        diff.removed_servers.update(previous.servers.keys() - self.servers.keys())
+
+        for stack_id, stack in self.stacks.items():
+            old = previous.stacks.get(stack_id)
+            if stack.unchanged_since(old):
+                # Changes of its services are added by the inspections.
+                if old.aggregates() != stack.aggregates():
+                    diff.stacks.add(stack_id)
+                continue
+            diff.stacks.add(stack_id)
+            old_services = old.services if old is not None else {}
+            if old is None:
+                diff.added_stacks.add(stack_id)
+            for name in stack.services:
+                diff.services.add((stack_id, name))
+                if name not in old_services:
+                    diff.added_services.add((stack_id, name))
+            diff.removed_services.update(
+                (stack_id, name) for name in old_services.keys() - stack.services.keys()
+            )
+        for stack_id in previous.stacks.keys() - self.stacks.keys():
+            diff.removed_stacks.add(stack_id)
+            diff.removed_services.update(
+                (stack_id, name) for name in previous.stacks[stack_id].services
+            )
+
+        index = self._index
+        index.update(previous._index)
+        for server_id in diff.removed_servers:
+            index.pop(server_key(server_id), None)
+        for stack_id in diff.removed_stacks:
+            index.pop(stack_key(stack_id), None)
+        for stack_id, name in diff.removed_services:
+            index.pop(service_key(stack_id, name), None)
+        index_servers(index, self._servers, diff.servers)
+        index_stacks(index, self._stacks, diff.stacks)
+        index_services(index, self._stacks, diff.services)
+        return diff
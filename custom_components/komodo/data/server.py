@@ -3,49 +3,108 @@ from komodo_api.types import (
     ServerState,
     ResourceListItem,
 )
-from typing import List
 
 
 class KomodoServer:
     """Wrapper for a server list item returned from the API."""
 
+    __slots__ = (
+        "state", "id", "name", "alerts", "stack_count", "service_count",
+        "periphery_version", "fingerprint",
+    )
+
     state: ServerState | None
     id: str
     name: str
-    alerts: List[str]
+    # Rendered alert types, shared with every target that has the same ones.
+    alerts: str
     stack_count: int
     service_count: int
     periphery_version: str | None
+    fingerprint: tuple | None
 
     def __init__(self, item: ResourceListItem[ServerListItem]):
+        self.fingerprint = self.fingerprint_of(item)
         self.state = item.info.state
         self.id = item.id
         self.name = item.name
-        self.alerts = []
+        self.alerts = ""
         self.stack_count = 0
         self.service_count = 0
         self.periphery_version = item.info.version
 
-    def add_alert(self, alert) -> None:
-        """Add an alert to this server."""
-        self.alerts.append(alert.data.type)
+    @staticmethod
+    def fingerprint_of(item: ResourceListItem[ServerListItem]) -> tuple:
+        """Cheap summary of the list item fields this wrapper reads."""
+        return (item.name, item.info.state, item.info.version)
+
+    def aggregates(self) -> tuple:
+        """Values derived from other resources during a refresh."""
+        return (self.stack_count, self.service_count, self.alerts)
+
+    def copy(self) -> "KomodoServer":
+        """Copy of this server, to change in the next refresh."""
+        server = KomodoServer.__new__(KomodoServer)
+        server.fingerprint = self.fingerprint
+        server.state = self.state
+        server.id = self.id
+        server.name = self.name
+        server.periphery_version = self.periphery_version
+        server.alerts = self.alerts
+        server.stack_count = self.stack_count
+        server.service_count = self.service_count
+        return server
+
+    def unchanged_since(self, previous: "KomodoServer | None") -> bool:
+        """Whether this server has the same list item as previous, e.g. when shared with it."""
+        return (
+            previous is not None
+            and self.fingerprint is not None
+            and self.fingerprint == previous.fingerprint
+        )
+
+    def set_alerts(self, summary: str) -> None:
+        """Set the rendered alert types of this server."""
+        self.alerts = summary
+
+    def set_counts(self, stack_count: int, service_count: int) -> None:
+        """Set the number of stacks and services on this server."""
+        self.stack_count = stack_count
+        self.service_count = service_count
 
-    def add_stack(self) -> None:
-        """Increment stack count for this server."""
-        self.stack_count += 1
+    def as_dict(self) -> dict:
+        """JSON serializable form for the cache, without the derived values."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "periphery_version": self.periphery_version,
+        }
 
-    def add_services(self, count: int) -> None:
-        """Add services to this server."""
-        self.service_count += count
+    @classmethod
+    def from_dict(cls, data: dict) -> "KomodoServer":
+        """Restore a server from the cache."""
+        self = cls.__new__(cls)
+        self.id = data["id"]
+        self.name = data["name"]
+        self.state = ServerState(data["state"])
+        self.periphery_version = data["periphery_version"]
+        self.alerts = ""
+        self.stack_count = 0
+        self.service_count = 0
+        # Same fields as fingerprint_of, so the first refresh can reuse it.
+        self.fingerprint = (self.name, self.state, self.periphery_version)
+        return self
 
     @classmethod
     def unknown(cls, server_id: str) -> "KomodoServer":
         """Create unknown server."""
         self = cls.__new__(cls)
+        self.fingerprint = None
         self.id = server_id
         self.name = f"Unknown Server {server_id}"
         self.state = None
-        self.alerts = []
+        self.alerts = ""
         self.stack_count = 0
         self.service_count = 0
         self.periphery_version = None
@@ -1,48 +1,177 @@
-from komodo_api.types import (
-    StackServiceWithUpdate,
-    InspectStackContainerResponse,
-    ContainerStateStatusEnum,
-)
+from typing import NamedTuple
+
+from komodo_api.types import ContainerStateStatusEnum, StackServiceWithUpdate
+from pydantic import BaseModel, Field
+
+VERSION_LABEL = "org.opencontainers.image.version"
+
+# Docker reports paused and restarting containers as running too.
+_RUNNING = frozenset({
+    ContainerStateStatusEnum.RUNNING,
+    ContainerStateStatusEnum.PAUSED,
+    ContainerStateStatusEnum.RESTARTING,
+})
+
+
+class _InspectedState(BaseModel):
+    status: ContainerStateStatusEnum | None = Field(alias="Status", default=None)
+
+
+class _InspectedConfig(BaseModel):
+    labels: dict[str, str] | None = Field(alias="Labels", default=None)
+
+
+class InspectedContainer(BaseModel):
+    """The few fields of InspectStackContainerResponse the integration reads.
+
+    Parsing an inspection into this model skips the rest of the docker
+    inspect payload, e.g. the host config, mounts and network settings.
+    """
+
+    id: str | None = Field(alias="Id", default=None)
+    image: str | None = Field(alias="Image", default=None)
+    state: _InspectedState | None = Field(alias="State", default=None)
+    config: _InspectedConfig | None = Field(alias="Config", default=None)
+
+
+class InspectionRecord(NamedTuple):
+    """What is kept of a container inspection."""
+
+    status: ContainerStateStatusEnum | None
+    container_id: str | None
+    version: str | None
+    image: str | None
+
+    @property
+    def running(self) -> bool | None:
+        return None if self.status is None else self.status in _RUNNING
+
+    @classmethod
+    def from_container(cls, container: InspectedContainer) -> "InspectionRecord":
+        """Project a parsed inspection, slim or full, into a record."""
+        state, config = container.state, container.config
+        labels = config.labels if config is not None else None
+        return cls(
+            state.status if state is not None else None,
+            container.id,
+            labels.get(VERSION_LABEL) if labels else None,
+            container.image,
+        )
+
+    def as_dict(self) -> dict:
+        """JSON serializable form for the cache."""
+        return {
+            "status": None if self.status is None else self.status.value,
+            "container_id": self.container_id,
+            "version": self.version,
+            "image": self.image,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "InspectionRecord":
+        """Restore a record from the cache."""
+        status = data["status"]
+        return cls(
+            None if status is None else ContainerStateStatusEnum(status),
+            data["container_id"],
+            data["version"],
+            data["image"],
+        )
 
 
 class KomodoUpdateInfo:
     """Update information for a service."""
 
+    __slots__ = ("current_version", "new_version", "info_updated_at")
+
     current_version: str
     new_version: str
     info_updated_at: float
 
-    def __init__(self, info: InspectStackContainerResponse, updated_at: float):
-        if info.config and info.config.labels:
-            self.current_version = info.config.labels.get(
-                "org.opencontainers.image.version", "0"
-            )
-        else:
-            self.current_version = "0"
+    def __init__(self, record: InspectionRecord, updated_at: float):
+        self.current_version = record.version if record.version is not None else "0"
         self.new_version = "update available"
         self.info_updated_at = updated_at
 
+    def as_dict(self) -> dict:
+        """JSON serializable form for the cache."""
+        return {
+            "current_version": self.current_version,
+            "new_version": self.new_version,
+            "info_updated_at": self.info_updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KomodoUpdateInfo":
+        """Restore update info from the cache."""
+        self = cls.__new__(cls)
+        self.current_version = data["current_version"]
+        self.new_version = data["new_version"]
+        self.info_updated_at = data["info_updated_at"]
+        return self
+
 
 class KomodoService:
     """Wrapper for a stack service (container)."""
 
+    __slots__ = ("name", "update_available", "inspection", "update_info")
+
     name: str
     update_available: bool
-    state: ContainerStateStatusEnum | None
+    inspection: InspectionRecord | None
     update_info: KomodoUpdateInfo | None
 
     def __init__(self, item: StackServiceWithUpdate, update_info: KomodoUpdateInfo | None = None):
         self.name = item.service
         self.update_available = item.update_available
-        self.state = None
+        self.inspection = None
         if item.update_available:
             self.update_info = update_info
         else:
             self.update_info = None
 
+    @property
+    def running(self) -> bool | None:
+        """Whether the container runs, None before the first inspection."""
+        return self.inspection.running if self.inspection is not None else None
+
+    @property
+    def container_id(self) -> str | None:
+        return self.inspection.container_id if self.inspection is not None else None
+
+    def copy(self) -> "KomodoService":
+        """Copy of this service, to apply the next inspection to."""
+        service = KomodoService.__new__(KomodoService)
+        service.name = self.name
+        service.update_available = self.update_available
+        service.inspection = self.inspection
+        service.update_info = self.update_info
+        return service
+
     def apply_update_info(
         self,
         update_info: KomodoUpdateInfo,
     ) -> None:
         """Apply new update info."""
         self.update_info = update_info
+
+    def as_dict(self) -> dict:
+        """JSON serializable form for the cache."""
+        return {
+            "name": self.name,
+            "update_available": self.update_available,
+            "inspection": self.inspection.as_dict() if self.inspection else None,
+            "update_info": self.update_info.as_dict() if self.update_info else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KomodoService":
+        """Restore a service from the cache."""
+        self = cls.__new__(cls)
+        self.name = data["name"]
+        self.update_available = data["update_available"]
+        inspection = data["inspection"]
+        self.inspection = InspectionRecord.from_dict(inspection) if inspection else None
+        update_info = data["update_info"]
+        self.update_info = KomodoUpdateInfo.from_dict(update_info) if update_info else None
+        return self
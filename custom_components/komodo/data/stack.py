@@ -3,7 +3,6 @@ from komodo_api.types import (
     StackListItem,
     StackState,
 )
-from typing import List
 
 from .service import KomodoService
 
@@ -17,42 +16,113 @@ _NO_CONTAINER_STATES = frozenset({StackState.DOWN, StackState.UNKNOWN})
 class KomodoStack:
     """Wrapper for a stack list item returned from the API."""
 
+    __slots__ = ("state", "id", "name", "server_id", "services", "alerts", "fingerprint")
+
     state: StackState | None
     id: str
     name: str
     server_id: str
     services: dict[str, KomodoService]
-    alerts: List[str]
+    # Rendered alert types, shared with every target that has the same ones.
+    alerts: str
+    fingerprint: tuple | None
 
     def __init__(self, item: ResourceListItem[StackListItem]):
+        self.fingerprint = self.fingerprint_of(item)
         self.state = item.info.state
         self.id = item.id
         self.name = item.name
         self.server_id = item.info.server_id
         self.services = {}
-        self.alerts = []
+        self.alerts = ""
 
     @property
     def has_inspectable_container(self) -> bool:
         """False when the stack has no container to inspect."""
         return self.state is not None and self.state not in _NO_CONTAINER_STATES
 
+    @staticmethod
+    def fingerprint_of(item: ResourceListItem[StackListItem]) -> tuple:
+        """Cheap summary of the list item fields this wrapper and its services read."""
+        return (
+            item.name,
+            item.info.state,
+            item.info.server_id,
+            tuple((s.service, s.update_available) for s in item.info.services),
+        )
+
+    def aggregates(self) -> tuple:
+        """Values derived from other resources during a refresh."""
+        return (self.alerts,)
+
+    def copy(self) -> "KomodoStack":
+        """Copy of this stack and its services, to change in the next refresh."""
+        stack = KomodoStack.__new__(KomodoStack)
+        stack.fingerprint = self.fingerprint
+        stack.state = self.state
+        stack.id = self.id
+        stack.name = self.name
+        stack.server_id = self.server_id
+        stack.services = {name: service.copy() for name, service in self.services.items()}
+        stack.alerts = self.alerts
+        return stack
+
+    def unchanged_since(self, previous: "KomodoStack | None") -> bool:
+        """Whether this stack has the same list item as previous, e.g. when shared with it."""
+        return (
+            previous is not None
+            and self.fingerprint is not None
+            and self.fingerprint == previous.fingerprint
+        )
+
     def add_service(self, service: "KomodoService") -> None:
         """Store a service for this stack."""
         self.services[service.name] = service
 
-    def add_alert(self, alert) -> None:
-        """Add an alert to this stack."""
-        self.alerts.append(alert.data.type)
+    def set_alerts(self, summary: str) -> None:
+        """Set the rendered alert types of this stack."""
+        self.alerts = summary
+
+    def as_dict(self) -> dict:
+        """JSON serializable form for the cache, without the derived alerts."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "server_id": self.server_id,
+            "services": [service.as_dict() for service in self.services.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KomodoStack":
+        """Restore a stack from the cache."""
+        self = cls.__new__(cls)
+        self.state = StackState(data["state"])
+        self.id = data["id"]
+        self.name = data["name"]
+        self.server_id = data["server_id"]
+        self.services = {}
+        for service in data["services"]:
+            self.add_service(KomodoService.from_dict(service))
+        self.alerts = ""
+        # Same fields as fingerprint_of, so the first refresh can reuse it.
+        self.fingerprint = (
+            self.name,
+            self.state,
+            self.server_id,
+            tuple((s.name, s.update_available) for s in self.services.values()),
+        )
+        return self
 
     @classmethod
     def unknown(cls, stack_id: str) -> "KomodoStack":
         """Create unknown stack."""
         self = cls.__new__(cls)
+        self.fingerprint = None
         self.state = None
         self.id = stack_id
         self.name = f"Unknown Stack {stack_id}"
         self.server_id = "unknown"
         self.services = {}
-        self.alerts = []
+        self.alerts = ""
         return self
@@ -0,0 +1,42 @@
+"""Diagnostics support for Komodo."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .base import KomodoBase
+from .const import CONF_API_KEY, CONF_API_SECRET, CONF_HOST, DOMAIN
+
+TO_REDACT = {CONF_HOST, CONF_API_KEY, CONF_API_SECRET}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the refresh and API statistics of a config entry.
+
+    The API statistics belong to the client, which is shared with other
+    entries using the same host and credentials.
+    """
+    komodo: KomodoBase = hass.data[DOMAIN][entry.entry_id]
+    coordinator = komodo.coordinator
+    data = coordinator.data
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "data": None if data is None else {
+            "servers": len(data.servers),
+            "stacks": len(data.stacks),
+            "services": sum(len(stack.services) for stack in data.stacks.values()),
+            "alerts": data.alert_count,
+            "refreshed_at": data.refreshed_at,
+            "stale": sorted(data.stale),
+            "stale_servers": len(data.stale_servers),
+        },
+        "last_update_success": coordinator.last_update_success,
+        "refresh": coordinator.stats.as_dict(),
+        "inspection_cache": coordinator.inspection_cache.as_dict(),
+        "api": komodo.api.stats.as_dict(),
+        "in_flight_updates": komodo.completion.in_flight,
+    }
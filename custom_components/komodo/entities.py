@@ -0,0 +1,175 @@
+"""Add and remove entities as servers, stacks and services come and go."""
+
+import logging
+from typing import Callable, Collection, Hashable, Iterable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import KomodoCoordinator
+from .data.diff import KomodoDataDiff
+from .data.index import UNKNOWN_SERVICE, ServiceValues
+from .data.komodo_data import KomodoData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Creates the entities for the given ids, or for all of them with None.
+EntityFactory = Callable[[Collection[Hashable] | None], list[Entity]]
+
+SERVER = "server"
+STACK = "stack"
+SERVICE = "service"
+
+
+def _current_ids(data: KomodoData, kind: str) -> set[Hashable]:
+    if kind == SERVER:
+        return set(data.servers)
+    if kind == STACK:
+        return set(data.stacks)
+    return {
+        (stack_id, name)
+        for stack_id, stack in data.stacks.items()
+        for name in stack.services
+    }
+
+
+def _changed_ids(diff: KomodoDataDiff, kind: str) -> tuple[set[Hashable], set[Hashable]]:
+    if kind == SERVER:
+        return diff.added_servers, diff.removed_servers
+    if kind == STACK:
+        return diff.added_stacks, diff.removed_stacks
+    return diff.added_services, diff.removed_services
+
+
+def _id_of(entity: Entity) -> Hashable:
+    """Id of the resource behind an entity, from the key it subscribes with."""
+    key = entity.coordinator_context
+    return key[1] if len(key) == 2 else key[1:]
+
+
+@callback
+def async_remove_entities(hass: HomeAssistant, entities: Iterable[Entity]) -> None:
+    """Remove entities together with their registry entries."""
+    registry = er.async_get(hass)
+    for entity in entities:
+        if entity.registry_entry is not None:
+            # Removing the registry entry removes the entity too.
+            registry.async_remove(entity.entity_id)
+        elif entity.hass is not None:
+            hass.async_create_task(entity.async_remove())
+
+
+@callback
+def async_track_entities(
+    entry: ConfigEntry,
+    coordinator: KomodoCoordinator,
+    async_add_entities: AddEntitiesCallback,
+    kind: str,
+    create: EntityFactory,
+) -> list[Entity]:
+    """Create the entities of one kind of resource and keep them in line with later refreshes.
+
+    The entities for the current data are returned for the caller to add.
+    After every refresh, entities are created only for the ids the diff
+    reports as added, and the ones of removed ids are removed again, together
+    with their registry entries.
+    """
+    tracked: dict[Hashable, list[Entity]] = {}
+
+    def _track(entities: list[Entity]) -> list[Entity]:
+        for entity in entities:
+            tracked.setdefault(_id_of(entity), []).append(entity)
+        return entities
+
+    @callback
+    def _handle_update() -> None:
+        data = coordinator.data
+        if data is None:
+            return
+        if data.diff.full:
+            # No previous data to compare with, so compare with the entities.
+            current = _current_ids(data, kind)
+            added = current - tracked.keys()
+            removed = tracked.keys() - current
+        else:
+            added, removed = _changed_ids(data.diff, kind)
+            added = added - tracked.keys()
+            removed = removed & tracked.keys()
+
+        if removed:
+            async_remove_entities(
+                coordinator.hass,
+                [entity for item_id in removed for entity in tracked.pop(item_id)],
+            )
+            _LOGGER.debug("Removed %s entities for %s", kind, removed)
+        if added:
+            async_add_entities(_track(create(added)))
+            _LOGGER.debug("Added %s entities for %s", kind, added)
+
+    entry.async_on_unload(coordinator.async_add_listener(_handle_update))
+    return _track(create(None))
+
+
+@callback
+def async_track_devices(entry: ConfigEntry, coordinator: KomodoCoordinator) -> None:
+    """Detach the devices of removed servers and stacks from the config entry."""
+
+    @callback
+    def _handle_update() -> None:
+        data = coordinator.data
+        if data is None or not (data.diff.removed_servers or data.diff.removed_stacks):
+            return
+        registry = dr.async_get(coordinator.hass)
+        for item_id in data.diff.removed_servers | data.diff.removed_stacks:
+            device = registry.async_get_device(identifiers={(DOMAIN, item_id)})
+            if device is not None:
+                registry.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
+
+    entry.async_on_unload(coordinator.async_add_listener(_handle_update))
+
+
+class KomodoServiceEntity(CoordinatorEntity[KomodoCoordinator]):
+    """Entity of a service, written only when the values it shows change.
+
+    Subclasses subscribe with the service key, and set their attributes in
+    `_update_attrs` from the values of the service in the index.
+    """
+
+    _values: ServiceValues
+    _written_available: bool
+
+    def _lookup(self) -> ServiceValues:
+        """Values of the service in the coordinator data."""
+        return self.coordinator.data.index.get(self.coordinator_context, UNKNOWN_SERVICE)
+
+    def _update_attrs(self, values: ServiceValues) -> None:
+        """Update entity attributes from the values of the service."""
+        raise NotImplementedError
+
+    def _shown(self, values: ServiceValues) -> tuple:
+        """The values this entity shows."""
+        raise NotImplementedError
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        values = self._lookup()
+        previous = self._values
+        available = self.available
+        # The index keeps the values of unchanged services, so mostly the
+        # identity check alone decides.
+        if (
+            values is previous or self._shown(values) == self._shown(previous)
+        ) and available == self._written_available:
+            self._values = values
+            self.coordinator.stats.record_write(False)
+            return
+        self._update_attrs(values)
+        self._written_available = available
+        self.coordinator.stats.record_write(True)
+        self.async_write_ha_state()
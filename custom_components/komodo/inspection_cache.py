@@ -0,0 +1,110 @@
+"""Size-bounded cache of container inspection results."""
+
+from collections import OrderedDict
+from typing import Iterable
+
+from .data.service import InspectionRecord, KomodoUpdateInfo
+
+ServiceId = tuple[str, str]
+
+
+class _Entry:
+    __slots__ = ("inspection", "state_at", "update_info", "update_info_at")
+
+    def __init__(self, inspection: InspectionRecord) -> None:
+        self.inspection = inspection
+        self.state_at: float | None = None
+        self.update_info: KomodoUpdateInfo | None = None
+        self.update_info_at: float | None = None
+
+
+class InspectionCache:
+    """Last inspection result per (stack id, service name), least recently used first.
+
+    The inspection record, whose container state changes often, is fresh for
+    state_ttl seconds and update info, which only changes with the image, for
+    update_info_ttl seconds. Update info is tied to the container it was read
+    from: once an inspection finds another container id or image, e.g. after
+    a deploy, it is dropped. Beyond max_size entries the least recently used
+    one is evicted. Times are monotonic.
+    """
+
+    def __init__(self, max_size: int, state_ttl: float, update_info_ttl: float) -> None:
+        self.max_size = max(1, max_size)
+        self.state_ttl = state_ttl
+        self.update_info_ttl = update_info_ttl
+        self._entries: OrderedDict[ServiceId, _Entry] = OrderedDict()
+        self.hits = {"state": 0, "update_info": 0}
+        self.misses = {"state": 0, "update_info": 0}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def state(self, key: ServiceId, now: float) -> InspectionRecord | None:
+        """The fresh inspection record of a service, if cached."""
+        entry = self._entries.get(key)
+        if entry is None or entry.state_at is None or now - entry.state_at >= self.state_ttl:
+            self.misses["state"] += 1
+            return None
+        self.hits["state"] += 1
+        self._entries.move_to_end(key)
+        return entry.inspection
+
+    def update_info(self, key: ServiceId, now: float) -> KomodoUpdateInfo | None:
+        """The fresh update info of the current container of a service, if cached."""
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.update_info_at is None
+            or now - entry.update_info_at >= self.update_info_ttl
+        ):
+            self.misses["update_info"] += 1
+            return None
+        self.hits["update_info"] += 1
+        self._entries.move_to_end(key)
+        return entry.update_info
+
+    def put_state(self, key: ServiceId, inspection: InspectionRecord, now: float) -> None:
+        """Cache the record of an inspection."""
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.inspection.container_id != inspection.container_id
+            or entry.inspection.image != inspection.image
+        ):
+            entry = self._entries[key] = _Entry(inspection)
+        entry.inspection = inspection
+        entry.state_at = now
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def put_update_info(self, key: ServiceId, update_info: KomodoUpdateInfo, now: float) -> None:
+        """Cache the update info of the container whose state was just put."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.update_info = update_info
+            entry.update_info_at = now
+
+    def invalidate(self, keys: Iterable[ServiceId]) -> None:
+        """Drop the cached states, e.g. after an action. Update info stays with its container."""
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.state_at = None
+
+    def forget(self, keys: Iterable[ServiceId]) -> None:
+        """Drop everything cached for services that no longer exist."""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def as_dict(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,48 @@
+"""Coordinator for the procedures of Komodo core."""
+
+import asyncio
+import logging
+
+from komodo_api.lib import KomodoClient
+from komodo_api.types import ListProcedures, ProcedureListItemInfo, ResourceListItem
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import PROCEDURE_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KomodoProcedureCoordinator(
+    DataUpdateCoordinator[dict[str, ResourceListItem[ProcedureListItemInfo]]]
+):
+    """Procedures by id, listed on their own slow interval.
+
+    Procedures rarely change, so they stay out of the main refresh. A listing
+    with the same ids and names as the last one keeps the previous data and
+    doesn't notify the listeners. A failed listing keeps the last procedures.
+    """
+
+    def __init__(self, hass: HomeAssistant, my_api: KomodoClient) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="KomodoProcedures",
+            update_interval=PROCEDURE_INTERVAL,
+            always_update=False,
+        )
+        self.my_api = my_api
+        self._fingerprint: int | None = None
+
+    async def _async_update_data(self) -> dict[str, ResourceListItem[ProcedureListItemInfo]]:
+        try:
+            async with asyncio.timeout(10):
+                procedures = await self.my_api.read.listProcedures(ListProcedures())
+        except Exception as e:
+            raise UpdateFailed(f"Error listing procedures: {e}") from e
+        fingerprint = hash(tuple((p.id, p.name) for p in procedures))
+        if fingerprint == self._fingerprint and self.data is not None:
+            return self.data
+        self._fingerprint = fingerprint
+        return {procedure.id: procedure for procedure in procedures}
@@ -0,0 +1,65 @@
+"""Push updates from the Komodo core update websocket."""
+
+import asyncio
+import logging
+from typing import Callable
+
+from komodo_api.lib import KomodoClient
+from komodo_api.types import UpdateListItem
+
+from .const import PUSH_RETRY_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class KomodoUpdateStream:
+    """Subscription to the update websocket of Komodo core.
+
+    Every update is passed to on_update. on_connection is called with True
+    once the stream is logged in and with False whenever it drops, so the
+    coordinator can fall back to regular polling in between.
+    """
+
+    def __init__(
+        self,
+        api: KomodoClient,
+        on_update: Callable[[UpdateListItem], None],
+        on_connection: Callable[[bool], None],
+        retry_delay: float = PUSH_RETRY_DELAY,
+    ) -> None:
+        self._api = api
+        self._on_update = on_update
+        self._on_connection = on_connection
+        self._retry_delay = retry_delay
+        self._stopped = False
+        self.connected = False
+
+    async def run(self) -> None:
+        """Listen until stopped, reconnecting after the stream drops."""
+        while not self._stopped:
+            try:
+                await self._api.get_update_websocket(
+                    self._on_update, on_login=self._logged_in
+                )
+            except asyncio.CancelledError:
+                self._set_connected(False)
+                raise
+            except Exception as e:
+                _LOGGER.warning("Komodo update stream failed: %s", e)
+            self._set_connected(False)
+            if self._stopped:
+                break
+            await asyncio.sleep(self._retry_delay)
+
+    def stop(self) -> None:
+        """Stop reconnecting. The running task is cancelled with the entry."""
+        self._stopped = True
+
+    def _logged_in(self) -> None:
+        _LOGGER.debug("Komodo update stream connected")
+        self._set_connected(True)
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self.connected:
+            self.connected = connected
+            self._on_connection(connected)
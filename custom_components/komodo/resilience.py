@@ -0,0 +1,102 @@
+"""Deadlines, retries and circuit breaking for calls to Komodo."""
+
+import asyncio
+import random
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+from komodo_api.exceptions import KomodoException
+
+T = TypeVar("T")
+
+# Status codes of a core or proxy that is briefly unavailable.
+_RETRY_STATUS = frozenset({502, 503, 504})
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error is worth retrying.
+
+    Timeouts are not: a hung periphery would only hang again, so a call
+    never takes longer than its deadline.
+    """
+    if isinstance(error, KomodoException):
+        return error.code in _RETRY_STATUS
+    if isinstance(error, aiohttp.ClientResponseError):
+        # The HTML error page of a proxy fails to parse as JSON, so it never
+        # becomes a KomodoException.
+        return error.status in _RETRY_STATUS
+    return isinstance(error, aiohttp.ClientConnectionError) and not isinstance(
+        error, aiohttp.ServerTimeoutError
+    )
+
+
+async def raise_for_gateway_error(response: aiohttp.ClientResponse) -> None:
+    """Raise a ClientResponseError for an error page of a proxy in front of the core.
+
+    komodo_api would fail to parse it as JSON, losing the status.
+    """
+    if response.status in _RETRY_STATUS and response.content_type != "application/json":
+        response.raise_for_status()
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[T]],
+    timeout: float,
+    retries: int = 0,
+    backoff: float = 0.5,
+) -> T:
+    """Run a call under a deadline, retrying transient errors with jittered backoff."""
+    attempt = 0
+    while True:
+        try:
+            async with asyncio.timeout(timeout):
+                return await call()
+        except Exception as e:
+            if attempt >= retries or not is_transient(e):
+                raise
+        # Full jitter, so entries and servers don't retry in lockstep.
+        await asyncio.sleep(random.uniform(0, backoff * 2**attempt))
+        attempt += 1
+
+
+class CircuitBreaker:
+    """Breakers per key, e.g. per server.
+
+    A key's breaker opens after `threshold` consecutive failures. While it is
+    open, `allow` is False until the cooldown passed; the cooldown doubles
+    each time the breaker opens again right after, up to `max_cooldown`. One
+    success closes it.
+    """
+
+    def __init__(self, threshold: int, cooldown: float, max_cooldown: float) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+        self._opened: dict[str, int] = {}
+
+    def allow(self, key: str, now: float) -> bool:
+        """Whether calls for the key may go through."""
+        return now >= self._open_until.get(key, now)
+
+    def is_open(self, key: str) -> bool:
+        """Whether the key failed often enough to be cut off."""
+        return self._failures.get(key, 0) >= self.threshold
+
+    def record_success(self, key: str) -> None:
+        """Close the key's breaker."""
+        self._failures.pop(key, None)
+        self._open_until.pop(key, None)
+        self._opened.pop(key, None)
+
+    def record_failure(self, key: str, now: float) -> bool:
+        """Count a failure, returning True if it opened the breaker."""
+        failures = self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+        if failures < self.threshold:
+            return False
+        opened = self._opened.get(key, 0)
+        self._opened[key] = opened + 1
+        self._open_until[key] = now + min(self.cooldown * 2**opened, self.max_cooldown)
+        return True
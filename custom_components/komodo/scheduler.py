@@ -0,0 +1,126 @@
+"""Bounded-concurrency scheduler for container inspections."""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Iterator
+
+_LOGGER = logging.getLogger(__name__)
+
+InspectionJob = Callable[[], Awaitable[None]]
+
+
+class InspectionScheduler:
+    """Run inspection jobs with a global and a per-server concurrency limit.
+
+    Jobs are started round-robin across servers, and a job only takes one of
+    the global slots once its server has a free slot. A slow periphery can
+    therefore occupy at most `per_server_limit` slots and never starves the
+    other servers. Whatever has not finished when the deadline hits is
+    cancelled, so a single refresh is bounded in time.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        per_server_limit: int,
+        deadline: float,
+    ) -> None:
+        self.limit = max(1, limit)
+        self.per_server_limit = max(1, min(per_server_limit, self.limit))
+        self.deadline = deadline
+
+    async def run(self, jobs: Iterable[tuple[str, InspectionJob]]) -> int:
+        """Run all jobs, keyed by server id. Returns the number of jobs that did not finish."""
+        queues: dict[str, deque[InspectionJob]] = {}
+        for server_id, job in jobs:
+            queues.setdefault(server_id, deque()).append(job)
+        if not queues:
+            return 0
+
+        global_slots = asyncio.Semaphore(self.limit)
+        server_slots = {
+            server_id: asyncio.Semaphore(self.per_server_limit) for server_id in queues
+        }
+
+        async def _run(server_id: str, job: InspectionJob) -> None:
+            async with server_slots[server_id], global_slots:
+                await job()
+
+        tasks = [
+            asyncio.create_task(_run(server_id, job))
+            for server_id, job in _round_robin(queues)
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            _LOGGER.warning(
+                "Inspection deadline of %ss reached, skipped %d of %d inspections",
+                self.deadline, len(pending), len(tasks),
+            )
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                _LOGGER.error("Inspection failed", exc_info=task.exception())
+        return len(pending)
+
+
+def _round_robin(
+    queues: dict[str, deque[InspectionJob]],
+) -> Iterator[tuple[str, InspectionJob]]:
+    """Interleave the per-server queues, one job per server at a time."""
+    while queues:
+        for server_id in list(queues):
+            queue = queues[server_id]
+            yield server_id, queue.popleft()
+            if not queue:
+                del queues[server_id]
+
+
+class AdaptiveSchedule:
+    """Per-key polling intervals that follow how often each key changes.
+
+    A key starts at the base interval. Every change, and every busy
+    observation (e.g. a stack mid-deploy), drops it to the minimum interval,
+    and every quiet observation multiplies it by `backoff` up to the
+    maximum. `reset` makes a key due right away at the minimum interval,
+    for example after an action on it.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, backoff: float) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._intervals: dict[str, float] = {}
+        self._next: dict[str, float] = {}
+
+    def interval(self, key: str) -> float | None:
+        """Current interval of a key, None if it was never observed."""
+        return self._intervals.get(key)
+
+    def due(self, key: str, now: float) -> bool:
+        """Whether the key should be polled now."""
+        return now >= self._next.get(key, now)
+
+    def observe(self, key: str, changed: bool, now: float, base_interval: float) -> None:
+        """Schedule the next poll of a key after polling it."""
+        interval = self._intervals.get(key)
+        if interval is None:
+            interval = base_interval
+        elif changed:
+            interval = self.min_interval
+        else:
+            interval = min(interval * self.backoff, max(self.max_interval, base_interval))
+        self._intervals[key] = interval
+        self._next[key] = now + interval
+
+    def reset(self, key: str) -> None:
+        """Poll the key right away, and quickly after that."""
+        self._intervals[key] = self.min_interval
+        self._next.pop(key, None)
+
+    def forget(self, key: str) -> None:
+        """Drop a key that no longer exists."""
+        self._intervals.pop(key, None)
+        self._next.pop(key, None)
@@ -5,9 +5,13 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from functools import partial
+
+from .entities import SERVER, STACK, async_track_entities
 from .sensors.alert import create_alert_sensors
 from .sensors.server import create_server_sensors
 from .sensors.stack import create_stack_sensors
+from .sensors.stats import create_stats_sensors
 
 from .const import DOMAIN
 from .base import KomodoBase
@@ -23,10 +27,18 @@ async def async_setup_entry(
     """Set up Komodo sensors from config entry."""
     komodo: KomodoBase = hass.data[DOMAIN][entry.entry_id]
 
+    coordinator = komodo.coordinator
     entities = (
-        create_server_sensors(komodo.coordinator, entry.entry_id)
-        + create_stack_sensors(komodo.coordinator, entry.entry_id)
-        + create_alert_sensors(komodo.coordinator, entry.entry_id)
+        async_track_entities(
+            entry, coordinator, async_add_entities, SERVER,
+            partial(create_server_sensors, coordinator, entry.entry_id),
+        )
+        + async_track_entities(
+            entry, coordinator, async_add_entities, STACK,
+            partial(create_stack_sensors, coordinator, entry.entry_id),
+        )
+        + create_alert_sensors(coordinator, entry.entry_id)
+        + create_stats_sensors(coordinator, entry.entry_id, komodo.api.stats)
     )
 
     async_add_entities(entities)
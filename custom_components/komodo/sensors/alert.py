@@ -1,7 +1,9 @@
 from ..coordinator import KomodoCoordinator
-from .common import KomodoSensor
+from .common import KomodoSensor, stale_attributes
 from homeassistant.helpers.device_registry import DeviceInfo
 from ..const import DOMAIN
+from ..data.diff import ALERTS_KEY
+from ..data.komodo_data import ALERTS
 
 
 def create_alert_sensors(
@@ -16,21 +18,24 @@ def create_alert_sensors(
         return data.alert_count if data.alert_count is not None else 0
 
     def joiner(data):
-        if data.alert_list:
-            return ", ".join(data.alert_list)
-        return ""
+        return data.alert_summary
 
+    attributes = stale_attributes(ALERTS)
     return [
         KomodoSensor(
             coordinator=coordinator,
             item_id=f"{entry_id}_global",
             extractor=counter,
             key="alert_count",
+            change_key=ALERTS_KEY,
+            attributes=attributes,
         ),
         KomodoSensor(
             coordinator=coordinator,
             item_id=f"{entry_id}_global",
             extractor=joiner,
             key="alert_list",
+            change_key=ALERTS_KEY,
+            attributes=attributes,
         ),
     ]
@@ -1,6 +1,8 @@
 """Example integration using DataUpdateCoordinator."""
 
 import logging
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
@@ -8,12 +10,35 @@ from homeassistant.helpers.entity import Entity
 from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.util import dt as dt_util
 
 from ..const import DOMAIN
 from ..coordinator import KomodoCoordinator
+from ..data.komodo_data import KomodoData
 
 _LOGGER = logging.getLogger(__name__)
 
+# Extra state attributes of an entity, from the coordinator data.
+AttributesExtractor = Callable[[KomodoData], Mapping[str, Any]]
+# Attributes of entities whose data is fresh, shared by all of them.
+_FRESH: Mapping[str, Any] = MappingProxyType({})
+
+
+def stale_attributes(section: str, server_id: str | None = None) -> AttributesExtractor:
+    """Attributes telling since when the data behind an entity is stale, if it is."""
+
+    def extractor(data: KomodoData) -> Mapping[str, Any]:
+        if not data.stale and not data.stale_servers:
+            return _FRESH
+        return {
+            f"{part}_stale_since": (
+                dt_util.utc_from_timestamp(since) if since is not None else None
+            )
+            for part, since in data.stale_since(section, server_id).items()
+        }
+
+    return extractor
+
 
 class KomodoEntity(CoordinatorEntity[KomodoCoordinator], Entity):
     """Basic entity with common functionality."""
@@ -25,14 +50,40 @@ class KomodoEntity(CoordinatorEntity[KomodoCoordinator], Entity):
         extractor,
         key: str,
         device_info: DeviceInfo | None,
+        change_key: tuple | None = None,
+        attributes: AttributesExtractor | None = None,
     ) -> None:
-        """Initialize the common functionality."""
-        super().__init__(coordinator)
+        """Initialize the common functionality.
+
+        With a change_key the entity is only notified when the coordinator
+        reports that object as changed.
+        """
+        super().__init__(coordinator, change_key)
         self._extractor = extractor
+        self._attributes = attributes
         self._attr_translation_key = key
         self._attr_has_entity_name = True
         self._attr_unique_id = f"{item_id}_{key}"
         self._attr_device_info = device_info
+        self._written_available = True
+        if attributes is not None:
+            self._attr_extra_state_attributes = attributes(coordinator.data)
+
+    @callback
+    def _write_if_changed(self, changed: bool) -> None:
+        """Write the state only when the value, the attributes or the availability changed."""
+        if self._attributes is not None:
+            attributes = self._attributes(self.coordinator.data)
+            if attributes != self._attr_extra_state_attributes:
+                self._attr_extra_state_attributes = attributes
+                changed = True
+        available = self.available
+        if not changed and available == self._written_available:
+            self.coordinator.stats.record_write(False)
+            return
+        self._written_available = available
+        self.coordinator.stats.record_write(True)
+        self.async_write_ha_state()
 
 
 class KomodoSensor(KomodoEntity, SensorEntity):
@@ -45,6 +96,8 @@ class KomodoSensor(KomodoEntity, SensorEntity):
         extractor,
         key: str,
         device_info: DeviceInfo | None = None,
+        change_key: tuple | None = None,
+        attributes: AttributesExtractor | None = None,
     ) -> None:
         """Initialize the sensor with the common coordinator."""
         KomodoEntity.__init__(
@@ -54,6 +107,8 @@ class KomodoSensor(KomodoEntity, SensorEntity):
             extractor=extractor,
             key=key,
             device_info=device_info,
+            change_key=change_key,
+            attributes=attributes,
         )
         self._attr_native_value = self._extractor(self.coordinator.data)
 
@@ -61,9 +116,11 @@ class KomodoSensor(KomodoEntity, SensorEntity):
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         new_value = self._extractor(self.coordinator.data)
-        _LOGGER.debug("%s : %s", self._attr_unique_id, new_value)
-        self._attr_native_value = new_value
-        self.async_write_ha_state()
+        changed = new_value != self._attr_native_value
+        if changed:
+            _LOGGER.debug("%s : %s", self._attr_unique_id, new_value)
+            self._attr_native_value = new_value
+        self._write_if_changed(changed)
 
 
 class KomodoBinarySensor(KomodoEntity, BinarySensorEntity):
@@ -76,6 +133,8 @@ class KomodoBinarySensor(KomodoEntity, BinarySensorEntity):
         extractor,
         key: str,
         device_info: DeviceInfo,
+        change_key: tuple | None = None,
+        attributes: AttributesExtractor | None = None,
     ) -> None:
         """Initialize the sensor with the coordinator."""
         KomodoEntity.__init__(
@@ -85,6 +144,8 @@ class KomodoBinarySensor(KomodoEntity, BinarySensorEntity):
             extractor=extractor,
             key=key,
             device_info=device_info,
+            change_key=change_key,
+            attributes=attributes,
         )
         self.is_on = self._extractor(self.coordinator.data)
 
@@ -92,9 +153,11 @@ class KomodoBinarySensor(KomodoEntity, BinarySensorEntity):
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         val = self._extractor(self.coordinator.data)
-        _LOGGER.debug("%s : %s", self._attr_unique_id, val)
-        self.is_on = val
-        self.async_write_ha_state()
+        changed = val != self.is_on
+        if changed:
+            _LOGGER.debug("%s : %s", self._attr_unique_id, val)
+            self.is_on = val
+        self._write_if_changed(changed)
 
 
 class KomodoOptionSensor(KomodoSensor):
@@ -108,6 +171,8 @@ class KomodoOptionSensor(KomodoSensor):
         key: str,
         device_info: DeviceInfo,
         options: list[str],
+        change_key: tuple | None = None,
+        attributes: AttributesExtractor | None = None,
     ) -> None:
         """Initialize the parent sensor."""
         self._attr_device_class = SensorDeviceClass.ENUM
@@ -118,4 +183,6 @@ class KomodoOptionSensor(KomodoSensor):
             extractor=extractor,
             key=key,
             device_info=device_info,
+            change_key=change_key,
+            attributes=attributes,
         )
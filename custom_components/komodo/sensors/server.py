@@ -1,18 +1,26 @@
+from typing import Collection
+
 from homeassistant.helpers.device_registry import DeviceInfo
 from komodo_api.types import ServerState
 
 from ..const import DOMAIN
 from ..coordinator import KomodoCoordinator
-from .common import KomodoOptionSensor, KomodoSensor
+from ..data.diff import server_key
+from ..data.index import UNKNOWN_SERVER
+from ..data.komodo_data import SERVERS
+from .common import KomodoOptionSensor, KomodoSensor, stale_attributes
 
 
 def create_server_sensors(
     coordinator: KomodoCoordinator,
     entry_id: str,
+    server_ids: Collection[str] | None = None,
 ) -> list[KomodoSensor]:
-    """Return a list of sensors, one device per server."""
+    """Return a list of sensors, one device per server (only the given ones with server_ids)."""
     sensors: list[KomodoSensor] = []
     for server in coordinator.data.servers.values():
+        if server_ids is not None and server.id not in server_ids:
+            continue
         device_info = DeviceInfo(
             identifiers={(DOMAIN, server.id)},
             name=server.name,
@@ -21,19 +29,14 @@ def create_server_sensors(
         )
 
         item_id = f"{entry_id}_{server.id}"
+        change_key = server_key(server.id)
+        attributes = stale_attributes(SERVERS, server.id)
 
-        def extractor(data, sid=server.id):
-            srv = data.get_server(sid)
-            state = srv.state
-            if state is None:
-                return None
-            return state.name
+        def extractor(data, key=change_key):
+            return data.index.get(key, UNKNOWN_SERVER).state
 
-        def joiner(data, sid=server.id):
-            srv = data.get_server(sid)
-            if srv.alerts:
-                return ", ".join(srv.alerts)
-            return ""
+        def joiner(data, key=change_key):
+            return data.index.get(key, UNKNOWN_SERVER).alerts
 
         sensors.append(
             KomodoOptionSensor(
@@ -42,6 +45,8 @@ def create_server_sensors(
                 extractor=extractor,
                 key="server_state",
                 device_info=device_info,
+                change_key=change_key,
+                attributes=attributes,
                 options=[state.name for state in ServerState],
             )
         )
@@ -52,11 +57,13 @@ def create_server_sensors(
                 extractor=joiner,
                 key="alert_list",
                 device_info=device_info,
+                change_key=change_key,
+                attributes=attributes,
             )
         )
 
-        def stack_counter(data, sid=server.id):
-            return data.servers[sid].stack_count
+        def stack_counter(data, key=change_key):
+            return data.index.get(key, UNKNOWN_SERVER).stack_count
 
         sensors.append(
             KomodoSensor(
@@ -65,11 +72,13 @@ def create_server_sensors(
                 extractor=stack_counter,
                 key="stack_count",
                 device_info=device_info,
+                change_key=change_key,
+                attributes=attributes,
             )
         )
 
-        def service_counter(data, sid=server.id):
-            return data.servers[sid].service_count
+        def service_counter(data, key=change_key):
+            return data.index.get(key, UNKNOWN_SERVER).service_count
 
         sensors.append(
             KomodoSensor(
@@ -78,6 +87,8 @@ def create_server_sensors(
                 extractor=service_counter,
                 key="service_count",
                 device_info=device_info,
+                change_key=change_key,
+                attributes=attributes,
             )
         )
 
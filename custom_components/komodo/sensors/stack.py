@@ -1,33 +1,39 @@
+from typing import Collection
+
 from ..coordinator import KomodoCoordinator
-from .common import KomodoSensor, KomodoOptionSensor, KomodoEntity
+from .common import KomodoSensor, KomodoOptionSensor, KomodoEntity, stale_attributes
 from komodo_api.types import StackState
 from ..utils import create_stack_device_info
+from ..data.diff import stack_key
+from ..data.index import UNKNOWN_STACK
+from ..data.komodo_data import STACKS
 
 
 def create_stack_sensors(
     coordinator: KomodoCoordinator,
     entry_id: str,
+    stack_ids: Collection[str] | None = None,
 ) -> list[KomodoSensor]:
     """
-    Returns a list of sensors.
+    Returns a list of sensors, for the given stacks only with stack_ids.
     """
     sensors: list[KomodoSensor] = []
     for stack in coordinator.data.stacks.values():
+        if stack_ids is not None and stack.id not in stack_ids:
+            continue
         device_info = create_stack_device_info(
             stack.id, stack.name, stack.server_id
         )
 
         item_id = f"{entry_id}_{stack.id}"
+        change_key = stack_key(stack.id)
+        attributes = stale_attributes(STACKS)
 
-        def extractor(data, sid=stack.id):
-            stk = data.get_stack(sid)
-            return stk.state.name
+        def extractor(data, key=change_key):
+            return data.index.get(key, UNKNOWN_STACK).state
 
-        def joiner(data, sid=stack.id):
-            stk = data.get_stack(sid)
-            if stk.alerts:
-                return ", ".join(stk.alerts)
-            return ""
+        def joiner(data, key=change_key):
+            return data.index.get(key, UNKNOWN_STACK).alerts
 
         sensors.append(
             KomodoOptionSensor(
@@ -36,6 +42,8 @@ def create_stack_sensors(
                 extractor=extractor,
                 key="stack_state",
                 device_info=device_info,
+                change_key=change_key,
+                attributes=attributes,
                 options=[state.name for state in StackState],
             )
         )
@@ -46,6 +54,8 @@ def create_stack_sensors(
                 extractor=joiner,
                 key="alert_list",
                 device_info=device_info,
+                change_key=change_key,
+                attributes=attributes,
             )
         )
 
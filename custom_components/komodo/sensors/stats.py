@@ -0,0 +1,101 @@
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+
+from ..coordinator import KomodoCoordinator
+from ..stats import ApiStats
+from .common import KomodoSensor
+
+
+class KomodoStatsSensor(KomodoSensor):
+    """Diagnostic sensor of the integration itself, disabled by default."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: KomodoCoordinator,
+        item_id: str,
+        extractor,
+        key: str,
+        unit: str | None = None,
+        device_class: SensorDeviceClass | None = None,
+        state_class: SensorStateClass = SensorStateClass.MEASUREMENT,
+    ) -> None:
+        """Initialize the sensor, notified after every refresh."""
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = state_class
+        super().__init__(
+            item_id=item_id,
+            coordinator=coordinator,
+            extractor=extractor,
+            key=key,
+        )
+
+
+def create_stats_sensors(
+    coordinator: KomodoCoordinator,
+    entry_id: str,
+    api_stats: ApiStats,
+) -> list[KomodoSensor]:
+    """
+    Returns the diagnostic sensors of the refreshes and API calls.
+    """
+    stats = coordinator.stats
+
+    def refresh_duration(data):
+        last = stats.last.get("full")
+        return round(last["duration"], 2) if last is not None else None
+
+    def refresh_calls(data):
+        last = stats.last.get("full")
+        return last["calls"] if last is not None else None
+
+    def api_latency(data):
+        p95 = api_stats.total().quantile(0.95)
+        return round(p95 * 1000) if p95 is not None else None
+
+    def hit_rate(data):
+        rate = stats.inspection_hit_rate
+        return round(rate) if rate is not None else None
+
+    item_id = f"{entry_id}_global"
+    return [
+        KomodoStatsSensor(
+            coordinator=coordinator,
+            item_id=item_id,
+            extractor=refresh_duration,
+            key="refresh_duration",
+            unit=UnitOfTime.SECONDS,
+            device_class=SensorDeviceClass.DURATION,
+        ),
+        KomodoStatsSensor(
+            coordinator=coordinator,
+            item_id=item_id,
+            extractor=refresh_calls,
+            key="refresh_api_calls",
+        ),
+        KomodoStatsSensor(
+            coordinator=coordinator,
+            item_id=item_id,
+            extractor=api_latency,
+            key="api_latency_p95",
+            unit=UnitOfTime.MILLISECONDS,
+            device_class=SensorDeviceClass.DURATION,
+        ),
+        KomodoStatsSensor(
+            coordinator=coordinator,
+            item_id=item_id,
+            extractor=hit_rate,
+            key="inspection_hit_rate",
+            unit=PERCENTAGE,
+        ),
+        KomodoStatsSensor(
+            coordinator=coordinator,
+            item_id=item_id,
+            extractor=lambda data: stats.entity_writes,
+            key="entity_writes",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+        ),
+    ]
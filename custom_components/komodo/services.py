@@ -0,0 +1,63 @@
+"""Services of the Komodo integration."""
+
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+from .base import KomodoBase
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_INSTALL_UPDATES = "install_updates"
+ATTR_STACKS = "stacks"
+
+INSTALL_UPDATES_SCHEMA = vol.Schema(
+    {vol.Optional(ATTR_STACKS): vol.All(cv.ensure_list, [cv.string])}
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def install_updates(call: ServiceCall) -> None:
+        """Install all pending updates, grouped into one deploy per stack.
+
+        Entries of the same host see the same stacks, so each stack is only
+        deployed by the first of them.
+        """
+        stacks = call.data.get(ATTR_STACKS)
+        komodos: list[KomodoBase] = list(hass.data.get(DOMAIN, {}).values())
+        claimed: set[tuple[str, str]] = set()
+        deploys = []
+        for komodo in komodos:
+            pending = [
+                (stack_id, service_name)
+                for stack_id, service_name in komodo.deployer.pending_updates(stacks)
+                if (komodo.host, stack_id) not in claimed
+            ]
+            claimed.update((komodo.host, stack_id) for stack_id, _ in pending)
+            deploys.append(komodo.deployer.deploy(pending))
+
+        failed = []
+        for komodo, results in zip(komodos, await asyncio.gather(*deploys)):
+            for stack_id, result in results.items():
+                name = komodo.coordinator.data.get_stack(stack_id).name
+                if isinstance(result, BaseException):
+                    _LOGGER.error("Failed to deploy stack %s: %s", name, result)
+                elif result.success:
+                    continue
+                failed.append(name)
+        if failed:
+            raise HomeAssistantError(
+                f"Failed to install the updates of stacks {', '.join(sorted(failed))}"
+            )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_INSTALL_UPDATES, install_updates, schema=INSTALL_UPDATES_SCHEMA
+    )
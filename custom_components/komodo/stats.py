@@ -0,0 +1,178 @@
+"""Counters and latency histograms of API calls, refreshes and entity writes."""
+
+import bisect
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator
+
+# Upper bounds in seconds of the latency histogram buckets; the last bucket
+# takes everything slower.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Calls per endpoint made while a refresh is running, see RefreshStats.track.
+_refresh_calls: ContextVar[Counter | None] = ContextVar("komodo_refresh_calls", default=None)
+
+
+class LatencyHistogram:
+    """Count, errors, total and maximum duration and bucket counts of one endpoint."""
+
+    __slots__ = ("count", "errors", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.count += other.count
+        self.errors += other.errors
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile, or the maximum for the last one."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+            "p95": self.quantile(0.95),
+            "buckets": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+                "inf": self.buckets[-1],
+            },
+        }
+
+
+class ApiStats:
+    """Latency histogram per endpoint of one client, e.g. ListStacks."""
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, LatencyHistogram] = {}
+
+    @contextmanager
+    def measure(self, endpoint: str) -> Iterator[None]:
+        """Time a call, counting it for the refresh it belongs to, if any."""
+        calls = _refresh_calls.get()
+        if calls is not None:
+            calls[endpoint] += 1
+        started = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            histogram = self.endpoints.get(endpoint)
+            if histogram is None:
+                histogram = self.endpoints[endpoint] = LatencyHistogram()
+            histogram.record(time.monotonic() - started, failed)
+
+    def total(self) -> LatencyHistogram:
+        """All endpoints together."""
+        total = LatencyHistogram()
+        for histogram in self.endpoints.values():
+            total.merge(histogram)
+        return total
+
+    def as_dict(self) -> dict:
+        return {
+            endpoint: histogram.as_dict()
+            for endpoint, histogram in sorted(self.endpoints.items())
+        }
+
+
+class RefreshStats:
+    """Timing and API calls of the last refresh of each kind, and running totals.
+
+    Kinds are e.g. "full", "stacks" for a partial stack refresh and
+    "inspections". Inspections reused counts the services whose state was a
+    hit in the inspection cache instead of being inspected again; services
+    that weren't due for an inspection count as neither.
+    """
+
+    def __init__(self) -> None:
+        self.last: dict[str, dict] = {}
+        self.durations: dict[str, LatencyHistogram] = {}
+        self.inspections = 0
+        self.inspections_reused = 0
+        self.entity_writes = 0
+        self.entity_writes_skipped = 0
+        self.time_to_first_entity: float | None = None
+
+    @asynccontextmanager
+    async def track(self, kind: str) -> AsyncIterator[Counter]:
+        """Time a refresh and count the API calls made while it runs, in any task it starts."""
+        calls: Counter = Counter()
+        token = _refresh_calls.set(calls)
+        started = time.monotonic()
+        failed = True
+        try:
+            yield calls
+            failed = False
+        finally:
+            _refresh_calls.reset(token)
+            duration = time.monotonic() - started
+            histogram = self.durations.get(kind)
+            if histogram is None:
+                histogram = self.durations[kind] = LatencyHistogram()
+            histogram.record(duration, failed)
+            self.last[kind] = {
+                "duration": duration,
+                "calls": sum(calls.values()),
+                "calls_per_endpoint": dict(calls),
+                "failed": failed,
+            }
+
+    def record_inspections(self, inspected: int, reused: int) -> None:
+        self.inspections += inspected
+        self.inspections_reused += reused
+
+    @property
+    def inspection_hit_rate(self) -> float | None:
+        """Share of the looked up inspections that were cache hits, in percent."""
+        total = self.inspections + self.inspections_reused
+        if not total:
+            return None
+        return 100 * self.inspections_reused / total
+
+    def record_write(self, written: bool) -> None:
+        """Count an entity update that wrote its state, or was skipped as unchanged."""
+        if written:
+            self.entity_writes += 1
+        else:
+            self.entity_writes_skipped += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "last": self.last,
+            "durations": {kind: histogram.as_dict() for kind, histogram in self.durations.items()},
+            "inspections": self.inspections,
+            "inspections_reused": self.inspections_reused,
+            "inspection_hit_rate": self.inspection_hit_rate,
+            "entity_writes": self.entity_writes,
+            "entity_writes_skipped": self.entity_writes_skipped,
+            "time_to_first_entity": self.time_to_first_entity,
+        }
@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 import logging
-from typing import Any
+from functools import partial
+from typing import Any, Collection
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from komodo_api.types import (
     ContainerStateStatusEnum,
@@ -21,20 +21,24 @@ from komodo_api.types import (
 from .utils import wait_for_completion, create_stack_device_info
 from .const import DOMAIN
 from .base import KomodoBase
+from .completion import CompletionTracker
 from .coordinator import KomodoCoordinator
-from .data.service import KomodoService
+from .data.diff import service_key
+from .data.index import ServiceValues
+from .entities import SERVICE, KomodoServiceEntity, async_track_entities
 from komodo_api.lib import KomodoClient
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class KomodoServiceSwitch(CoordinatorEntity[KomodoCoordinator], SwitchEntity):
+class KomodoServiceSwitch(KomodoServiceEntity, SwitchEntity):
     """Switch entity for a service in a stack."""
 
     def __init__(
         self,
         coordinator: KomodoCoordinator,
         api: KomodoClient,
+        completion: CompletionTracker,
         item_id: str,
         stack_id: str,
         stack_name: str,
@@ -43,43 +47,36 @@ class KomodoServiceSwitch(CoordinatorEntity[KomodoCoordinator], SwitchEntity):
         device_info,
     ) -> None:
         """Initialize the switch entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, service_key(stack_id, service_name))
         self._api = api
+        self._completion = completion
         self._stack_id = stack_id
         self._stack_name = stack_name
         self._service_name = service_name
         self._server_id = server_id
-        self._container = None
 
         self._attr_unique_id = f"{item_id}_switch"
         self._attr_device_info = device_info
         self._attr_name = f"{service_name}"
         self._attr_has_entity_name = True
 
-        self._update_attrs()
-
-    def _find_service(self) -> KomodoService | None:
-        """Find the service in the coordinator data."""
-        stack = self.coordinator.data.stacks.get(self._stack_id)
-        if not stack:
-            return None
-        return stack.services.get(self._service_name)
-
-    def _update_attrs(self) -> None:
-        """Update entity attributes from coordinator data."""
-        service = self._find_service()
-        if service and service.state is not None:
-            # Service is "on" when state is RUNNING
-            self._attr_is_on = service.state.running
-        else:
-            self._attr_is_on = None
+        self._update_attrs(self._lookup())
+        self._written_available = True
+
+    def _update_attrs(self, values: ServiceValues) -> None:
+        """Update entity attributes from the values of the service."""
+        self._values = values
+        # Service is "on" when state is RUNNING
+        self._attr_is_on = values.running
     
     async def query_container(self) -> str:
         """Query the container name."""
-        if self._container:
-            return self._container
+        container_id = self._lookup().container_id
+        if container_id:
+            # Known from the last inspection, possibly restored from the cache,
+            # and replaced in the index when a redeploy creates a new one.
+            return container_id
         response: InspectStackContainerResponse = await self._api.read.inspectStackContainer(InspectStackContainer(stack = self._stack_id, service = self._service_name))
-        self._container = response.id
         return response.id
 
     async def async_turn_on(self, **kwargs: Any) -> None:
@@ -89,11 +86,11 @@ class KomodoServiceSwitch(CoordinatorEntity[KomodoCoordinator], SwitchEntity):
             container = await self.query_container()
             update = await self._api.execute.startContainer(StartContainer(server=self._server_id, container = container))
             update = await wait_for_completion(
-                self.coordinator.my_api,
+                self._completion,
                 update,
                 f"Start {self._stack_name}/{self._service_name}",
             )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_request_stack_refresh([self._stack_id])
         except Exception as e:
             _LOGGER.error("Failed to start service %s: %s", self._service_name, e)
             raise
@@ -105,28 +102,27 @@ class KomodoServiceSwitch(CoordinatorEntity[KomodoCoordinator], SwitchEntity):
             container = await self.query_container()
             update = await self._api.execute.stopContainer(StopContainer(server=self._server_id, container= container))
             update = await wait_for_completion(
-                self.coordinator.my_api,
+                self._completion,
                 update,
                 f"Stop {self._stack_name}/{self._service_name}",
             )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_request_stack_refresh([self._stack_id])
         except Exception as e:
             _LOGGER.error("Failed to stop service %s: %s", self._service_name, e)
             raise
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._update_attrs()
-        self.async_write_ha_state()
+    def _shown(self, values: ServiceValues) -> tuple:
+        return (values.running,)
 
 
 def create_switch_entities_for_services(
     api: KomodoClient,
+    completion: CompletionTracker,
     coordinator: KomodoCoordinator,
     entry_id: str,
+    services: Collection[tuple[str, str]] | None = None,
 ) -> list[KomodoServiceSwitch]:
-    """Create switch entities for each service in each stack."""
+    """Create switch entities for each service in each stack, or only the given (stack id, service) pairs."""
     entities: list[KomodoServiceSwitch] = []
 
     for stack in coordinator.data.stacks.values():
@@ -135,9 +131,12 @@ def create_switch_entities_for_services(
         )
 
         for service in stack.services.values():
+            if services is not None and (stack.id, service.name) not in services:
+                continue
             entity = KomodoServiceSwitch(
                 coordinator=coordinator,
                 api = api,
+                completion=completion,
                 item_id=f"{entry_id}_{stack.id}_{service.name}",
                 stack_id=stack.id,
                 stack_name=stack.name,
@@ -156,5 +155,14 @@ async def async_setup_entry(
     """Setup switch platform."""
     komodo: KomodoBase = hass.data[DOMAIN][entry.entry_id]
 
-    entities = create_switch_entities_for_services(komodo.api, komodo.coordinator, entry.entry_id)
+    entities = async_track_entities(
+        entry,
+        komodo.coordinator,
+        async_add_entities,
+        SERVICE,
+        partial(
+            create_switch_entities_for_services,
+            komodo.api, komodo.completion, komodo.coordinator, entry.entry_id,
+        ),
+    )
     async_add_entities(entities)
@@ -2,26 +2,27 @@
 
 from __future__ import annotations
 import logging
-from typing import Any
+from functools import partial
+from typing import Any, Collection
 from homeassistant.components.update import UpdateEntity, UpdateEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from komodo_api.types import DeployStack, Update
-
-from .utils import wait_for_completion, create_stack_device_info
+from .utils import create_stack_device_info
 
 from .const import DOMAIN
 from .base import KomodoBase
+from .bulk import KomodoBulkDeployer
 from .coordinator import KomodoCoordinator
-from .data.service import KomodoService
+from .data.diff import service_key
+from .data.index import ServiceValues
+from .entities import SERVICE, KomodoServiceEntity, async_track_entities
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class KomodoUpdateEntity(CoordinatorEntity[KomodoCoordinator], UpdateEntity):
+class KomodoUpdateEntity(KomodoServiceEntity, UpdateEntity):
     """Update entity for a service in a stack."""
 
     _attr_supported_features = UpdateEntityFeature.INSTALL
@@ -29,6 +30,7 @@ class KomodoUpdateEntity(CoordinatorEntity[KomodoCoordinator], UpdateEntity):
     def __init__(
         self,
         coordinator: KomodoCoordinator,
+        deployer: KomodoBulkDeployer,
         item_id: str,
         stack_id: str,
         stack_name: str,
@@ -36,31 +38,27 @@ class KomodoUpdateEntity(CoordinatorEntity[KomodoCoordinator], UpdateEntity):
         device_info: DeviceInfo,
     ) -> None:
         """Initialize the update entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, service_key(stack_id, service_name))
+        self._deployer = deployer
         self._stack_id = stack_id
         self._stack_name = stack_name
         self._service_name = service_name
+        self._title = f"{service_name}: "
 
         self._attr_unique_id = f"{item_id}_update"
         self._attr_device_info = device_info
         self._attr_name = service_name
 
-        self._update_attrs()
-
-    def _find_service(self) -> KomodoService | None:
-        """Find the service in the coordinator data."""
-        stack = self.coordinator.data.stacks.get(self._stack_id)
-        if not stack:
-            return None
-        return stack.services.get(self._service_name)
-
-    def _update_attrs(self) -> None:
-        """Update entity attributes from coordinator data."""
-        service = self._find_service()
-        if service and service.update_info:
-            self._attr_installed_version = service.update_info.current_version
-            self._attr_latest_version = service.update_info.new_version
-            self._attr_title = f"{self._service_name}: "
+        self._update_attrs(self._lookup())
+        self._written_available = True
+
+    def _update_attrs(self, values: ServiceValues) -> None:
+        """Update entity attributes from the values of the service."""
+        self._values = values
+        if values.installed_version is not None:
+            self._attr_installed_version = values.installed_version
+            self._attr_latest_version = values.latest_version
+            self._attr_title = self._title
         else:
             self._attr_installed_version = "0"
             self._attr_latest_version = "0"
@@ -70,28 +68,19 @@ class KomodoUpdateEntity(CoordinatorEntity[KomodoCoordinator], UpdateEntity):
         self, version: str | None, backup: bool, **kwargs: Any
     ) -> None:
         """Install an update."""
-        update: Update = await self.coordinator.my_api.execute.deployStack(
-            DeployStack(stack=self._stack_id, services=[self._service_name])
-        )
-        update = await wait_for_completion(
-            self.coordinator.my_api,
-            update,
-            f"Update of {self._stack_name}/{self._service_name}",
-        )
-        await self.coordinator.async_refresh()
+        await self._deployer.install(self._stack_id, self._service_name)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._update_attrs()
-        self.async_write_ha_state()
+    def _shown(self, values: ServiceValues) -> tuple:
+        return (values.installed_version, values.latest_version)
 
 
 def create_update_entities_for_services(
     coordinator: KomodoCoordinator,
+    deployer: KomodoBulkDeployer,
     entry_id: str,
+    services: Collection[tuple[str, str]] | None = None,
 ) -> list[KomodoUpdateEntity]:
-    """Create update entities for each service in each stack."""
+    """Create update entities for each service in each stack, or only the given (stack id, service) pairs."""
     entities: list[KomodoUpdateEntity] = []
 
     for stack in coordinator.data.stacks.values():
@@ -100,8 +89,11 @@ def create_update_entities_for_services(
         )
 
         for service in stack.services.values():
+            if services is not None and (stack.id, service.name) not in services:
+                continue
             entity = KomodoUpdateEntity(
                 coordinator=coordinator,
+                deployer=deployer,
                 item_id=f"{entry_id}_{stack.id}_{service.name}",
                 stack_id=stack.id,
                 stack_name=stack.name,
@@ -119,5 +111,14 @@ async def async_setup_entry(
     """Setup update platform."""
     komodo: KomodoBase = hass.data[DOMAIN][entry.entry_id]
 
-    entities = create_update_entities_for_services(komodo.coordinator, entry.entry_id)
+    entities = async_track_entities(
+        entry,
+        komodo.coordinator,
+        async_add_entities,
+        SERVICE,
+        partial(
+            create_update_entities_for_services,
+            komodo.coordinator, komodo.deployer, entry.entry_id,
+        ),
+    )
     async_add_entities(entities)
@@ -1,8 +1,7 @@
 import ipaddress
-import asyncio
-from komodo_api.lib import KomodoClient
-from komodo_api.types import Update, UpdateStatus, GetUpdate
+from komodo_api.types import Update
 from homeassistant.helpers.device_registry import DeviceInfo
+from .completion import CompletionTracker
 from .const import DOMAIN
 
 import logging
@@ -38,10 +37,8 @@ def fix_host(host: str) -> str:
         return f"https://{host}"
 
 
-async def wait_for_completion(client: KomodoClient, update: Update, title: str):
-    while not update.status == UpdateStatus.COMPLETE:
-        await asyncio.sleep(1)
-        update = await client.read.getUpdate(GetUpdate(id=update.id.oid))
+async def wait_for_completion(tracker: CompletionTracker, update: Update, title: str):
+    update = await tracker.wait(update)
 
     if update.success:
         _LOGGER.info("%s successful", title)
@@ -0,0 +1,436 @@
+"""In-process fake Komodo core for tests and benchmarks.
+
+FakeKomodo answers the requests the integration sends from a generated fleet
+of servers, stacks, services, alerts and updates. Responses are validated
+into the same komodo_api types a real core's JSON would be parsed into, and
+FakeKomodo.client() plugs it in below SharedKomodoClient, so deadlines,
+retries, read merging and API stats all run as in production.
+
+server_item and stack_item build single list items the same way, for tests
+that fill KomodoData or mock the API without a fake core.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Collection, Iterable
+
+import aiohttp
+from komodo_api.exceptions import KomodoException
+from komodo_api.lib import ApiKeyInitOptions, KomodoClient
+from komodo_api.types import ServerListItem, ServerState, StackListItem, StackState
+from pydantic import TypeAdapter
+
+from custom_components.komodo.clients import SharedKomodoClient
+
+VERSION_LABEL = "org.opencontainers.image.version"
+
+# What the core answers when a stack has no container for the service.
+NO_CONTAINER_ERROR = "No service found matching"
+
+
+@lru_cache(maxsize=None)
+def _adapter(clz) -> TypeAdapter:
+    return TypeAdapter(clz)
+
+
+def _server_payload(server_id: str, state: str = "Ok", version: str = "1.17.0") -> dict:
+    return {
+        "id": server_id,
+        "type": "Server",
+        "name": server_id,
+        "template": False,
+        "tags": [],
+        "info": {
+            "state": state,
+            "region": "",
+            "version": version,
+            "send_unreachable_alerts": True,
+            "send_cpu_alerts": True,
+            "send_mem_alerts": True,
+            "send_disk_alerts": True,
+            "send_version_mismatch_alerts": True,
+            "terminals_disabled": False,
+            "container_terminals_disabled": False,
+        },
+    }
+
+
+def _stack_payload(stack_id: str, server_id: str, state: str, services: dict[str, bool]) -> dict:
+    """A stack list item with the given services and whether each has an update available."""
+    return {
+        "id": stack_id,
+        "type": "Stack",
+        "name": stack_id,
+        "template": False,
+        "tags": [],
+        "info": {
+            "swarm_id": "",
+            "server_id": server_id,
+            "files_on_host": False,
+            "file_contents": True,
+            "linked_repo": "",
+            "git_provider": "",
+            "repo": "",
+            "branch": "",
+            "repo_link": "",
+            "state": state,
+            "services": [
+                {
+                    "service": name,
+                    "image": f"registry.test/{name}:latest",
+                    "update_available": update_available,
+                }
+                for name, update_available in services.items()
+            ],
+            "project_missing": False,
+            "missing_files": [],
+        },
+    }
+
+
+def server_item(server_id: str, state: ServerState = ServerState.OK) -> ServerListItem:
+    """A server as ListServers returns it."""
+    return _adapter(ServerListItem).validate_python(_server_payload(server_id, state.value))
+
+
+def stack_item(
+    stack_id: str,
+    services: Iterable[str] = ("web",),
+    state: StackState = StackState.RUNNING,
+    server_id: str = "srv",
+    updates: Collection[str] = (),
+) -> StackListItem:
+    """A stack as ListStacks returns it, whose services in updates have an update available."""
+    payload = _stack_payload(
+        stack_id, server_id, state.value, {name: name in updates for name in services}
+    )
+    return _adapter(StackListItem).validate_python(payload)
+
+
+class _FakeTransport(KomodoClient):
+    """Sends requests to a FakeKomodo instead of over HTTP."""
+
+    fake: "FakeKomodo"
+
+    async def request(self, path: str, request, clz):
+        return await self.fake.handle(path, request, clz)
+
+
+class FakeKomodoClient(SharedKomodoClient, _FakeTransport):
+    """SharedKomodoClient whose requests end in a FakeKomodo."""
+
+
+class FakeKomodo:
+    """A Komodo core with servers * stacks * services_per_stack services.
+
+    Stacks are spread round robin over the servers; down_rate of them have
+    no containers and update_rate of the services have an update available.
+    Every request waits latency seconds, plus up to jitter more, and fails
+    with failure_status at failure_rate. Inspections of stacks on
+    failing_servers always fail and requests to hung_endpoints never
+    answer. All randomness comes from seed.
+    """
+
+    def __init__(
+        self,
+        servers: int = 50,
+        stacks: int = 1000,
+        services_per_stack: int = 5,
+        alerts: int = 500,
+        alert_page_size: int = 100,
+        update_rate: float = 0.1,
+        down_rate: float = 0.02,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        failing_servers: frozenset[str] = frozenset(),
+        hung_endpoints: frozenset[str] = frozenset(),
+        seed: int = 0,
+    ) -> None:
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.failing_servers = set(failing_servers)
+        self.hung_endpoints = set(hung_endpoints)
+        self.alert_page_size = alert_page_size
+        self.calls: Counter = Counter()
+        self.server_ids = [f"server{i:03d}" for i in range(servers)]
+        self.servers = {server_id: _server_payload(server_id) for server_id in self.server_ids}
+        self.stacks: dict[str, dict] = {}
+        self.containers: dict[tuple[str, str], dict] = {}
+        for i in range(stacks):
+            self._add_stack(
+                f"stack{i:05d}",
+                self.server_ids[i % servers],
+                services_per_stack,
+                update_rate,
+                down=self.random.random() < down_rate,
+            )
+        self.alerts = [self._alert(i) for i in range(alerts)]
+        self.updates: dict[str, dict] = {}
+
+    @property
+    def service_count(self) -> int:
+        return sum(len(stack["info"]["services"]) for stack in self.stacks.values())
+
+    @asynccontextmanager
+    async def client(self) -> AsyncIterator[FakeKomodoClient]:
+        """A client of this core, to be used inside the running event loop."""
+        connector = aiohttp.TCPConnector()
+        client = FakeKomodoClient("http://komodo.test", ApiKeyInitOptions("key", "secret"), connector)
+        client.fake = self
+        try:
+            yield client
+        finally:
+            await client.close()
+            await connector.close()
+
+    # Fleet.
+
+    def _add_stack(
+        self, stack_id: str, server_id: str, services: int, update_rate: float, down: bool
+    ) -> None:
+        entries = {}
+        for j in range(services):
+            name = f"service{j}"
+            entries[name] = self.random.random() < update_rate
+            if not down:
+                self.containers[(stack_id, name)] = {
+                    "id": f"{self.random.getrandbits(256):064x}",
+                    "image": f"{self.random.getrandbits(256):064x}",
+                    "running": True,
+                    "version": f"1.{self.random.randrange(10)}.0",
+                }
+        self.stacks[stack_id] = _stack_payload(
+            stack_id, server_id, "down" if down else "running", entries
+        )
+
+    def _alert(self, i: int) -> dict:
+        if i % 2:
+            server_id = self.server_ids[i % len(self.server_ids)]
+            target = {"type": "Server", "id": server_id}
+            data = {"type": "ServerCpu", "data": {"id": server_id, "name": server_id, "percentage": 95.0}}
+        else:
+            stack_id = list(self.stacks)[i % len(self.stacks)] if self.stacks else "none"
+            target = {"type": "Stack", "id": stack_id}
+            data = {
+                "type": "StackStateChange",
+                "data": {"id": stack_id, "name": stack_id, "from": "running", "to": "unhealthy"},
+            }
+        return {
+            "ts": 1_700_000_000_000 + i,
+            "resolved": False,
+            "level": "WARNING",
+            "target": target,
+            "data": data,
+        }
+
+    def churn(self, count: int) -> list[str]:
+        """Stop count running stacks or start stopped ones, as if users acted on them."""
+        changed = self.random.sample(
+            [s for s, stack in self.stacks.items() if stack["info"]["state"] != "down"], count
+        )
+        for stack_id in changed:
+            info = self.stacks[stack_id]["info"]
+            running = info["state"] != "running"
+            info["state"] = "running" if running else "stopped"
+            for entry in info["services"]:
+                self.containers[(stack_id, entry["service"])]["running"] = running
+        return changed
+
+    # Requests.
+
+    async def handle(self, path: str, request, clz):
+        # Requests come wrapped, e.g. ReadRequestListStacks(params=ListStacks(...)).
+        request = request.params
+        endpoint = type(request).__name__
+        self.calls[endpoint] += 1
+        if endpoint in self.hung_endpoints:
+            await asyncio.Event().wait()
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.random.random() * self.jitter)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            self._fail(f"Simulated failure of {endpoint}", self.failure_status)
+        handler = getattr(self, f"_{path}_{endpoint}", None)
+        if handler is None:
+            self._fail(f"{endpoint} is not simulated", 400)
+        return _adapter(clz).validate_python(handler(request))
+
+    @staticmethod
+    def _fail(error: str, status: int):
+        raise KomodoException({"error": error, "trace": []}, status)
+
+    def _read_ListServers(self, request) -> list:
+        return list(self.servers.values())
+
+    def _read_ListStacks(self, request) -> list:
+        names = request.query.names if request.query is not None else None
+        if not names:
+            return list(self.stacks.values())
+        return [stack for stack in self.stacks.values() if stack["name"] in names]
+
+    def _read_ListAlerts(self, request) -> dict:
+        start = request.page * self.alert_page_size
+        end = start + self.alert_page_size
+        return {
+            "alerts": self.alerts[start:end],
+            "next_page": request.page + 1 if end < len(self.alerts) else None,
+        }
+
+    def _read_InspectStackContainer(self, request) -> dict:
+        stack = self.stacks[request.stack]
+        if stack["info"]["server_id"] in self.failing_servers:
+            self._fail("Failed to reach periphery", 500)
+        container = self.containers.get((request.stack, request.service))
+        if container is None or stack["info"]["state"] == "down":
+            self._fail(f"{NO_CONTAINER_ERROR} {request.service}", 500)
+        return self.container_payload(request.stack, request.service)
+
+    def container_payload(self, stack_id: str, service: str) -> dict:
+        """Docker inspect of the container of a service, about the size a real core sends."""
+        container = self.containers[(stack_id, service)]
+        running = container["running"]
+        project = f"{stack_id}_default"
+        return {
+            "Id": container["id"],
+            "Created": "2025-01-01T00:00:00.000000000Z",
+            "Path": "/docker-entrypoint.sh",
+            "Args": ["serve", "--port", "8080"],
+            "Name": f"/{stack_id}-{service}-1",
+            "Image": f"sha256:{container['image']}",
+            "RestartCount": 0,
+            "Driver": "overlay2",
+            "Platform": "linux",
+            "State": {
+                "Status": "running" if running else "exited",
+                "Running": running,
+                "Paused": False,
+                "Restarting": False,
+                "OOMKilled": False,
+                "Dead": False,
+                "Pid": 4242 if running else 0,
+                "ExitCode": 0,
+                "Error": "",
+                "StartedAt": "2025-01-01T00:00:01.000000000Z",
+                "FinishedAt": "0001-01-01T00:00:00Z",
+            },
+            "HostConfig": {
+                "NetworkMode": project,
+                "RestartPolicy": {"Name": "unless-stopped", "MaximumRetryCount": 0},
+                "Binds": [f"/srv/{stack_id}/{service}:/data:rw"],
+                "LogConfig": {"Type": "json-file", "Config": {}},
+            },
+            "Mounts": [{
+                "Type": "bind",
+                "Source": f"/srv/{stack_id}/{service}",
+                "Destination": "/data",
+                "Mode": "rw",
+                "RW": True,
+                "Propagation": "rprivate",
+            }],
+            "Config": {
+                "Hostname": container["id"][:12],
+                "Image": f"registry.test/{service}:latest",
+                "Env": [f"VARIABLE_{i}=value" for i in range(20)],
+                "Cmd": ["serve", "--port", "8080"],
+                "WorkingDir": "/app",
+                "Labels": {
+                    VERSION_LABEL: container["version"],
+                    "org.opencontainers.image.source": f"https://git.test/{service}",
+                    "org.opencontainers.image.revision": container["image"][:40],
+                    "com.docker.compose.project": stack_id,
+                    "com.docker.compose.service": service,
+                    "com.docker.compose.container-number": "1",
+                    "com.docker.compose.oneoff": "False",
+                    "com.docker.compose.config-hash": container["image"],
+                    "com.docker.compose.version": "2.32.1",
+                },
+            },
+            "NetworkSettings": {
+                "Networks": {
+                    project: {
+                        "Aliases": [f"{stack_id}-{service}-1", service],
+                        "NetworkID": container["image"],
+                        "EndpointID": container["id"],
+                        "Gateway": "172.18.0.1",
+                        "IPAddress": "172.18.0.2",
+                        "IPPrefixLen": 16,
+                        "MacAddress": "02:42:ac:12:00:02",
+                    },
+                },
+            },
+        }
+
+    def _read_GetUpdate(self, request) -> dict:
+        update = self.updates.get(request.id)
+        if update is None:
+            self._fail(f"No update with id {request.id}", 404)
+        return update
+
+    def _read_ListUpdates(self, request) -> dict:
+        update_ids = None
+        if request.query and "_id" in request.query:
+            update_ids = [oid["$oid"] for oid in request.query["_id"]["$in"]]
+        updates = [
+            update for update_id, update in self.updates.items()
+            if update_ids is None or update_id in update_ids
+        ]
+        return {
+            "updates": [
+                {
+                    "id": update["_id"]["$oid"],
+                    "operation": update["operation"],
+                    "start_ts": update["start_ts"],
+                    "success": update["success"],
+                    "username": update["operator"],
+                    "operator": update["operator"],
+                    "target": update["target"],
+                    "status": update["status"],
+                }
+                for update in updates
+            ],
+            "next_page": None,
+        }
+
+    def _execute_DeployStack(self, request) -> dict:
+        info = self.stacks[request.stack]["info"]
+        for entry in info["services"]:
+            if request.services is None or entry["service"] in request.services:
+                entry["update_available"] = False
+        return self._update("DeployStack", {"type": "Stack", "id": request.stack})
+
+    def _execute_StartContainer(self, request) -> dict:
+        self._set_running(request.container, True)
+        return self._update("StartContainer", {"type": "Server", "id": request.server})
+
+    def _execute_StopContainer(self, request) -> dict:
+        self._set_running(request.container, False)
+        return self._update("StopContainer", {"type": "Server", "id": request.server})
+
+    def _set_running(self, container_id: str, running: bool) -> None:
+        for container in self.containers.values():
+            if container["id"] == container_id:
+                container["running"] = running
+                return
+        self._fail(f"No container {container_id}", 500)
+
+    def _update(self, operation: str, target: dict) -> dict:
+        update_id = f"{len(self.updates):024x}"
+        self.updates[update_id] = {
+            "_id": {"$oid": update_id},
+            "operation": operation,
+            "start_ts": int(time.time() * 1000),
+            "success": True,
+            "operator": "fake",
+            "target": target,
+            "logs": [],
+            "status": "Complete",
+        }
+        return self.updates[update_id]
@@ -0,0 +1,172 @@
+"""Refresh benchmarks against the fake core, at 50 servers, 1000 stacks and 5000 services.
+
+Run with `pytest tests/test_benchmarks.py`; `--benchmark-skip` leaves them out
+of a normal test run. Besides the timings, the API calls per endpoint, the
+entity writes and the peak memory of a refresh, and the memory kept per
+inspection, are saved in extra_info.
+"""
+
+import asyncio
+import json
+import tracemalloc
+from unittest.mock import MagicMock
+
+import pytest
+from komodo_api.types import InspectStackContainerResponse
+from pydantic import TypeAdapter
+
+pytest.importorskip("pytest_benchmark")
+
+from custom_components.komodo.const import (
+    CONF_ALERT_INTERVAL,
+    CONF_SERVER_INTERVAL,
+    CONF_STACK_INTERVAL,
+)
+from custom_components.komodo.coordinator import KomodoCoordinator
+from custom_components.komodo.data.service import InspectedContainer, InspectionRecord
+from custom_components.komodo.sensors.server import create_server_sensors
+from custom_components.komodo.sensors.stack import create_stack_sensors
+from custom_components.komodo.switch import create_switch_entities_for_services
+from custom_components.komodo.update import create_update_entities_for_services
+
+from .simulator import FakeKomodo
+
+FLEET = {"servers": 50, "stacks": 1000, "services_per_stack": 5}
+
+# The lists are fetched on every refresh, inspections follow their own schedule.
+LISTS_EVERY_REFRESH = {CONF_SERVER_INTERVAL: 0, CONF_STACK_INTERVAL: 0, CONF_ALERT_INTERVAL: 0}
+
+CHURN = 10
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def _attach_entities(coordinator):
+    entities = (
+        create_server_sensors(coordinator, "entry")
+        + create_stack_sensors(coordinator, "entry")
+        + create_switch_entities_for_services(MagicMock(), MagicMock(), coordinator, "entry")
+        + create_update_entities_for_services(coordinator, MagicMock(), "entry")
+    )
+    for entity in entities:
+        entity.async_write_ha_state = MagicMock()
+        coordinator.async_add_listener(entity._handle_coordinator_update, entity.coordinator_context)
+    return entities
+
+
+def test_first_refresh(benchmark, loop):
+    fake = FakeKomodo(**FLEET)
+    assert fake.service_count == 5000
+
+    async def refresh():
+        async with fake.client() as api:
+            coordinator = KomodoCoordinator(MagicMock(), api, fast_start=False)
+            return await coordinator._async_update_data()
+
+    data = benchmark.pedantic(
+        lambda: loop.run_until_complete(refresh()), setup=fake.calls.clear, rounds=3
+    )
+    calls = dict(fake.calls)
+
+    tracemalloc.start()
+    try:
+        loop.run_until_complete(refresh())
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    benchmark.extra_info.update(api_calls=calls, peak_memory_mib=round(peak / 2**20, 1))
+    # One call per list and alert page, one inspection per service with a container.
+    assert calls == {
+        "ListServers": 1,
+        "ListStacks": 1,
+        "ListAlerts": 5,
+        "InspectStackContainer": len(fake.containers),
+    }
+    assert len(data.stacks) == 1000
+    assert data.alert_count == 500
+    assert peak < 32 * 2**20
+
+
+def test_refresh_with_few_changes(benchmark, loop):
+    fake = FakeKomodo(**FLEET)
+    calls, writes = [], []
+
+    async def start():
+        api_context = fake.client()
+        api = await api_context.__aenter__()
+        coordinator = KomodoCoordinator(
+            MagicMock(), api, fast_start=False, intervals=LISTS_EVERY_REFRESH
+        )
+        coordinator.async_set_updated_data(await coordinator._async_update_data())
+        _attach_entities(coordinator)
+        return api_context, coordinator
+
+    async def refresh():
+        written = coordinator.stats.entity_writes
+        coordinator.async_set_updated_data(await coordinator._async_update_data())
+        calls.append(dict(fake.calls))
+        writes.append(coordinator.stats.entity_writes - written)
+
+    def setup():
+        fake.churn(CHURN)
+        fake.calls.clear()
+
+    api_context, coordinator = loop.run_until_complete(start())
+    try:
+        benchmark.pedantic(lambda: loop.run_until_complete(refresh()), setup=setup, rounds=5)
+    finally:
+        loop.run_until_complete(api_context.__aexit__(None, None, None))
+
+    benchmark.extra_info.update(api_calls=calls[-1], entity_writes=writes[-1])
+    # Only the services of the changed stacks are inspected again, and only
+    # their stack state sensors and switches are written.
+    assert calls[-1] == {
+        "ListServers": 1,
+        "ListStacks": 1,
+        "ListAlerts": 5,
+        "InspectStackContainer": CHURN * 5,
+    }
+    assert writes[-1] == CHURN * (1 + 5)
+
+
+def _parse_full(adapter, payload):
+    # What every inspection cost before: the whole model, formatted for the debug log.
+    response = adapter.validate_json(payload)
+    str(response)
+    return response
+
+
+def _parse_slim(adapter, payload):
+    record = InspectionRecord.from_container(adapter.validate_json(payload))
+    str(record)
+    return record
+
+
+@pytest.mark.parametrize(
+    "parse, model",
+    [(_parse_full, InspectStackContainerResponse), (_parse_slim, InspectedContainer)],
+    ids=["full", "slim"],
+)
+def test_inspection_parsing(benchmark, parse, model):
+    fake = FakeKomodo(servers=1, stacks=100, services_per_stack=5, down_rate=0)
+    payloads = [json.dumps(fake.container_payload(*key)) for key in fake.containers]
+    adapter = TypeAdapter(model)
+    benchmark.group = "inspection parsing"
+
+    benchmark(lambda: [parse(adapter, payload) for payload in payloads])
+
+    tracemalloc.start()
+    try:
+        kept = [parse(adapter, payload) for payload in payloads]
+        per_inspection = tracemalloc.get_traced_memory()[0] / len(kept)
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["bytes_per_inspection"] = round(per_inspection)
+    if parse is _parse_slim:
+        assert per_inspection < 512
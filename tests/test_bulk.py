@@ -0,0 +1,142 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.komodo.bulk import KomodoBulkDeployer
+from custom_components.komodo.const import DOMAIN
+from custom_components.komodo.data.komodo_data import KomodoData
+from custom_components.komodo.services import async_setup_services
+
+from .simulator import stack_item
+
+
+def _deployer(stacks, per_server_limit=2):
+    data = KomodoData()
+    data.add_stacks(stacks)
+    data.finish_diff()
+    coordinator = MagicMock()
+    coordinator.data = data
+    coordinator.async_request_stack_refresh = AsyncMock()
+
+    running = {}
+    peak = {}
+
+    async def deploy_stack(request):
+        server = data.stacks[request.stack].server_id
+        running[server] = running.get(server, 0) + 1
+        peak[server] = max(peak.get(server, 0), running[server])
+        await asyncio.sleep(0.01)
+        running[server] -= 1
+        return SimpleNamespace(stack=request.stack, services=request.services)
+
+    api = MagicMock()
+    api.execute.deployStack = AsyncMock(side_effect=deploy_stack)
+    completion = MagicMock()
+    completion.wait = AsyncMock(side_effect=lambda update: SimpleNamespace(success=True, **vars(update)))
+    deployer = KomodoBulkDeployer(api, coordinator, completion, per_server_limit, batch_window=0.01)
+    return deployer, api, coordinator, peak
+
+
+def test_deploy_groups_services_per_stack_and_caps_servers():
+    stacks = [
+        stack_item(f"bulk_{i}", ["web", "db", "cache"], server_id=f"srv{i % 2}", updates={"web", "db"})
+        for i in range(6)
+    ]
+    deployer, api, coordinator, peak = _deployer(stacks)
+
+    pending = deployer.pending_updates()
+    results = asyncio.run(deployer.deploy(pending))
+
+    assert len(pending) == 12
+    assert api.execute.deployStack.await_count == 6
+    assert {tuple(call.args[0].services) for call in api.execute.deployStack.await_args_list} == {("db", "web")}
+    assert peak == {"srv0": 2, "srv1": 2}
+    assert all(result.success for result in results.values())
+    coordinator.async_request_stack_refresh.assert_awaited_once()
+    assert set(coordinator.async_request_stack_refresh.await_args.args[0]) == {s.id for s in stacks}
+
+
+def test_pending_updates_filters_by_stack_name():
+    deployer, *_ = _deployer([
+        stack_item("filter_a", updates={"web"}),
+        stack_item("filter_b", updates={"web"}),
+    ])
+
+    assert deployer.pending_updates(["filter_b"]) == [("filter_b", "web")]
+
+
+def test_concurrent_installs_are_batched():
+    deployer, api, coordinator, _ = _deployer([
+        stack_item("batch_a", ["web", "db"], updates={"web", "db"}),
+        stack_item("batch_b", ["app"], updates={"app"}),
+    ])
+
+    async def run():
+        return await asyncio.gather(
+            deployer.install("batch_a", "web"),
+            deployer.install("batch_a", "db"),
+            deployer.install("batch_b", "app"),
+        )
+
+    results = asyncio.run(run())
+
+    assert [result.stack for result in results] == ["batch_a", "batch_a", "batch_b"]
+    assert api.execute.deployStack.await_count == 2
+    coordinator.async_request_stack_refresh.assert_awaited_once()
+
+
+def test_failed_stack_only_fails_its_installs():
+    deployer, api, _, _ = _deployer([
+        stack_item("fail_a", updates={"web"}),
+        stack_item("fail_b", updates={"web"}),
+    ])
+    deploy = api.execute.deployStack.side_effect
+
+    async def failing(request):
+        if request.stack == "fail_a":
+            raise ConnectionError("down")
+        return await deploy(request)
+
+    api.execute.deployStack.side_effect = failing
+
+    async def run():
+        return await asyncio.gather(
+            deployer.install("fail_a", "web"),
+            deployer.install("fail_b", "web"),
+            return_exceptions=True,
+        )
+
+    failed, ok = asyncio.run(run())
+    assert isinstance(failed, ConnectionError)
+    assert ok.stack == "fail_b"
+
+
+def test_install_updates_service_reports_failed_stacks_once_per_host():
+    stacks = [stack_item("svc_a", updates={"web"}), stack_item("svc_b", updates={"web"})]
+    first, first_api, coordinator, _ = _deployer(stacks)
+    second, second_api, _, _ = _deployer(stacks)
+    deploy = first_api.execute.deployStack.side_effect
+
+    async def failing(request):
+        if request.stack == "svc_a":
+            raise ConnectionError("down")
+        return await deploy(request)
+
+    first_api.execute.deployStack.side_effect = failing
+    hass = MagicMock()
+    hass.data = {DOMAIN: {
+        "first": SimpleNamespace(host="https://komodo", deployer=first, coordinator=coordinator),
+        "second": SimpleNamespace(host="https://komodo", deployer=second, coordinator=coordinator),
+    }}
+    async_setup_services(hass)
+    install_updates = hass.services.async_register.call_args.args[2]
+
+    with pytest.raises(HomeAssistantError, match="svc_a") as error:
+        asyncio.run(install_updates(SimpleNamespace(data={})))
+
+    assert "svc_b" not in str(error.value)
+    assert first_api.execute.deployStack.await_count == 2
+    second_api.execute.deployStack.assert_not_awaited()
@@ -10,6 +10,10 @@ def mock_komodo_api():
     api.execute.runProcedure = AsyncMock()
     return api
 
+@pytest.fixture
+def mock_completion():
+    return MagicMock()
+
 @pytest.fixture
 def mock_procedure():
     class Procedure:
@@ -17,21 +21,21 @@ def mock_procedure():
         name = "Test Procedure"
     return Procedure()
 
-def test_button_entity_creation(mock_komodo_api, mock_procedure):
-    entity = button.KomodoProcedureButton(mock_komodo_api, "entry_id", mock_procedure)
+def test_button_entity_creation(mock_komodo_api, mock_completion, mock_procedure):
+    entity = button.KomodoProcedureButton(MagicMock(), mock_komodo_api, mock_completion, "entry_id", mock_procedure)
     assert entity.entity_id == "button.komodo_button_test_id"
     assert entity._attr_unique_id == "entry_id_button_test_id"
     assert entity._attr_name == "Procedure Test Procedure"
 
-def test_async_press_calls_runProcedure(monkeypatch, mock_komodo_api, mock_procedure):
-    entity = button.KomodoProcedureButton(mock_komodo_api, "entry_id", mock_procedure)
+def test_async_press_calls_runProcedure(monkeypatch, mock_komodo_api, mock_completion, mock_procedure):
+    entity = button.KomodoProcedureButton(MagicMock(), mock_komodo_api, mock_completion, "entry_id", mock_procedure)
     mock_update = MagicMock()
     mock_komodo_api.execute.runProcedure.return_value = mock_update
 
     # Patch wait_for_completion
     called = {}
-    async def fake_wait_for_completion(api, update, name):
-        called['api'] = api
+    async def fake_wait_for_completion(completion, update, name):
+        called['completion'] = completion
         called['update'] = update
         called['name'] = name
         return "done"
@@ -41,6 +45,58 @@ def test_async_press_calls_runProcedure(monkeypatch, mock_komodo_api, mock_proce
     mock_komodo_api.execute.runProcedure.assert_awaited_once_with(
         button.RunProcedure(procedure=mock_procedure.id)
     )
-    assert called['api'] == mock_komodo_api
+    assert called['completion'] == mock_completion
     assert called['update'] == mock_update
     assert called['name'] == "Procedure Test Procedure"
+
+def test_setup_does_not_wait_for_the_procedures(mock_procedure):
+    komodo = MagicMock()
+    komodo.procedures.data = None
+    komodo.procedures.async_refresh = AsyncMock()
+    komodo.coordinator.data.stacks = {}
+    hass = MagicMock()
+    hass.data = {button.DOMAIN: {"entry_id": komodo}}
+    entry = MagicMock(entry_id="entry_id")
+    add_entities = MagicMock()
+
+    asyncio.run(button.async_setup_entry(hass, entry, add_entities))
+
+    komodo.procedures.async_refresh.assert_not_awaited()
+    refresh = entry.async_create_background_task.call_args.args[1]
+    asyncio.run(refresh)
+    komodo.procedures.async_refresh.assert_awaited_once()
+
+    # The listener adds the buttons once the procedures are listed.
+    komodo.procedures.data = {mock_procedure.id: mock_procedure}
+    listener = komodo.procedures.async_add_listener.call_args.args[0]
+    listener()
+    added = add_entities.call_args.args[0]
+    assert [entity._procedure for entity in added] == [mock_procedure]
+
+def test_procedure_button_stays_available_when_a_listing_fails(mock_komodo_api, mock_completion, mock_procedure):
+    coordinator = MagicMock(data={mock_procedure.id: mock_procedure}, last_update_success=True)
+    entity = button.KomodoProcedureButton(coordinator, mock_komodo_api, mock_completion, "entry_id", mock_procedure)
+    entity.async_write_ha_state = MagicMock()
+
+    entity._handle_coordinator_update()
+    entity.async_write_ha_state.assert_not_called()
+
+    # A failed listing keeps the last procedures.
+    coordinator.last_update_success = False
+    entity._handle_coordinator_update()
+    assert entity.available is True
+    entity.async_write_ha_state.assert_not_called()
+
+    coordinator.data = {}
+    entity._handle_coordinator_update()
+    entity._handle_coordinator_update()
+    assert entity.available is False
+    assert entity.async_write_ha_state.call_count == 1
+
+    renamed = MagicMock(id=mock_procedure.id)
+    renamed.name = "Renamed"
+    coordinator.data = {mock_procedure.id: renamed}
+    entity._handle_coordinator_update()
+    assert entity.available is True
+    assert entity.async_write_ha_state.call_count == 2
+    assert entity._attr_name == "Procedure Renamed"
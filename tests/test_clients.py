@@ -0,0 +1,154 @@
+import asyncio
+import gc
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from komodo_api.lib import ApiKeyInitOptions, KomodoClient
+from komodo_api.types import (
+    GetVersion,
+    InspectStackContainer,
+    InspectStackContainerResponse,
+    ListStacks,
+    ReadRequestInspectStackContainer,
+)
+
+from custom_components.komodo.clients import KomodoClientRegistry
+from custom_components.komodo.data.service import InspectedContainer
+
+
+def test_clients_are_shared_per_host_and_credentials():
+    async def run():
+        registry = KomodoClientRegistry()
+        first = registry.acquire("http://core", ApiKeyInitOptions("key", "secret"))
+        same = registry.acquire("http://core", ApiKeyInitOptions("key", "secret"))
+        other = registry.acquire("http://core", ApiKeyInitOptions("other", "secret"))
+
+        assert same is first
+        assert other is not first
+        assert other._session.connector is first._session.connector
+        assert other._session.headers["x-api-key"] == "other"
+
+        connector = first._session.connector
+        await registry.release(first)
+        assert not first._session.closed
+        await registry.release(same)
+        assert first._session.closed
+        assert not connector.closed
+        await registry.release(other)
+        assert connector.closed
+
+    asyncio.run(run())
+
+
+def test_identical_concurrent_reads_are_sent_once(monkeypatch):
+    sent = []
+
+    async def request(self, path, request, clz):
+        sent.append(request.model_dump_json())
+        await asyncio.sleep(0.01)
+        return object()
+
+    monkeypatch.setattr(KomodoClient, "request", request)
+
+    async def run():
+        registry = KomodoClientRegistry()
+        client = registry.acquire("http://core", ApiKeyInitOptions("key", "secret"))
+        results = await asyncio.gather(
+            client.read.listStacks(ListStacks()),
+            client.read.listStacks(ListStacks()),
+            client.read.getVersion(GetVersion()),
+        )
+        # Once the first read finished, the same read is sent again.
+        await client.read.listStacks(ListStacks())
+        await registry.release(client)
+        return results
+
+    results = asyncio.run(run())
+
+    assert results[0] is results[1]
+    assert len(sent) == 3
+
+
+def test_reads_into_other_models_are_not_merged(monkeypatch):
+    sent = []
+
+    async def request(self, path, request, clz):
+        sent.append(clz)
+        await asyncio.sleep(0.01)
+        return clz()
+
+    monkeypatch.setattr(KomodoClient, "request", request)
+
+    async def run():
+        registry = KomodoClientRegistry()
+        client = registry.acquire("http://core", ApiKeyInitOptions("key", "secret"))
+        inspect = ReadRequestInspectStackContainer(
+            params=InspectStackContainer(stack="stack", service="web")
+        )
+        results = await asyncio.gather(
+            client.request("read", inspect, InspectedContainer),
+            client.request("read", inspect, InspectStackContainerResponse),
+        )
+        await registry.release(client)
+        return results
+
+    slim, full = asyncio.run(run())
+
+    assert type(slim) is InspectedContainer
+    assert type(full) is InspectStackContainerResponse
+    assert len(sent) == 2
+
+
+def test_failed_read_of_cancelled_callers_is_retrieved(monkeypatch):
+    async def request(self, path, request, clz):
+        await asyncio.sleep(0.01)
+        raise ConnectionResetError("reset")
+
+    monkeypatch.setattr(KomodoClient, "request", request)
+    monkeypatch.setattr("custom_components.komodo.clients.READ_RETRIES", 0)
+    unhandled = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: unhandled.append(context)
+        )
+        registry = KomodoClientRegistry()
+        client = registry.acquire("http://core", ApiKeyInitOptions("key", "secret"))
+        caller = asyncio.create_task(client.read.listStacks(ListStacks()))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.05)
+        await registry.release(client)
+        gc.collect()
+
+    asyncio.run(run())
+
+    assert unhandled == []
+
+
+def test_proxy_error_page_is_retried(monkeypatch):
+    monkeypatch.setattr("custom_components.komodo.resilience.random.uniform", lambda a, b: 0)
+    calls = []
+
+    async def read(request):
+        calls.append(None)
+        if len(calls) == 1:
+            return web.Response(
+                status=503, text="<html>Service Unavailable</html>", content_type="text/html"
+            )
+        return web.json_response([])
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/read", read)
+        async with TestServer(app) as server:
+            registry = KomodoClientRegistry()
+            host = str(server.make_url("")).rstrip("/")
+            client = registry.acquire(host, ApiKeyInitOptions("key", "secret"))
+            try:
+                return await client.read.listStacks(ListStacks())
+            finally:
+                await registry.release(client)
+
+    assert asyncio.run(run()) == []
+    assert len(calls) == 2
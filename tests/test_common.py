@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+from custom_components.komodo.sensors.common import KomodoSensor
+
+
+def _sensor(values):
+    coordinator = MagicMock()
+    coordinator.last_update_success = True
+    sensor = KomodoSensor(
+        item_id="entry",
+        coordinator=coordinator,
+        extractor=lambda data: values.pop(0),
+        key="alert_count",
+    )
+    sensor.async_write_ha_state = MagicMock()
+    return sensor, coordinator
+
+
+def test_sensor_skips_write_for_identical_value():
+    sensor, _ = _sensor([1, 1, 2])
+
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_not_called()
+
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.native_value == 2
+
+
+def test_sensor_writes_when_availability_changes():
+    sensor, coordinator = _sensor([1, 1, 1])
+
+    coordinator.last_update_success = False
+    sensor._handle_coordinator_update()
+    coordinator.last_update_success = True
+    sensor._handle_coordinator_update()
+
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+def test_sensor_writes_when_attributes_change():
+    coordinator = MagicMock()
+    coordinator.last_update_success = True
+    attributes = [{}, {}, {"stacks_stale_since": 1}]
+    sensor = KomodoSensor(
+        item_id="entry",
+        coordinator=coordinator,
+        extractor=lambda data: 1,
+        key="alert_count",
+        attributes=lambda data: attributes.pop(0),
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_not_called()
+
+    sensor._handle_coordinator_update()
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor.extra_state_attributes == {"stacks_stale_since": 1}
@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from komodo_api.types import UpdateStatus
+
+from custom_components.komodo.completion import CompletionTracker
+
+
+def _update(update_id, status=UpdateStatus.INPROGRESS):
+    return SimpleNamespace(id=SimpleNamespace(oid=update_id), status=status, success=True)
+
+
+class FakeUpdates:
+    """Updates that complete after a number of status checks."""
+
+    def __init__(self, checks_until_complete):
+        self.remaining = dict(checks_until_complete)
+
+    def status(self, update_id):
+        self.remaining[update_id] -= 1
+        if self.remaining[update_id] <= 0:
+            return UpdateStatus.COMPLETE
+        return UpdateStatus.INPROGRESS
+
+    async def get_update(self, request):
+        return _update(request.id, self.status(request.id))
+
+    async def list_updates(self, request):
+        ids = [oid["$oid"] for oid in request.query["_id"]["$in"]]
+        return SimpleNamespace(updates=[
+            SimpleNamespace(id=update_id, status=self.status(update_id)) for update_id in ids
+        ])
+
+
+def _tracker(fake):
+    api = MagicMock()
+    api.read.getUpdate = AsyncMock(side_effect=fake.get_update)
+    api.read.listUpdates = AsyncMock(side_effect=fake.list_updates)
+    return CompletionTracker(api, min_interval=0.01, max_interval=0.05), api
+
+
+def test_concurrent_waits_share_one_poll_per_cycle():
+    fake = FakeUpdates({f"u{i}": 3 for i in range(20)})
+    tracker, api = _tracker(fake)
+
+    async def run():
+        return await asyncio.gather(*(tracker.wait(_update(f"u{i}")) for i in range(20)))
+
+    results = asyncio.run(run())
+
+    assert all(result.status == UpdateStatus.COMPLETE for result in results)
+    assert api.read.listUpdates.await_count == 3
+    # One getUpdate per update, for the final state with logs.
+    assert api.read.getUpdate.await_count == 20
+    assert tracker.in_flight == 0
+
+
+def test_single_wait_uses_get_update_only():
+    fake = FakeUpdates({"u": 2})
+    tracker, api = _tracker(fake)
+
+    result = asyncio.run(tracker.wait(_update("u")))
+
+    assert result.status == UpdateStatus.COMPLETE
+    assert api.read.getUpdate.await_count == 2
+    api.read.listUpdates.assert_not_awaited()
+
+
+def test_completed_update_is_returned_immediately():
+    tracker, api = _tracker(FakeUpdates({}))
+    update = _update("u", UpdateStatus.COMPLETE)
+
+    assert asyncio.run(tracker.wait(update)) is update
+    api.read.getUpdate.assert_not_awaited()
+
+
+def test_pushed_completion_skips_polling():
+    fake = FakeUpdates({"u": 1000})
+    tracker, api = _tracker(fake)
+    tracker._min_interval = tracker._max_interval = 60
+
+    async def run():
+        waiter = asyncio.create_task(tracker.wait(_update("u")))
+        await asyncio.sleep(0)
+        fake.remaining["u"] = 1
+        tracker.handle_update(SimpleNamespace(id="u", status=UpdateStatus.COMPLETE))
+        return await asyncio.wait_for(waiter, 1)
+
+    result = asyncio.run(run())
+
+    assert result.status == UpdateStatus.COMPLETE
+    assert api.read.getUpdate.await_count == 1
+
+
+def test_repeated_failures_reach_the_waiter():
+    tracker, api = _tracker(FakeUpdates({}))
+    api.read.getUpdate.side_effect = ConnectionError("down")
+
+    async def run():
+        try:
+            await tracker.wait(_update("u"))
+        except ConnectionError:
+            return True
+        return False
+
+    assert asyncio.run(run())
@@ -0,0 +1,62 @@
+import asyncio
+
+from homeassistant import config_entries, loader
+from homeassistant.core import HomeAssistant
+
+from custom_components.komodo import config_flow
+from custom_components.komodo.const import (
+    CONF_ALERT_INTERVAL,
+    CONF_INSPECTION_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONF_SERVER_INTERVAL,
+    CONF_STACK_INTERVAL,
+    DOMAIN,
+)
+
+
+async def _hass(config_dir) -> HomeAssistant:
+    hass = HomeAssistant(str(config_dir))
+    loader.async_setup(hass)
+    # The config flow module is imported already, so no integration is loaded.
+    hass.data[loader.DATA_COMPONENTS][f"{DOMAIN}.config_flow"] = config_flow
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    return hass
+
+
+def test_options_flow_shows_and_saves_the_options(tmp_path):
+    options = {
+        CONF_PUSH_UPDATES: True,
+        CONF_SERVER_INTERVAL: 120,
+        CONF_STACK_INTERVAL: 60,
+        CONF_ALERT_INTERVAL: 45,
+        CONF_INSPECTION_INTERVAL: 600,
+    }
+
+    async def run():
+        hass = await _hass(tmp_path)
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="Komodo",
+            data={},
+            source=config_entries.SOURCE_USER,
+            options={CONF_ALERT_INTERVAL: 45},
+        )
+        hass.config_entries._entries[entry.entry_id] = entry
+        try:
+            form = await hass.config_entries.options.async_init(entry.entry_id)
+            result = await hass.config_entries.options.async_configure(form["flow_id"], options)
+        finally:
+            await hass.async_stop()
+        return form, result, entry
+
+    form, result, entry = asyncio.run(run())
+
+    assert form["type"] == "form"
+    defaults = {str(key): key.default() for key in form["data_schema"].schema}
+    assert defaults[CONF_ALERT_INTERVAL] == 45
+    assert defaults[CONF_PUSH_UPDATES] is False
+    assert result["type"] == "create_entry"
+    assert entry.options == options
@@ -0,0 +1,545 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, MagicMock
+
+from komodo_api.types import (
+    ContainerStateStatusEnum,
+    ResourceTargetServer,
+    ResourceTargetStack,
+    StackState,
+    UpdateStatus,
+)
+
+from custom_components.komodo.const import (
+    CONF_ALERT_INTERVAL,
+    CONF_INSPECTION_INTERVAL,
+    CONF_SERVER_INTERVAL,
+    CONF_STACK_INTERVAL,
+    DEFAULT_INTERVALS,
+)
+from custom_components.komodo.coordinator import KomodoCoordinator
+from custom_components.komodo.data.diff import service_key, stack_key
+
+from .simulator import FakeKomodo, server_item, stack_item
+
+
+def _container(version="1.0"):
+    return SimpleNamespace(
+        id="container",
+        image="sha256:image",
+        state=SimpleNamespace(status=ContainerStateStatusEnum.RUNNING),
+        config=SimpleNamespace(labels={"org.opencontainers.image.version": version}),
+    )
+
+
+def _alert_pages(total, per_page=100, stack_id="alerts_stack"):
+    alerts = [
+        SimpleNamespace(
+            data=SimpleNamespace(type="StackStateChange"),
+            target=ResourceTargetStack(id=stack_id),
+        )
+        for _ in range(total)
+    ]
+
+    async def list_alerts(request):
+        start = request.page * per_page
+        page = alerts[start:start + per_page]
+        more = start + per_page < total
+        return SimpleNamespace(alerts=page, next_page=request.page + 1 if more else None)
+
+    return AsyncMock(side_effect=list_alerts)
+
+
+def _coordinator(stacks, fast_start=False, intervals=None):
+    api = MagicMock()
+    api.read.listServers = AsyncMock(return_value=[])
+    api.read.listStacks = AsyncMock(return_value=stacks)
+    api.read.listAlerts = AsyncMock(return_value=SimpleNamespace(alerts=[], next_page=None))
+    api.read.inspectStackContainer = AsyncMock(return_value=_container())
+
+    async def request(path, request, clz):
+        # Inspections are parsed into a slim model, so they don't go through
+        # api.read; hand them to its mock all the same.
+        return await api.read.inspectStackContainer(request.params)
+
+    api.request = AsyncMock(side_effect=request)
+    # Every part is due on every refresh unless a test sets intervals.
+    intervals = intervals or {part: 0 for part in DEFAULT_INTERVALS}
+    return KomodoCoordinator(MagicMock(), api, fast_start=fast_start, intervals=intervals), api
+
+
+def test_each_service_is_inspected_once():
+    coordinator, api = _coordinator([
+        stack_item("plan_a", ["web", "db"], updates={"web"}),
+        stack_item("plan_b", ["app"], updates={"app"}),
+        stack_item("plan_down", ["idle"], updates={"idle"}, state=StackState.DOWN),
+    ])
+
+    data = asyncio.run(coordinator._async_update_data())
+
+    inspected = sorted(
+        (call.args[0].stack, call.args[0].service)
+        for call in api.read.inspectStackContainer.await_args_list
+    )
+    assert inspected == [("plan_a", "db"), ("plan_a", "web"), ("plan_b", "app")]
+    web = data.stacks["plan_a"].services["web"]
+    assert web.running is True
+    assert web.update_info.current_version == "1.0"
+    assert data.stacks["plan_a"].services["db"].update_info is None
+    assert coordinator.stats.inspections == 3
+    assert coordinator.stats.last["full"]["failed"] is False
+
+
+
+def test_services_not_due_for_inspection_are_not_cache_hits():
+    coordinator, api = _coordinator(
+        [stack_item("due_a")],
+        intervals={
+            CONF_SERVER_INTERVAL: 0,
+            CONF_STACK_INTERVAL: 0,
+            CONF_ALERT_INTERVAL: 0,
+            CONF_INSPECTION_INTERVAL: 300,
+        },
+    )
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    asyncio.run(coordinator._async_update_data())
+
+    api.read.inspectStackContainer.assert_awaited_once()
+    assert coordinator.stats.inspections_reused == 0
+    assert coordinator.stats.inspection_hit_rate == 0
+
+
+def test_fast_start_inspects_after_the_first_refresh():
+    coordinator, api = _coordinator([stack_item("fast_a")], fast_start=True)
+    coordinator.async_set_updated_data = MagicMock()
+
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    api.read.inspectStackContainer.assert_not_awaited()
+    assert coordinator.data.stacks["fast_a"].services["web"].inspection is None
+
+    asyncio.run(coordinator.async_inspect_services())
+    data = coordinator.async_set_updated_data.call_args.args[0]
+    assert data.stacks["fast_a"].services["web"].running is True
+    assert data.diff.services == {("fast_a", "web")}
+
+    coordinator.data = data
+    asyncio.run(coordinator._async_update_data())
+    assert api.read.inspectStackContainer.await_count == 2
+
+
+def test_cached_update_info_survives_failed_inspection():
+    coordinator, api = _coordinator([stack_item("plan_c", updates={"web"})])
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    cached = coordinator.data.stacks["plan_c"].services["web"].update_info
+
+    api.read.inspectStackContainer.side_effect = Exception("boom")
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert data.stacks["plan_c"].services["web"].update_info is cached
+
+
+def test_only_due_parts_are_refreshed():
+    coordinator, api = _coordinator(
+        [stack_item("tier_a"), stack_item("tier_b")],
+        intervals={
+            CONF_SERVER_INTERVAL: 60,
+            CONF_STACK_INTERVAL: 60,
+            CONF_ALERT_INTERVAL: 0,
+            CONF_INSPECTION_INTERVAL: 300,
+        },
+    )
+    assert coordinator.update_interval.total_seconds() == 0
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    for mock in (api.read.listServers, api.read.listStacks, api.read.listAlerts, api.read.inspectStackContainer):
+        mock.reset_mock()
+
+    data = asyncio.run(coordinator._async_update_data())
+    api.read.listServers.assert_not_awaited()
+    api.read.listStacks.assert_not_awaited()
+    api.read.listAlerts.assert_awaited_once()
+    api.read.inspectStackContainer.assert_not_awaited()
+    assert data.stacks["tier_a"] is coordinator.data.stacks["tier_a"]
+
+    # A changed stack is inspected as soon as the stacks are listed again.
+    coordinator.data = data
+    coordinator._last_refreshed.pop(CONF_STACK_INTERVAL)
+    api.read.listStacks.return_value = [
+        stack_item("tier_a", state=StackState.STOPPED),
+        stack_item("tier_b"),
+    ]
+    asyncio.run(coordinator._async_update_data())
+    assert [call.args[0].stack for call in api.read.inspectStackContainer.await_args_list] == ["tier_a"]
+
+
+def test_only_changed_stacks_are_copied():
+    coordinator, api = _coordinator([stack_item("share_a"), stack_item("share_b")])
+    api.read.listServers.return_value = [server_item("srv")]
+    first = coordinator.data = asyncio.run(coordinator._async_update_data())
+
+    second = asyncio.run(coordinator._async_update_data())
+    assert all(second.stacks[stack_id] is stack for stack_id, stack in first.stacks.items())
+    assert second.servers["srv"] is first.servers["srv"]
+    assert not second.diff
+
+    exited = _container()
+    exited.state = SimpleNamespace(status=ContainerStateStatusEnum.EXITED)
+    api.read.inspectStackContainer.side_effect = (
+        lambda params: exited if params.stack == "share_a" else _container()
+    )
+    coordinator.data = second
+    third = asyncio.run(coordinator._async_update_data())
+
+    assert third.stacks["share_a"] is not second.stacks["share_a"]
+    assert third.stacks["share_a"].services["web"].running is False
+    assert second.stacks["share_a"].services["web"].running is True
+    assert third.stacks["share_b"] is second.stacks["share_b"]
+    assert third.diff.services == {("share_a", "web")}
+
+
+def test_busy_and_touched_stacks_are_inspected_quickly():
+    coordinator, api = _coordinator([
+        stack_item("adapt_quiet"),
+        stack_item("adapt_busy", state=StackState.DEPLOYING),
+    ])
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+
+    assert coordinator._inspections.interval("adapt_quiet") == 0
+    assert coordinator._inspections.interval("adapt_busy") == 30
+
+    coordinator.async_refresh_stacks = AsyncMock()
+    coordinator._stack_refresh_delay = 0
+    asyncio.run(coordinator.async_request_stack_refresh(["adapt_quiet"]))
+    assert coordinator._inspections.interval("adapt_quiet") == 30
+
+
+def test_failed_stack_list_keeps_previous_stacks():
+    coordinator, api = _coordinator([stack_item("keep_a")])
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+
+    api.read.listStacks.side_effect = ConnectionError("down")
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert list(data.stacks) == ["keep_a"]
+    assert not data.diff.removed_stacks
+    refreshed_at = coordinator.data.refreshed_at["stacks"]
+    assert data.stale_since("stacks") == {"stacks": refreshed_at}
+    assert data.stale_since("servers") == {}
+    # Going stale is a change of every stack, for their attributes.
+    assert data.diff.stacks == {"keep_a"}
+
+    coordinator.data = data
+    api.read.listStacks.side_effect = None
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert data.stale_since("stacks") == {}
+    assert data.refreshed_at["stacks"] > refreshed_at
+
+
+def test_refresh_reports_inspection_changes():
+    coordinator, api = _coordinator([stack_item("plan_d")])
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+
+    data = asyncio.run(coordinator._async_update_data())
+    assert not data.diff
+
+    api.read.inspectStackContainer.return_value.state = SimpleNamespace(
+        status=ContainerStateStatusEnum.EXITED
+    )
+    coordinator.data = data
+    data = asyncio.run(coordinator._async_update_data())
+    assert data.diff.services == {("plan_d", "web")}
+    assert data.diff.stacks == set()
+
+
+def test_listeners_are_notified_only_for_changed_keys():
+    coordinator, api = _coordinator([
+        stack_item("notify_a"),
+        stack_item("notify_b"),
+    ])
+    calls = []
+    for context in (stack_key("notify_a"), stack_key("notify_b"), service_key("notify_b", "web"), None):
+        coordinator._listeners[object()] = (lambda context=context: calls.append(context), context)
+
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    coordinator.async_update_listeners()
+    assert len(calls) == 4
+
+    calls.clear()
+    api.read.listStacks.return_value = [
+        stack_item("notify_a", state=StackState.STOPPED),
+        stack_item("notify_b"),
+    ]
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    coordinator.async_update_listeners()
+    assert calls == [stack_key("notify_a"), None]
+
+    calls.clear()
+    coordinator.last_update_success = False
+    coordinator.async_update_listeners()
+    assert len(calls) == 4
+
+
+def test_all_alert_pages_are_aggregated():
+    coordinator, api = _coordinator([stack_item("alerts_stack")])
+    api.read.listAlerts = _alert_pages(1050)
+
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert data.alert_count == 1050
+    assert data.alert_summary == ", ".join(["StackStateChange"] * 1050)
+    assert data.stacks["alerts_stack"].alerts is data.alert_summary
+    pages = [call.args[0].page for call in api.read.listAlerts.await_args_list]
+    assert sorted(set(pages)) == list(range(max(pages) + 1))
+    assert max(pages) <= 12
+
+
+def test_single_alert_page_is_one_request():
+    coordinator, api = _coordinator([])
+    api.read.listAlerts = _alert_pages(3)
+
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert data.alert_count == 3
+    api.read.listAlerts.assert_awaited_once()
+
+
+def test_alert_pages_are_capped():
+    coordinator, api = _coordinator([])
+    coordinator._alert_max_pages = 3
+    api.read.listAlerts = _alert_pages(1000)
+
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert data.alert_count == 300
+    assert api.read.listAlerts.await_count == 3
+
+
+def test_refresh_stacks_only_touches_given_stacks():
+    coordinator, api = _coordinator([
+        stack_item("partial_a"),
+        stack_item("partial_b"),
+    ])
+    coordinator.async_set_updated_data = MagicMock()
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    previous = coordinator.data
+    api.read.inspectStackContainer.reset_mock()
+    api.read.listStacks = AsyncMock(
+        return_value=[stack_item("partial_a", state=StackState.STOPPED)]
+    )
+
+    asyncio.run(coordinator.async_refresh_stacks({"partial_a"}))
+
+    data = coordinator.async_set_updated_data.call_args.args[0]
+    assert api.read.listStacks.await_args.args[0].query.names == ["partial_a"]
+    assert [call.args[0].stack for call in api.read.inspectStackContainer.await_args_list] == ["partial_a"]
+    assert data.stacks["partial_a"].state == StackState.STOPPED
+    assert data.stacks["partial_b"].unchanged_since(previous.stacks["partial_b"])
+    assert previous.stacks["partial_a"].state == StackState.RUNNING
+    assert data.servers["srv"].stack_count == 2
+    assert data.diff.stacks == {"partial_a"}
+
+
+def test_refresh_stacks_keeps_stacks_missing_from_the_response():
+    coordinator, api = _coordinator([
+        stack_item("renamed_a"),
+        stack_item("renamed_b"),
+    ])
+    coordinator.async_set_updated_data = MagicMock()
+    coordinator.async_request_full_refresh = AsyncMock()
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    api.read.inspectStackContainer.reset_mock()
+    # renamed_a was renamed, so the names filter doesn't find it any more.
+    api.read.listStacks = AsyncMock(
+        return_value=[stack_item("renamed_b", state=StackState.STOPPED)]
+    )
+
+    asyncio.run(coordinator.async_refresh_stacks({"renamed_a", "renamed_b"}))
+
+    data = coordinator.async_set_updated_data.call_args.args[0]
+    assert set(data.stacks) == {"renamed_a", "renamed_b"}
+    assert data.diff.removed_stacks == set()
+    assert data.diff.removed_services == set()
+    assert [call.args[0].stack for call in api.read.inspectStackContainer.await_args_list] == [
+        "renamed_b"
+    ]
+    coordinator.async_request_full_refresh.assert_awaited_once()
+
+
+def test_handle_update_refreshes_target_stacks():
+    coordinator, _ = _coordinator([
+        stack_item("event_a", server_id="srv1"),
+        stack_item("event_b", server_id="srv1"),
+        stack_item("event_c", server_id="srv2"),
+    ])
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    coordinator.async_request_stack_refresh = MagicMock()
+
+    def update(target, status=UpdateStatus.COMPLETE):
+        return SimpleNamespace(status=status, target=target)
+
+    coordinator.async_handle_update(update(ResourceTargetStack(id="event_a"), UpdateStatus.INPROGRESS))
+    coordinator.async_request_stack_refresh.assert_not_called()
+
+    coordinator.async_handle_update(update(ResourceTargetStack(id="event_a")))
+    coordinator.async_handle_update(update(ResourceTargetServer(id="srv1")))
+    # Both invalidate the cached container states, the default.
+    assert [
+        call.args for call in coordinator.async_request_stack_refresh.call_args_list
+    ] == [({"event_a"},), ({"event_a", "event_b"},)]
+    assert all(
+        not call.kwargs for call in coordinator.async_request_stack_refresh.call_args_list
+    )
+
+
+def test_server_update_inspects_its_stacks_again():
+    coordinator, api = _coordinator([
+        stack_item("push_a", server_id="srv1"),
+        stack_item("push_b", server_id="srv2"),
+    ])
+    coordinator._stack_refresh_delay = 0
+    coordinator.async_set_updated_data = MagicMock()
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    exited = _container()
+    exited.state = SimpleNamespace(status=ContainerStateStatusEnum.EXITED)
+    api.read.inspectStackContainer.reset_mock(return_value=True)
+    api.read.inspectStackContainer.return_value = exited
+
+    async def run():
+        tasks = []
+        coordinator.hass.async_create_task = lambda coro: tasks.append(asyncio.ensure_future(coro))
+        # A container stopped on srv1, while its cached state is still fresh.
+        coordinator.async_handle_update(
+            SimpleNamespace(status=UpdateStatus.COMPLETE, target=ResourceTargetServer(id="srv1"))
+        )
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+    data = coordinator.async_set_updated_data.call_args.args[0]
+    assert [call.args[0].stack for call in api.read.inspectStackContainer.await_args_list] == [
+        "push_a"
+    ]
+    assert data.stacks["push_a"].services["web"].running is False
+    assert data.diff.services == {("push_a", "web")}
+
+
+def test_stack_refresh_requests_are_coalesced():
+    coordinator, _ = _coordinator([])
+    coordinator._stack_refresh_delay = 0.01
+    coordinator.async_refresh_stacks = AsyncMock()
+
+    async def run():
+        await asyncio.gather(*(
+            coordinator.async_request_stack_refresh([f"debounce_{i % 5}"]) for i in range(20)
+        ))
+        await coordinator.async_request_stack_refresh(["debounce_late"])
+
+    asyncio.run(run())
+
+    assert [call.args[0] for call in coordinator.async_refresh_stacks.await_args_list] == [
+        {f"debounce_{i}" for i in range(5)}, {"debounce_late"},
+    ]
+
+
+def test_stack_refresh_takes_uninvalidated_states_from_the_cache():
+    coordinator, api = _coordinator([
+        stack_item("cache_a", updates={"web"}),
+        stack_item("cache_b", updates={"web"}),
+    ])
+    coordinator._stack_refresh_delay = 0
+    coordinator.async_set_updated_data = MagicMock()
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    info = coordinator.data.stacks["cache_b"].services["web"].update_info
+    api.read.inspectStackContainer.reset_mock()
+
+    async def run():
+        # A started container in cache_a, and cache_b refreshed along with it.
+        await asyncio.gather(
+            coordinator.async_request_stack_refresh(["cache_a"]),
+            coordinator.async_request_stack_refresh(["cache_a", "cache_b"], invalidate=False),
+        )
+
+    asyncio.run(run())
+
+    data = coordinator.async_set_updated_data.call_args.args[0]
+    assert [call.args[0].stack for call in api.read.inspectStackContainer.await_args_list] == [
+        "cache_a"
+    ]
+    assert data.stacks["cache_b"].services["web"].update_info is info
+    assert data.diff.services == set()
+    assert coordinator.stats.inspections_reused == 1
+
+
+def test_failing_server_is_skipped_and_keeps_last_state():
+    coordinator, api = _coordinator([
+        stack_item("flaky_a", server_id="flaky"),
+        stack_item("steady_a", server_id="steady"),
+    ])
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    inspection = coordinator.data.stacks["flaky_a"].services["web"].inspection
+
+    async def inspect(request):
+        if request.stack == "flaky_a":
+            raise TimeoutError
+        return _container()
+
+    api.read.inspectStackContainer.side_effect = inspect
+    for _ in range(coordinator.breaker.threshold):
+        coordinator.data = asyncio.run(coordinator._async_update_data())
+    api.read.inspectStackContainer.reset_mock()
+    data = asyncio.run(coordinator._async_update_data())
+
+    assert [call.args[0].stack for call in api.read.inspectStackContainer.await_args_list] == [
+        "steady_a"
+    ]
+    assert data.stacks["flaky_a"].services["web"].inspection is inspection
+    assert set(data.stale_servers) == {"flaky"}
+    assert data.stale_since("servers", "flaky") == {"inspections": ANY}
+
+
+def test_refresh_against_fake_core_with_a_failing_server():
+    fake = FakeKomodo(servers=5, stacks=50, latency=0.001, jitter=0.002, failing_servers={"server000"})
+
+    async def run():
+        async with fake.client() as api:
+            coordinator = KomodoCoordinator(
+                MagicMock(), api, fast_start=False, intervals={part: 0 for part in DEFAULT_INTERVALS}
+            )
+            coordinator.data = await coordinator._async_update_data()
+            fake.calls.clear()
+            return await coordinator._async_update_data()
+
+    data = asyncio.run(run())
+
+    healthy = [
+        (stack_id, service) for stack_id, service in fake.containers
+        if fake.stacks[stack_id]["info"]["server_id"] != "server000"
+    ]
+    # The breaker opened in the first refresh, so the failing server is skipped.
+    assert fake.calls["InspectStackContainer"] == len(healthy)
+    assert all(data.stacks[stack_id].services[service].running for stack_id, service in healthy)
+    assert set(data.stale_servers) == {"server000"}
+    assert len(data.stacks) == 50
+    assert data.alert_count == 500
+
+
+def test_hung_list_call_only_makes_its_part_stale(monkeypatch):
+    monkeypatch.setattr("custom_components.komodo.clients.REQUEST_TIMEOUT", 0.05)
+    fake = FakeKomodo(servers=2, stacks=4, services_per_stack=1, alerts=10)
+
+    async def run():
+        async with fake.client() as api:
+            coordinator = KomodoCoordinator(
+                MagicMock(), api, fast_start=False, intervals={part: 0 for part in DEFAULT_INTERVALS}
+            )
+            coordinator.data = await coordinator._async_update_data()
+            fake.hung_endpoints.add("ListStacks")
+            return await coordinator._async_update_data()
+
+    data = asyncio.run(run())
+
+    assert data.stale == {"stacks"}
+    assert len(data.stacks) == 4
+    assert not data.diff.removed_stacks
+    assert data.alert_count == 10
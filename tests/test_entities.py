@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from custom_components.komodo import entities
+from custom_components.komodo.coordinator import KomodoCoordinator
+from custom_components.komodo.data.diff import service_key
+from custom_components.komodo.data.komodo_data import KomodoData
+
+from .simulator import stack_item
+
+
+def _data(stacks, previous=None):
+    data = KomodoData(previous)
+    data.add_stacks(stacks)
+    data.finish_diff()
+    return data
+
+
+def _entity(stack_id, name):
+    return SimpleNamespace(
+        coordinator_context=service_key(stack_id, name),
+        registry_entry=object(),
+        entity_id=f"switch.{stack_id}_{name}",
+        hass=None,
+    )
+
+
+def test_entities_follow_added_and_removed_services(monkeypatch):
+    registry = MagicMock()
+    monkeypatch.setattr(entities.er, "async_get", lambda hass: registry)
+    coordinator = KomodoCoordinator(MagicMock(), MagicMock())
+    coordinator.data = _data([stack_item("life_a", ["web", "db"])])
+    requested = []
+
+    def create(services):
+        requested.append(services)
+        data = coordinator.data
+        return [
+            _entity(stack_id, name)
+            for stack_id, stack in data.stacks.items()
+            for name in stack.services
+            if services is None or (stack_id, name) in services
+        ]
+
+    added = []
+    initial = entities.async_track_entities(
+        MagicMock(), coordinator, added.extend, entities.SERVICE, create
+    )
+    assert len(initial) == 2
+
+    coordinator.data = _data(
+        [stack_item("life_a", ["web"]), stack_item("life_b", ["app"])],
+        previous=coordinator.data,
+    )
+    coordinator.async_update_listeners()
+
+    assert requested == [None, {("life_b", "app")}]
+    assert [entity.entity_id for entity in added] == ["switch.life_b_app"]
+    registry.async_remove.assert_called_once_with("switch.life_a_db")
+
+    # Notifying again about the same data changes nothing.
+    coordinator.async_update_listeners()
+    assert len(requested) == 2
+    registry.async_remove.assert_called_once()
+
@@ -0,0 +1,37 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.exceptions import ConfigEntryNotReady
+
+import custom_components.komodo as komodo_init
+from custom_components.komodo.const import (
+    CONF_API_KEY,
+    CONF_API_SECRET,
+    CONF_HOST,
+    DOMAIN,
+)
+
+
+def test_failed_first_refresh_releases_the_entry(monkeypatch):
+    komodo = MagicMock()
+    komodo.async_restore = AsyncMock(return_value=False)
+    komodo.test_connection = AsyncMock()
+    komodo.coordinator.async_config_entry_first_refresh = AsyncMock(
+        side_effect=ConfigEntryNotReady("down")
+    )
+    komodo.close = AsyncMock()
+    monkeypatch.setattr(komodo_init, "KomodoBase", MagicMock(return_value=komodo))
+    hass = MagicMock()
+    hass.data = {}
+    entry = MagicMock(
+        entry_id="entry_id",
+        data={CONF_HOST: "http://core", CONF_API_KEY: "key", CONF_API_SECRET: "secret"},
+        options={},
+    )
+
+    with pytest.raises(ConfigEntryNotReady):
+        asyncio.run(komodo_init.async_setup_entry(hass, entry))
+
+    assert hass.data[DOMAIN] == {}
+    komodo.close.assert_awaited_once()
@@ -0,0 +1,57 @@
+from komodo_api.types import ContainerStateStatusEnum
+
+from custom_components.komodo.data.service import InspectionRecord
+from custom_components.komodo.inspection_cache import InspectionCache
+
+
+def _record(container_id, image="sha256:1", status=ContainerStateStatusEnum.RUNNING):
+    return InspectionRecord(status, container_id, "1.0", image)
+
+
+def test_state_and_update_info_expire_separately():
+    cache = InspectionCache(10, state_ttl=60, update_info_ttl=7200)
+    record, info = _record("c1"), object()
+    cache.put_state(("a", "web"), record, now=0)
+    cache.put_update_info(("a", "web"), info, now=0)
+
+    assert cache.state(("a", "web"), now=30) is record
+    assert cache.state(("a", "web"), now=60) is None
+    assert cache.update_info(("a", "web"), now=3600) is info
+    assert cache.update_info(("a", "web"), now=7200) is None
+    assert cache.hits == {"state": 1, "update_info": 1}
+    assert cache.misses == {"state": 1, "update_info": 1}
+
+
+def test_update_info_is_dropped_with_its_container_but_not_on_invalidate():
+    cache = InspectionCache(10, state_ttl=60, update_info_ttl=7200)
+    info = object()
+    cache.put_state(("a", "web"), _record("c1"), now=0)
+    cache.put_update_info(("a", "web"), info, now=0)
+
+    cache.invalidate([("a", "web"), ("a", "unknown")])
+    assert cache.state(("a", "web"), now=1) is None
+    assert cache.update_info(("a", "web"), now=1) is info
+
+    # Stopped, but still the same container.
+    cache.put_state(("a", "web"), _record("c1", status=ContainerStateStatusEnum.EXITED), now=2)
+    assert cache.update_info(("a", "web"), now=2) is info
+
+    # A deploy replaced the container.
+    cache.put_state(("a", "web"), _record("c2", image="sha256:2"), now=3)
+    assert cache.update_info(("a", "web"), now=3) is None
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = InspectionCache(2, state_ttl=60, update_info_ttl=7200)
+    cache.put_state(("a", "web"), _record("c1"), now=0)
+    cache.put_state(("b", "web"), _record("c2"), now=0)
+    cache.state(("a", "web"), now=1)
+    cache.put_state(("c", "web"), _record("c3"), now=1)
+
+    assert cache.state(("b", "web"), now=1) is None
+    assert cache.state(("a", "web"), now=1) is not None
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+    cache.forget([("a", "web")])
+    assert len(cache) == 1
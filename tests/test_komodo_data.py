@@ -0,0 +1,218 @@
+import gc
+import json
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+from komodo_api.types import (
+    AlertDataTypes,
+    ContainerStateStatusEnum,
+    ResourceTargetStack,
+    StackState,
+)
+
+from custom_components.komodo.data.alerts import KomodoAlerts
+from custom_components.komodo.data.diff import server_key, service_key, stack_key
+from custom_components.komodo.data.komodo_data import KomodoData
+from custom_components.komodo.data.service import InspectionRecord, KomodoUpdateInfo
+
+from .simulator import server_item, stack_item
+
+
+def _data(servers, stacks, previous=None):
+    data = KomodoData(previous)
+    data.add_servers(servers)
+    data.add_stacks(stacks)
+    data.finish_diff()
+    return data
+
+
+def test_data_is_per_instance():
+    first = _data([server_item("srv")], [stack_item("a")])
+    second = _data([server_item("other")], [])
+
+    assert list(first.stacks) == ["a"]
+    assert list(second.servers) == ["other"]
+
+
+def test_unchanged_objects_are_reused():
+    first = _data([server_item("srv")], [stack_item("a"), stack_item("b")])
+    second = _data([server_item("srv")], [stack_item("a"), stack_item("b")], previous=first)
+
+    assert second.stacks["a"] is first.stacks["a"]
+    assert second.servers["srv"] is first.servers["srv"]
+    assert second.servers["srv"].stack_count == 2
+    assert not second.diff
+    assert first.diff.full
+
+
+def test_index_only_resolves_changed_objects():
+    first = _data([server_item("srv")], [stack_item("a"), stack_item("b", services=("web", "db"))])
+    second = _data(
+        [server_item("srv")],
+        [stack_item("a", state=StackState.DOWN), stack_item("c")],
+        previous=first,
+    )
+
+    assert second.index[stack_key("a")] == ("DOWN", "")
+    assert second.index[server_key("srv")] == ("OK", "", 2, 2)
+    # Unchanged values are the very same tuples.
+    assert second.index[service_key("a", "web")] is first.index[service_key("a", "web")]
+    assert stack_key("c") in second.index
+    assert stack_key("b") not in second.index
+    assert service_key("b", "db") not in second.index
+    rebuilt = KomodoData.from_dict(json.loads(json.dumps(second.as_dict())))
+    assert rebuilt.index == second.index
+
+
+def test_diff_reports_changed_added_and_removed():
+    first = _data([server_item("srv")], [stack_item("a"), stack_item("b", services=("web", "db"))])
+    second = _data(
+        [server_item("srv")],
+        [stack_item("a", state=StackState.STOPPED), stack_item("c")],
+        previous=first,
+    )
+
+    diff = second.diff
+    assert not second.stacks["a"].unchanged_since(first.stacks["a"])
+    assert diff.stacks == {"a", "c"}
+    assert diff.added_stacks == {"c"}
+    assert diff.removed_stacks == {"b"}
+    assert diff.services == {("a", "web"), ("c", "web")}
+    assert diff.added_services == {("c", "web")}
+    assert diff.removed_services == {("b", "web"), ("b", "db")}
+    # The server keeps its list item, but its service count went from 3 to
+    # 2, so it is copied instead of shared.
+    assert diff.servers == {"srv"}
+    assert second.servers["srv"] is not first.servers["srv"]
+    # The published data is left as it was.
+    assert first.servers["srv"].service_count == 3
+    assert first.index[server_key("srv")] == ("OK", "", 2, 3)
+
+
+def test_changed_alerts_copy_shared_stack():
+    first = _data([server_item("srv")], [stack_item("a"), stack_item("b")])
+    second = KomodoData(first)
+    second.add_servers([server_item("srv")])
+    second.add_stacks([stack_item("a"), stack_item("b")])
+    alerts = KomodoAlerts()
+    alerts.add_page(SimpleNamespace(
+        alerts=[SimpleNamespace(data=SimpleNamespace(type="StackStateChange"), target=ResourceTargetStack(id="a"))],
+        next_page=None,
+    ))
+    second.add_alerts(alerts)
+    diff = second.finish_diff()
+
+    assert second.stacks["a"] is not first.stacks["a"]
+    assert second.stacks["a"].unchanged_since(first.stacks["a"])
+    assert second.stacks["a"].alerts == "StackStateChange"
+    assert first.stacks["a"].alerts == ""
+    assert second.stacks["b"] is first.stacks["b"]
+    assert second.servers["srv"] is first.servers["srv"]
+    assert diff.stacks == {"a"}
+    assert diff.servers == set()
+
+
+def test_cached_data_restores_and_is_reused():
+    data = KomodoData()
+    data.add_servers([server_item("srv")])
+    data.add_stacks([stack_item("a", services=("web", "db")), stack_item("b", server_id="gone")])
+    alerts = KomodoAlerts()
+    alerts.add_page(SimpleNamespace(
+        alerts=[SimpleNamespace(data=SimpleNamespace(type="StackStateChange"), target=ResourceTargetStack(id="a"))],
+        next_page=None,
+    ))
+    data.add_alerts(alerts)
+    web = data.stacks["a"].services["web"]
+    web.inspection = InspectionRecord(ContainerStateStatusEnum.RUNNING, "c0ffee", None, "sha256:1")
+    web.update_info = KomodoUpdateInfo(web.inspection, 123.0)
+    data.finish_diff()
+
+    restored = KomodoData.from_dict(json.loads(json.dumps(data.as_dict())))
+
+    assert list(restored.stacks) == ["a", "b"]
+    assert restored.servers["srv"].stack_count == 1
+    assert restored.servers["gone"].fingerprint is None
+    assert restored.stacks["a"].alerts == "StackStateChange"
+    assert restored.alert_summary == "StackStateChange"
+    restored_web = restored.stacks["a"].services["web"]
+    assert restored_web.inspection == web.inspection
+    assert restored_web.running is True
+    assert restored_web.update_info.current_version == "0"
+    assert restored_web.update_info.info_updated_at == 123.0
+
+    refreshed = _data(
+        [server_item("srv")], [stack_item("a", services=("web", "db")), stack_item("b", server_id="gone")],
+        previous=restored,
+    )
+    assert refreshed.stacks["a"].unchanged_since(restored.stacks["a"])
+    assert refreshed.servers["srv"].unchanged_since(restored.servers["srv"])
+    assert refreshed.stacks["a"].services["web"].inspection == web.inspection
+    assert refreshed.diff.services == set()
+
+
+def test_lookups_do_not_modify_the_snapshot():
+    data = _data([server_item("srv")], [stack_item("a")])
+
+    assert data.get_stack("missing").name == "Unknown Stack missing"
+    assert data.get_server("missing").name == "Unknown Server missing"
+    assert list(data.stacks) == ["a"]
+    assert list(data.servers) == ["srv"]
+    with pytest.raises(TypeError):
+        data.stacks["b"] = data.stacks["a"]
+
+
+def test_wrappers_have_no_instance_dict():
+    data = _data([server_item("srv")], [stack_item("a")])
+
+    for obj in (data, data.servers["srv"], data.stacks["a"], data.stacks["a"].services["web"]):
+        assert not hasattr(obj, "__dict__")
+
+
+def test_memory_does_not_grow_across_refreshes():
+    servers = [server_item(f"srv{i}") for i in range(5)]
+    stacks = [stack_item(f"stack{i}", server_id=f"srv{i % 5}") for i in range(200)]
+    data = _data(servers, stacks)
+
+    tracemalloc.start()
+    try:
+        data = _data(servers, stacks, previous=data)
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(20):
+            data = _data(servers, stacks, previous=data)
+        gc.collect()
+        grown = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert grown < 16 * 1024
+    assert len(data.stacks) == 200
+
+
+def test_alert_summaries_are_shared_between_fetches_and_targets():
+    def fetch():
+        alerts = KomodoAlerts()
+        alerts.add_page(SimpleNamespace(
+            alerts=[
+                SimpleNamespace(
+                    data=SimpleNamespace(type=alert_type),
+                    target=ResourceTargetStack(id=stack_id),
+                )
+                for stack_id, alert_type in (
+                    ("a", AlertDataTypes.STACK_STATE_CHANGE),
+                    # Built at runtime like the strings pydantic parses.
+                    ("b", "".join(["Stack", "StateChange"])),
+                )
+            ],
+            next_page=None,
+        ))
+        return alerts
+
+    first, second = fetch(), fetch()
+
+    assert first.summary == "StackStateChange, StackStateChange"
+    assert second.summary is first.summary
+    assert second.stack_summaries["a"] is first.stack_summaries["b"]
+    assert first.types[0] is second.types[1]
@@ -0,0 +1,36 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.komodo.procedures import KomodoProcedureCoordinator
+
+
+def _procedure(procedure_id, name, last_run=0):
+    return SimpleNamespace(id=procedure_id, name=name, info=SimpleNamespace(last_run_at=last_run))
+
+
+def test_unchanged_procedures_keep_the_data():
+    api = MagicMock()
+    api.read.listProcedures = AsyncMock(return_value=[_procedure("p1", "Backup")])
+    coordinator = KomodoProcedureCoordinator(MagicMock(), api)
+
+    coordinator.data = asyncio.run(coordinator._async_update_data())
+    assert list(coordinator.data) == ["p1"]
+
+    api.read.listProcedures.return_value = [_procedure("p1", "Backup", last_run=5)]
+    assert asyncio.run(coordinator._async_update_data()) is coordinator.data
+
+    api.read.listProcedures.return_value = [_procedure("p1", "Backup"), _procedure("p2", "Prune")]
+    assert list(asyncio.run(coordinator._async_update_data())) == ["p1", "p2"]
+
+
+def test_failed_listing_raises_update_failed():
+    api = MagicMock()
+    api.read.listProcedures = AsyncMock(side_effect=ConnectionError("down"))
+    coordinator = KomodoProcedureCoordinator(MagicMock(), api)
+
+    with pytest.raises(UpdateFailed):
+        asyncio.run(coordinator._async_update_data())
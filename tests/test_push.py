@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+from komodo_api.lib import ApiKeyInitOptions, KomodoClient
+from komodo_api.types import ResourceTargetStack, UpdateStatus
+
+from custom_components.komodo.push import KomodoUpdateStream
+
+
+def _update(stack_id, status="Complete"):
+    return json.dumps({
+        "id": f"update_{stack_id}",
+        "operation": "DeployStack",
+        "start_ts": 0,
+        "success": True,
+        "username": "admin",
+        "operator": "admin",
+        "target": {"type": "Stack", "id": stack_id},
+        "status": status,
+    })
+
+
+class FakeUpdateStream:
+    """Local stand-in for the /ws/update endpoint of Komodo core."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.logins = []
+        app = web.Application()
+        app.router.add_get("/ws/update", self._handle)
+        self.server = TestServer(app)
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        login = await ws.receive()
+        assert login.type == WSMsgType.TEXT
+        self.logins.append(json.loads(login.data))
+        await ws.send_str("LOGGED_IN")
+        for message in self.messages:
+            await ws.send_str(message)
+        await ws.close()
+        return ws
+
+    async def __aenter__(self):
+        await self.server.start_server()
+        return str(self.server.make_url("/"))
+
+    async def __aexit__(self, *err):
+        await self.server.close()
+
+
+async def _listen(fake, expected_updates):
+    updates, connection = [], []
+    async with fake as url, KomodoClient(url, ApiKeyInitOptions("key", "secret")) as api:
+        stream = KomodoUpdateStream(api, updates.append, connection.append, retry_delay=0.01)
+        task = asyncio.create_task(stream.run())
+        for _ in range(200):
+            if len(updates) >= expected_updates and len(fake.logins) > 1:
+                break
+            await asyncio.sleep(0.01)
+        stream.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    return updates, connection
+
+
+def test_stream_delivers_updates():
+    fake = FakeUpdateStream([_update("stack_a"), _update("stack_b", "InProgress")])
+
+    updates, _ = asyncio.run(_listen(fake, 2))
+
+    assert fake.logins[0]["type"] == "ApiKeys"
+    assert fake.logins[0]["params"] == {"key": "key", "secret": "secret"}
+    assert [u.target for u in updates[:2]] == [
+        ResourceTargetStack(id="stack_a"),
+        ResourceTargetStack(id="stack_b"),
+    ]
+    assert updates[1].status == UpdateStatus.INPROGRESS
+
+
+def test_stream_reconnects_and_reports_connection():
+    fake = FakeUpdateStream([])
+
+    _, connection = asyncio.run(_listen(fake, 0))
+
+    assert len(fake.logins) > 1
+    assert connection[:4] == [True, False, True, False]
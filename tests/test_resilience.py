@@ -0,0 +1,58 @@
+import asyncio
+
+import aiohttp
+import pytest
+from komodo_api.exceptions import KomodoException
+
+from custom_components.komodo.resilience import CircuitBreaker, call_with_retry, is_transient
+
+
+def test_transient_errors_are_retried():
+    calls = []
+
+    async def call():
+        calls.append(None)
+        if len(calls) < 3:
+            raise aiohttp.ClientConnectionError("reset")
+        return "ok"
+
+    assert asyncio.run(call_with_retry(call, timeout=1, retries=2, backoff=0)) == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("error", [asyncio.TimeoutError(), KomodoException({"error": "nope", "trace": []}, 400)])
+def test_timeouts_and_client_errors_are_not_retried(error):
+    calls = []
+
+    async def call():
+        calls.append(None)
+        raise error
+
+    with pytest.raises(type(error)):
+        asyncio.run(call_with_retry(call, timeout=1, retries=2, backoff=0))
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(("status", "transient"), [(503, True), (502, True), (404, False)])
+def test_error_pages_are_retried_by_status(status, transient):
+    error = aiohttp.ClientResponseError(None, (), status=status)
+
+    assert is_transient(error) is transient
+
+
+def test_breaker_opens_and_backs_off():
+    breaker = CircuitBreaker(threshold=2, cooldown=10, max_cooldown=15)
+
+    assert breaker.record_failure("server", 0) is False
+    assert breaker.record_failure("server", 0) is True
+    assert not breaker.allow("server", 5)
+    assert breaker.allow("server", 10)
+
+    # A failed trial opens it again for twice as long, capped.
+    assert breaker.record_failure("server", 10) is True
+    assert not breaker.allow("server", 24)
+    assert breaker.allow("server", 25)
+
+    breaker.record_success("server")
+    assert breaker.allow("server", 25)
+    assert not breaker.is_open("server")
@@ -0,0 +1,116 @@
+import asyncio
+
+from custom_components.komodo.const import (
+    DEFAULT_INSPECTION_CONCURRENCY,
+    DEFAULT_INSPECTION_PER_SERVER,
+)
+from custom_components.komodo.scheduler import AdaptiveSchedule, InspectionScheduler
+
+
+def _tracking_job(server_id, running, peak, order, delay=0.01):
+    async def job():
+        running[server_id] = running.get(server_id, 0) + 1
+        running["total"] = running.get("total", 0) + 1
+        peak[server_id] = max(peak.get(server_id, 0), running[server_id])
+        peak["total"] = max(peak.get("total", 0), running["total"])
+        order.append(server_id)
+        await asyncio.sleep(delay)
+        running[server_id] -= 1
+        running["total"] -= 1
+    return job
+
+
+def test_run_respects_global_and_per_server_limits():
+    running, peak, order = {}, {}, []
+    jobs = [
+        (server, _tracking_job(server, running, peak, order))
+        for server in ("a", "b", "c")
+        for _ in range(10)
+    ]
+
+    skipped = asyncio.run(InspectionScheduler(5, 2, 10).run(jobs))
+
+    assert skipped == 0
+    assert len(order) == 30
+    assert peak["total"] <= 5
+    assert all(peak[server] <= 2 for server in ("a", "b", "c"))
+
+
+def test_run_interleaves_servers():
+    running, peak, order = {}, {}, []
+    jobs = [("a", _tracking_job("a", running, peak, order)) for _ in range(6)]
+    jobs += [("b", _tracking_job("b", running, peak, order)) for _ in range(2)]
+
+    asyncio.run(InspectionScheduler(1, 1, 10).run(jobs))
+
+    assert order[:4] == ["a", "b", "a", "b"]
+
+
+def test_slow_server_does_not_starve_others():
+    running, peak, order = {}, {}, []
+    jobs = [("slow", _tracking_job("slow", running, peak, order, delay=0.5)) for _ in range(10)]
+    jobs += [("fast", _tracking_job("fast", running, peak, order)) for _ in range(10)]
+
+    skipped = asyncio.run(InspectionScheduler(4, 2, 0.3).run(jobs))
+
+    assert order.count("fast") == 10
+    assert skipped == 10
+
+
+def test_hung_servers_leave_slots_for_healthy_ones():
+    running, peak, order = {}, {}, []
+    jobs = [
+        (server, _tracking_job(server, running, peak, order, delay=10))
+        for server in ("hung_a", "hung_b")
+        for _ in range(10)
+    ]
+    jobs += [("healthy", _tracking_job("healthy", running, peak, order)) for _ in range(10)]
+    scheduler = InspectionScheduler(
+        DEFAULT_INSPECTION_CONCURRENCY, DEFAULT_INSPECTION_PER_SERVER, 0.3
+    )
+
+    skipped = asyncio.run(scheduler.run(jobs))
+
+    assert order.count("healthy") == 10
+    assert skipped == 20
+
+
+def test_run_cancels_jobs_after_deadline():
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(10)
+        finished.append(True)
+
+    skipped = asyncio.run(InspectionScheduler(2, 2, 0.05).run([("a", slow), ("a", slow)]))
+
+    assert skipped == 2
+    assert finished == []
+
+
+def test_run_without_jobs():
+    assert asyncio.run(InspectionScheduler(2, 2, 1).run([])) == 0
+
+
+def test_adaptive_schedule_backs_off_and_resets():
+    schedule = AdaptiveSchedule(min_interval=30, max_interval=3600, backoff=2)
+
+    assert schedule.due("stack", 0)
+    schedule.observe("stack", changed=True, now=0, base_interval=300)
+    assert schedule.interval("stack") == 300
+    assert not schedule.due("stack", 299)
+    assert schedule.due("stack", 300)
+
+    now = 300
+    for _ in range(10):
+        schedule.observe("stack", changed=False, now=now, base_interval=300)
+        now += schedule.interval("stack")
+    assert schedule.interval("stack") == 3600
+
+    schedule.observe("stack", changed=True, now=now, base_interval=300)
+    assert schedule.interval("stack") == 30
+
+    schedule.observe("stack", changed=False, now=now, base_interval=300)
+    schedule.reset("stack")
+    assert schedule.due("stack", now)
+    assert schedule.interval("stack") == 30
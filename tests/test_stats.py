@@ -0,0 +1,45 @@
+import asyncio
+
+from custom_components.komodo.stats import ApiStats, LatencyHistogram, RefreshStats
+
+
+def test_histogram_quantile_is_bucket_bound():
+    histogram = LatencyHistogram()
+    for seconds in [0.01] * 90 + [0.3] * 9 + [20]:
+        histogram.record(seconds)
+
+    assert histogram.quantile(0.5) == 0.025
+    assert histogram.quantile(0.95) == 0.5
+    assert histogram.quantile(1) == 20
+    assert histogram.as_dict()["buckets"]["inf"] == 1
+
+
+def test_refresh_counts_calls_of_the_tasks_it_starts():
+    api = ApiStats()
+    refreshes = RefreshStats()
+
+    async def call(endpoint, fail=False):
+        with api.measure(endpoint):
+            await asyncio.sleep(0)
+            if fail:
+                raise ConnectionError
+
+    async def run():
+        async with refreshes.track("full"):
+            await asyncio.gather(
+                call("ListStacks"),
+                call("InspectStackContainer"),
+                call("InspectStackContainer", fail=True),
+                return_exceptions=True,
+            )
+        # Not part of the refresh.
+        await call("ListStacks")
+
+    asyncio.run(run())
+
+    last = refreshes.last["full"]
+    assert last["calls"] == 3
+    assert last["calls_per_endpoint"] == {"ListStacks": 1, "InspectStackContainer": 2}
+    assert api.endpoints["ListStacks"].count == 2
+    assert api.endpoints["InspectStackContainer"].errors == 1
+    assert api.total().count == 4
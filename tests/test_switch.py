@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.komodo.data.diff import service_key
+from custom_components.komodo.data.index import ServiceValues
+from custom_components.komodo.switch import KomodoServiceSwitch
+
+
+def _switch(container_id):
+    coordinator = MagicMock(last_update_success=True)
+    coordinator.data.index = {
+        service_key("stack", "web"): ServiceValues(True, container_id, None, None)
+    }
+    api = MagicMock()
+    api.read.inspectStackContainer = AsyncMock(return_value=SimpleNamespace(id="inspected"))
+    switch = KomodoServiceSwitch(
+        coordinator, api, MagicMock(), "entry_stack_web", "stack", "stack", "web", "srv", None
+    )
+    return switch, coordinator, api
+
+
+def test_container_follows_the_index():
+    switch, coordinator, api = _switch("old")
+    assert asyncio.run(switch.query_container()) == "old"
+
+    # Redeployed, the last inspection found a new container.
+    coordinator.data.index = {
+        service_key("stack", "web"): ServiceValues(True, "new", None, None)
+    }
+    assert asyncio.run(switch.query_container()) == "new"
+    api.read.inspectStackContainer.assert_not_awaited()
+
+
+def test_unknown_container_is_inspected_every_time():
+    switch, _, api = _switch(None)
+
+    assert asyncio.run(switch.query_container()) == "inspected"
+    assert asyncio.run(switch.query_container()) == "inspected"
+    assert api.read.inspectStackContainer.await_count == 2
+
+
+def test_switch_is_written_only_when_running_changes():
+    switch, coordinator, _ = _switch("old")
+    switch.async_write_ha_state = MagicMock()
+
+    # Redeployed while running, the switch shows the same.
+    coordinator.data.index = {
+        service_key("stack", "web"): ServiceValues(True, "new", None, None)
+    }
+    switch._handle_coordinator_update()
+    switch.async_write_ha_state.assert_not_called()
+
+    coordinator.data.index = {
+        service_key("stack", "web"): ServiceValues(False, "new", None, None)
+    }
+    switch._handle_coordinator_update()
+    switch.async_write_ha_state.assert_called_once()
+    assert switch.is_on is False